@@ -1,51 +1,235 @@
 #!/usr/bin/env python3
 import os
+import re
 import json
+import base64
+import hashlib
 import logging
+import threading
+import time
 import traceback
 from functools import wraps
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_app_context, has_request_context, request, jsonify, stream_with_context
 from flask_cors import CORS
 import firebase_admin
 from firebase_admin import credentials, auth, firestore
 from datetime import datetime
+import jsoncodec
+import jsonlog
+import metrics
+from cache import ExpiringLRUCache
+from compression import ResponseCompressor, encoded_etag, match_etag
+from feeds import FEED_STATUS, TradeFeeds
+from order_events import OrderEvents, format_sse
+from orders_cache import OrdersCache
+from search import FILTER_FIELDS as SEARCH_FILTER_FIELDS, OrderSearchIndex
+from storage import StorageConflict, create_storage
+from token_verifier import CertificatesUnavailableError, SigningCertCache, TokenVerifier, TokenTimeError
 
 # Konfiguracja ścieżek (niezależna od miejsca wywołania skryptu)
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, 'serviceAccountKey.json')
 
-# Logowanie - kluczowe do debugowania problemów z tokenami/Firebase
-logging.basicConfig(level=logging.DEBUG)
+
+# Kontekst żądania dopisywany do każdego wpisu logu (i używany do próbkowania DEBUG per trasa)
+def _log_context():
+    if not has_request_context():
+        return None
+    rule = request.url_rule
+    return {'route': rule.rule if rule is not None else 'unmatched', 'method': request.method}
+
+
+# Logowanie: JSON przez kolejkę i osobny wątek zapisu, tokeny maskowane (konfiguracja LOG_* w jsonlog.py)
+log_handler = jsonlog.setup_logging(context=_log_context)
 logger = logging.getLogger("backend")
 
+# Magazyn danych: firestore (domyślnie) | memory | sqlite (instance/storage.sqlite3, poza repozytorium).
+# Backendy lokalne nie wymagają klucza serwisowego - razem z emulatorem Auth
+# (FIREBASE_AUTH_EMULATOR_HOST) backend działa bez sieci.
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'firestore')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', os.path.join(BASE_DIR, 'instance', 'storage.sqlite3'))
+
 # Walidacja pliku klucza
-if not os.path.exists(SERVICE_ACCOUNT_PATH):
+if os.path.exists(SERVICE_ACCOUNT_PATH):
+    try:
+        with open(SERVICE_ACCOUNT_PATH, 'r', encoding='utf-8') as f:
+            sa_json = json.load(f)
+            SA_PROJECT_ID = sa_json.get('project_id')
+            logger.info("serviceAccount project_id: %s", SA_PROJECT_ID)
+    except Exception as e:
+        logger.exception("Nie można wczytać serviceAccountKey.json: %s", e)
+        raise
+elif STORAGE_BACKEND == 'firestore':
     logger.error("Brak pliku serviceAccountKey.json. Nie commituj go do repozytorium.")
     raise SystemExit(1)
-
-try:
-    with open(SERVICE_ACCOUNT_PATH, 'r', encoding='utf-8') as f:
-        sa_json = json.load(f)
-        SA_PROJECT_ID = sa_json.get('project_id')
-        logger.info("serviceAccount project_id: %s", SA_PROJECT_ID)
-except Exception as e:
-    logger.exception("Nie można wczytać serviceAccountKey.json: %s", e)
-    raise
+else:
+    SA_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID', 'demo-local')
+    logger.info("Brak serviceAccountKey.json - project_id z FIREBASE_PROJECT_ID: %s", SA_PROJECT_ID)
 
 # Inicjalizacja Firebase (wzorzec Singleton: zapobiega błędom przy reloadzie)
 if not firebase_admin._apps:
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
-        firebase_admin.initialize_app(cred)
+        if os.path.exists(SERVICE_ACCOUNT_PATH):
+            firebase_admin.initialize_app(credentials.Certificate(SERVICE_ACCOUNT_PATH))
+        else:
+            firebase_admin.initialize_app(options={'projectId': SA_PROJECT_ID})
         logger.info("Firebase Admin zainicjalizowany")
     except Exception as e:
         logger.exception("Błąd inicjalizacji Firebase Admin: %s", e)
         raise
 
-db = firestore.client()
+# Liczniki operacji bieżącego żądania (ustawiane w before_request, patrz _start_request_metrics)
+def _request_stats():
+    return g.get('request_stats') if has_app_context() else None
+
+
+storage = metrics.InstrumentedStorage(
+    create_storage(STORAGE_BACKEND, sqlite_path=SQLITE_PATH,
+                   write_workers=int(os.environ.get('BULK_WRITE_WORKERS', '4'))),
+    _request_stats)
+logger.info("Magazyn danych: %s", storage.name)
+
+# Cache zleceń w pamięci (jeden listener on_snapshot na worker); ORDERS_CACHE=0 wyłącza.
+# Tylko dla Firestore - backendy lokalne same odpowiadają z pamięci/dysku.
+orders_cache = OrdersCache(max_staleness=int(os.environ.get('ORDERS_CACHE_MAX_STALENESS', '120')))
+orders_cache_enabled = STORAGE_BACKEND == 'firestore' and os.environ.get('ORDERS_CACHE', '1') == '1'
+
+# Feedy workerów (GET /feed): najnowsze otwarte zlecenia per branża, aktualizowane przyrostowo.
+# Z listenerem cache zmiany przychodzą z on_snapshot (także zapisy innych procesów); bez niego
+# feed aktualizują endpointy zapisujące, a FEED_MAX_AGE ogranicza nieaktualność względem innych procesów.
+FEED_SIZE = int(os.environ.get('FEED_SIZE', '200'))
+feeds = TradeFeeds(size=FEED_SIZE,
+                   max_age=None if orders_cache_enabled else int(os.environ.get('FEED_MAX_AGE', '30')))
+
+# Zmiany zleceń dla GET /orders/stream (SSE) - z tego samego źródła co feedy, jedno na proces
+order_events = OrderEvents(lambda obj: app.json.dumps(obj),
+                           max_subscribers=int(os.environ.get('SSE_MAX_SUBSCRIBERS', '5000')),
+                           max_pending=int(os.environ.get('SSE_MAX_PENDING', '1000')))
+# Komentarz podtrzymujący połączenie (i wykrywający rozłączonych klientów) oraz czas ponowienia dla EventSource
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', '3000'))
+
+
+# Wyszukiwanie pełnotekstowe (GET /orders/search): indeks całej kolekcji w pamięci, aktualizowany
+# przyrostowo z tego samego źródła zmian. Bez listenera indeks jest przebudowywany po SEARCH_MAX_AGE
+# sekundach (zmiany z innych procesów), przy Firestore kosztem odczytu całej kolekcji.
+search_index = OrderSearchIndex()
+_search_build_lock = threading.Lock()
+SEARCH_MAX_AGE = int(os.environ.get('SEARCH_MAX_AGE', '300'))
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+def _on_order_change(order_id, data, previous):
+    feeds.apply(order_id, data)
+    search_index.apply(order_id, data)
+    order_events.publish(order_id, data, previous)
+
+
+def _on_orders_reset():
+    feeds.clear()
+    search_index.clear()
+    order_events.reset()
+
+
+if orders_cache_enabled:
+    orders_cache.add_listener(_on_order_change, _on_orders_reset)
+    orders_cache.start(storage.db.collection('orders'))
 
 app = Flask(__name__)
-CORS(app)
+# jsonify i app.json.dumps w całej aplikacji kodują przez orjson z obsługą typów Firestore
+app.json = jsoncodec.FirestoreJSONProvider(app)
+CORS(app, expose_headers=['X-Next-Page-Token', 'X-Total-Count', 'ETag'])
+
+# Paginacja list zleceń: domyślny i maksymalny rozmiar strony (żadne żądanie nie pobierze całej kolekcji)
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '100'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '500'))
+# W trybie strumieniowym pamięć nie rośnie z rozmiarem strony, więc limit może być wyższy
+MAX_STREAM_PAGE_SIZE = int(os.environ.get('MAX_STREAM_PAGE_SIZE', '5000'))
+STREAM_CHUNK_SIZE = 100
+
+# Cache zweryfikowanych tokenów: ten sam token przychodzi wielokrotnie w ciągu godziny,
+# więc nie ma sensu za każdym razem ponownie sprawdzać podpisu.
+# Klucz to SHA-256 tokena (surowy token nie jest trzymany w pamięci), wpis wygasa wraz z 'exp'.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '4096'))
+token_cache = ExpiringLRUCache(maxsize=TOKEN_CACHE_SIZE)
+
+
+def _token_cache_key(id_token):
+    return hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+
+# Certyfikaty Google pobierane przy starcie i odświeżane w tle (nie blokują żądań)
+signing_certs = SigningCertCache()
+token_verifier = TokenVerifier(SA_PROJECT_ID, signing_certs)
+if not os.environ.get('FIREBASE_AUTH_EMULATOR_HOST'):
+    signing_certs.start()
+
+
+# refresh_wait=0 - bez czekania na odświeżenie certyfikatów (wersja async czeka wtedy w wątku)
+def _verify_id_token(id_token, refresh_wait=None):
+    # Emulator Auth wystawia niepodpisane tokeny - weryfikację zostawiamy wtedy SDK
+    if os.environ.get('FIREBASE_AUTH_EMULATOR_HOST'):
+        return auth.verify_id_token(id_token)
+    return token_verifier.verify(id_token, refresh_wait)
+
+
+# Odwołanie sesji musi działać we wszystkich procesach, nie tylko w tym, który obsłużył
+# POST /admin/users/<uid>/revoke: przy każdym żądaniu (także z tokenem z cache) iat tokena porównywany
+# jest z tokensValidAfterTime z Firebase Auth, trzymanym per uid przez REVOCATION_CHECK_TTL s.
+# Tyle najdłużej inne procesy akceptują odwołany token. TOKEN_REVOCATION_CHECK=0 wyłącza odczyt z Auth -
+# odwołanie działa wtedy tylko w procesie, który je wykonał (wyłącznie wdrożenia z jednym workerem).
+# Domyślnie włączone, gdy Firebase Auth jest dostępny (Firestore albo emulator Auth).
+REVOCATION_CHECK_TTL = int(os.environ.get('REVOCATION_CHECK_TTL', '60'))
+TOKEN_REVOCATION_CHECK = os.environ.get(
+    'TOKEN_REVOCATION_CHECK',
+    '1' if STORAGE_BACKEND == 'firestore' or os.environ.get('FIREBASE_AUTH_EMULATOR_HOST') else '0') == '1'
+# Maksymalny czas życia ID tokena Firebase - dłużej nie trzeba pamiętać lokalnego odwołania
+MAX_TOKEN_LIFETIME = 3600
+# uid -> moment (epoch s), przed którym wystawione tokeny są nieważne; rozmiar ograniczony jak cache tokenów
+tokens_valid_after = ExpiringLRUCache(maxsize=TOKEN_CACHE_SIZE)
+
+
+# Unieważnia wszystkie zbuforowane tokeny użytkownika (np. po odwołaniu sesji)
+def _invalidate_cached_tokens(uid):
+    return token_cache.discard_where(lambda _k, decoded: decoded.get('uid') == uid)
+
+
+# Moment odwołania sesji użytkownika (0 - nigdy). Błąd Firebase Auth jest przekazywany dalej (503).
+def _tokens_valid_after(uid):
+    valid_after = tokens_valid_after.get(uid)
+    if valid_after is not None or not TOKEN_REVOCATION_CHECK:
+        return valid_after or 0
+    try:
+        valid_after = (auth.get_user(uid).tokens_valid_after_timestamp or 0) / 1000
+    except auth.UserNotFoundError:
+        # Konto usunięte - żaden jego token nie jest już ważny
+        valid_after = float('inf')
+    tokens_valid_after.set(uid, valid_after, expires_at=time.time() + REVOCATION_CHECK_TTL)
+    return valid_after
+
+
+def _is_token_revoked(decoded):
+    return decoded.get('iat', 0) < _tokens_valid_after(decoded.get('uid'))
+
+
+# Odwołanie wykonane w tym procesie obowiązuje od razu (inne procesy - po odczycie z Auth)
+def _mark_tokens_revoked(uid):
+    now = time.time()
+    ttl = REVOCATION_CHECK_TTL if TOKEN_REVOCATION_CHECK else MAX_TOKEN_LIFETIME
+    tokens_valid_after.set(uid, int(now), expires_at=now + ttl)
+
+
+# Odpowiedź dla odwołanego tokena (401) albo niedostępnego Firebase Auth (503); None - token ważny
+def _check_revoked(decoded):
+    try:
+        revoked = _is_token_revoked(decoded)
+    except Exception as e:
+        logger.error("Nie udało się sprawdzić odwołania sesji %s: %s", decoded.get('uid'), e)
+        return jsonify({"msg": "Nie można sprawdzić ważności sesji, spróbuj za chwilę"}), 503
+    if revoked:
+        return jsonify({"msg": "Token odwołany"}), 401
+    return None
 
 
 # Dekorator autoryzacji: weryfikuje token JWT nagłówka Bearer
@@ -53,51 +237,670 @@ def require_firebase_token(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         header = request.headers.get('Authorization', '')
-        logger.debug("Incoming Authorization header: %s", header)
         if not header or not header.startswith('Bearer '):
             logger.warning("Brak nagłówka Authorization")
             return jsonify({"msg": "Brak tokena"}), 401
         id_token = header.split(' ', 1)[1]
 
-        # Obsługa "Clock Skew": pętla próbuje zweryfikować token z rosnącą tolerancją czasu.
-        # Rozwiązuje problem, gdy zegar serwera i klienta nie są idealnie zsynchronizowane ("token used too early").
-        skew_attempts = (0, 5, 30, 120)
-        last_exception = None
-        for skew in skew_attempts:
-            try:
-                decoded = auth.verify_id_token(id_token, clock_skew_seconds=skew)
-                logger.debug("Decoded token uid=%s (clock_skew=%s)", decoded.get('uid'), skew)
-                # Attach user context to request object
-                request.firebase_user = decoded
-                return fn(*args, **kwargs)
-            except Exception as e:
-                last_exception = e
-                msg = str(e).lower()
-                # Ponawiaj tylko przy błędach czasowych
-                if any(x in msg for x in ["used too early", "clock", "iat"]):
-                    continue
-                else:
-                    logger.error("Błąd weryfikacji tokena (nie czasowy): %s", e)
-                    return jsonify({"msg": "Nieprawidłowy token", "error": str(e)}), 401
-
-        logger.error("Weryfikacja nieudana mimo prób clock skew: %s", last_exception)
-        return jsonify({
-            "msg": "Token nieprawidłowy (błąd czasu)",
-            "error": str(last_exception)
-        }), 401
+        cache_key = _token_cache_key(id_token)
+        decoded = token_cache.get(cache_key)
+        if decoded is not None:
+            metrics.auth_token_cache.inc('hit')
+            not_allowed = _check_revoked(decoded)
+            if not_allowed is not None:
+                return not_allowed
+            request.firebase_user = decoded
+            return fn(*args, **kwargs)
+        metrics.auth_token_cache.inc('miss')
+
+        # Obsługa "Clock Skew": tolerancja wyliczana jest z iat tokena (maks. 120 s, wygasłe tokeny bez tolerancji),
+        # a podpis sprawdzany jest dokładnie raz - klient z przestawionym zegarem kosztuje tyle samo co poprawny.
+        verify_started = time.perf_counter()
+        try:
+            decoded = _verify_id_token(id_token)
+        except TokenTimeError as e:
+            metrics.auth_verify_duration.observe(time.perf_counter() - verify_started, 'time_error')
+            logger.error("Weryfikacja nieudana (błąd czasu): %s", e)
+            return jsonify({"msg": "Token nieprawidłowy (błąd czasu)", "error": str(e)}), 401
+        except CertificatesUnavailableError as e:
+            metrics.auth_verify_duration.observe(time.perf_counter() - verify_started, 'unavailable')
+            logger.error("Brak certyfikatów do weryfikacji tokena: %s", e)
+            return jsonify({"msg": "Weryfikacja tokenów chwilowo niedostępna, spróbuj za chwilę"}), 503
+        except Exception as e:
+            metrics.auth_verify_duration.observe(time.perf_counter() - verify_started, 'error')
+            logger.error("Błąd weryfikacji tokena (nie czasowy): %s", e)
+            return jsonify({"msg": "Nieprawidłowy token", "error": str(e)}), 401
+        metrics.auth_verify_duration.observe(time.perf_counter() - verify_started, 'ok')
+
+        logger.debug("Decoded token uid=%s", decoded.get('uid'))
+        not_allowed = _check_revoked(decoded)
+        if not_allowed is not None:
+            return not_allowed
+        token_cache.set(cache_key, decoded, expires_at=decoded.get('exp'))
+        # Attach user context to request object
+        request.firebase_user = decoded
+        return fn(*args, **kwargs)
     return wrapper
 
 
-# Helper: Pobiera rolę z Firestore (bardziej aktualne dane niż claims w starym tokenie)
+# Cache profili użytkowników (rola, branża, nazwa) z krótkim TTL - sprawdzenie uprawnień
+# nie musi za każdym razem kosztować odczytu z Firestore. Backend czyści wpis przy zmianie roli.
+PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', '60'))
+profile_cache = ExpiringLRUCache(maxsize=int(os.environ.get('PROFILE_CACHE_SIZE', '4096')))
+
+
+# Helper: Profil użytkownika z Firestore (przez cache). Brak profilu -> pusty słownik.
+def _get_user_profile(uid):
+    profile = profile_cache.get(uid)
+    if profile is not None:
+        return profile
+    try:
+        profile = storage.get_user(uid) or {}
+    except Exception:
+        logger.exception("Błąd przy pobieraniu profilu użytkownika %s", uid)
+        return {}
+    profile_cache.set(uid, profile, expires_at=time.time() + PROFILE_CACHE_TTL)
+    return profile
+
+
+def _invalidate_user_profile(uid):
+    profile_cache.pop(uid)
+
+
+# Helper: Rola użytkownika. Szybka ścieżka: custom claim 'role' z tokena
+# (ustawiany przez admin_create_user i skrypty seedujące), w przeciwnym razie profil z Firestore.
 def _get_user_role(uid):
+    role = _role_from_claims(getattr(request, 'firebase_user', None), uid)
+    return role or _get_user_profile(uid).get('role', 'worker')
+
+
+def _role_from_claims(claims, uid):
+    if claims and claims.get('uid') == uid:
+        return claims.get('role')
+    return None
+
+
+# Helper: Profil użytkownika i zlecenie w jednym odczycie wsadowym (profil z cache, jeśli jest).
+# Zwraca (profil, zlecenie lub None, wersja zlecenia do zapisu warunkowego).
+def _get_profile_with_order(uid, order_id):
+    profile = profile_cache.get(uid)
+    if profile is not None:
+        return (profile,) + storage.get_order_for_update(order_id)
+    user, order, version = storage.get_user_and_order(uid, order_id)
+    profile = user or {}
+    profile_cache.set(uid, profile, expires_at=time.time() + PROFILE_CACHE_TTL)
+    return profile, order, version
+
+
+# Helper: Pobiera wiele profili jednym odczytem wsadowym (w Firestore: get_all / BatchGetDocuments).
+# Zwraca słownik uid -> dane profilu; brakujące dokumenty są pomijane.
+def _get_users_by_uid(uids):
+    uids = [u for u in set(uids) if u]
+    if not uids:
+        return {}
+    return storage.get_users(uids)
+
+
+# Helper: Flaga raportów liczona z licznika utrzymywanego przez post_report
+# (dla starszych zleceń licznik uzupełnia backfill_report_counts.py)
+def _has_reports(order):
+    return (order.get('reportCount') or 0) > 0
+
+
+def _add_has_reports(orders):
+    for data in orders:
+        data['hasReports'] = _has_reports(data)
+
+
+# Join: dane przypisanych userów pobierane jednym odczytem wsadowym (zamiast zapytania na zlecenie)
+def _add_assigned_users(orders):
+    _apply_assigned_users(orders, _get_users_by_uid(data.get('assignedTo') for data in orders))
+
+
+def _apply_assigned_users(orders, users):
+    for data in orders:
+        assigned_uid = data.get('assignedTo')
+        if assigned_uid:
+            u = users.get(assigned_uid)
+            if u is not None:
+                data['assignedUser'] = {
+                    'uid': assigned_uid,
+                    'displayName': u.get('displayName'),
+                    'email': u.get('email'),
+                    'trade': u.get('trade')
+                }
+            else:
+                data['assignedUser'] = {'uid': assigned_uid}
+        else:
+            data['assignedUser'] = None
+        data['hasReports'] = _has_reports(data)
+
+
+# Paginacja kursorem: token to zakodowana para (created_at, id) ostatniego dokumentu strony.
+# Dla klienta jest nieprzezroczysty - przekazuje go dalej jako ?page_token=.
+def _encode_page_token(data):
+    created_at = data.get('created_at')
+    cursor = {
+        'c': created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        'id': data['id']
+    }
+    raw = json.dumps(cursor, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_page_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor = json.loads(raw)
+        created_at = cursor['c']
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        return {'created_at': created_at, '__name__': str(cursor['id'])}
+    except Exception:
+        raise ValueError("Niepoprawny page_token")
+
+
+# Kursor list raportów przekrojowych: (created_at, id zlecenia, id raportu) ostatniego raportu strony,
+# zakodowany tak samo jak token list zleceń
+def _encode_report_token(created_at, order_id, report_id):
+    return _encode_page_token({'created_at': created_at, 'id': f'{order_id}/{report_id}'})
+
+
+def _decode_report_token(token):
+    cursor = _decode_page_token(token)
+    order_id, _, report_id = cursor['__name__'].partition('/')
+    if not order_id or not report_id:
+        raise ValueError("Niepoprawny page_token")
+    return cursor['created_at'], order_id, report_id
+
+
+def _page_limit(args, max_size=MAX_PAGE_SIZE):
+    raw = args.get('limit')
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("Niepoprawny limit")
+    if limit < 1:
+        raise ValueError("Niepoprawny limit")
+    return min(limit, max_size)
+
+
+# Helper: Źródło jednej strony zleceń (sortowanie created_at malejąco, id jako rozstrzygnięcie remisów).
+# filters to słownik pole -> wartość (równość). Zwraca iterator słowników z polem 'id',
+# o jeden dokument dłuższy niż limit, żeby wiedzieć czy istnieje kolejna strona.
+# Parametry (page_token, fields) walidowane są od razu - ValueError przed pierwszym bajtem odpowiedzi.
+def _order_page_source(filters, limit, required_fields=()):
+    projection = _projection(request.args, required_fields)
+    page_token = request.args.get('page_token')
+    cursor = _decode_page_token(page_token) if page_token else None
+    after = (cursor['created_at'], cursor['__name__']) if cursor else None
+
+    # Odczyt z pamięci, jeśli listener potwierdził świeżość cache
+    if orders_cache.is_healthy():
+        orders = orders_cache.query(filters, after=after, limit=limit + 1)
+        if projection is not None:
+            orders = [_project(o, projection) for o in orders]
+        return iter(orders)
+
+    return storage.query_orders(filters, fields=projection, after=after, limit=limit + 1)
+
+
+# Pola pobierane przy ?fields=: żądane + potrzebne do kursora, ETag-a i samego endpointu
+def _projection(args, required_fields=()):
+    fields = _requested_fields(args)
+    if fields is None:
+        return None
+    return sorted(set(fields) | {'created_at', 'updated_at'} | set(required_fields))
+
+
+def _project(order, fields):
+    out = {f: order[f] for f in fields if f in order}
+    out['id'] = order['id']
+    return out
+
+
+# Helper: Pobiera jedną stronę zleceń.
+# Zwraca (lista zleceń z polem 'id', token następnej strony lub None); ValueError przy złych parametrach.
+def _fetch_order_page(filters, required_fields=()):
+    limit = _page_limit(request.args)
+    orders = list(_order_page_source(filters, limit, required_fields))
+    next_token = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_token = _encode_page_token(orders[-1])
+    return orders, next_token
+
+
+# Lista pozostaje tablicą JSON (zgodność z aplikacją), token kolejnej strony idzie w nagłówku
+def _page_response(items, next_token, etag=None):
+    resp = jsoncodec.response(items, Response)
+    if next_token:
+        resp.headers['X-Next-Page-Token'] = next_token
+    if etag:
+        resp.set_etag(etag)
+    return resp, 200
+
+
+# ETag listy: skrót z id i znaczników zmian elementów (updated_at, liczniki raportów, dane z joinu)
+# oraz z parametrów żądania (strona, projekcja) - inna treść odpowiedzi zawsze daje inny ETag.
+ETAG_FIELDS = ('id', 'updated_at', 'created_at', 'reportCount', 'lastReportAt', 'assignedUser')
+
+
+def _compute_etag(path, items, *extra):
+    h = hashlib.sha256(path.encode('utf-8'))
+    for value in extra:
+        h.update(repr(value).encode('utf-8'))
+    for item in items:
+        h.update(repr(tuple(item.get(f) for f in ETAG_FIELDS)).encode('utf-8'))
+    return h.hexdigest()[:32]
+
+
+# Klient ma aktualną wersję (If-None-Match) - 304 bez serializacji treści
+def _not_modified(etag):
+    matched = match_etag(request.if_none_match, etag)
+    if matched is None:
+        return None
+    resp = Response(status=304)
+    resp.set_etag(matched)
+    return resp
+
+
+# Tryb strumieniowy: ?stream=1 (tablica JSON) albo Accept: application/x-ndjson / ?format=ndjson
+def _wants_ndjson(args, headers):
+    return args.get('format') == 'ndjson' or 'application/x-ndjson' in headers.get('Accept', '')
+
+
+def _wants_stream(args, headers):
+    return args.get('stream') in ('1', 'true') or _wants_ndjson(args, headers)
+
+
+# Helper: Strumieniuje stronę zleceń - dokumenty z q.stream() są kodowane i wysyłane na bieżąco,
+# więc pamięć workera i czas do pierwszego bajtu nie rosną z rozmiarem strony.
+# Nagłówki są już wysłane, gdy znamy token następnej strony, dlatego trafia on na koniec treści:
+# w JSON jako pole koperty {"orders": [...], "next_page_token": ...}, w NDJSON jako ostatnia linia.
+# enrich(chunk) uzupełnia zlecenia paczkami (np. join userów jednym get_all na paczkę).
+def _stream_order_page(filters, enrich=None, required_fields=()):
+    limit = _page_limit(request.args, MAX_STREAM_PAGE_SIZE)
+    docs = _order_page_source(filters, limit, required_fields)
+    ndjson = _wants_ndjson(request.args, request.headers)
+    dumps = app.json.dumps
+
+    state = {'has_more': False}
+
+    def chunks():
+        chunk = []
+        for i, data in enumerate(docs):
+            if i == limit:
+                # Dokument numer limit+1 nie jest wysyłany - świadczy tylko o istnieniu kolejnej strony
+                state['has_more'] = True
+                break
+            chunk.append(data)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def generate():
+        yield '' if ndjson else '{"orders":['
+        first = True
+        last = None
+        for chunk in chunks():
+            if enrich:
+                enrich(chunk)
+            for data in chunk:
+                if ndjson:
+                    yield dumps(data) + '\n'
+                else:
+                    yield ('' if first else ',') + dumps(data)
+                first = False
+            last = chunk[-1]
+        next_token = _encode_page_token(last) if state['has_more'] else None
+        if ndjson:
+            if next_token:
+                yield dumps({'next_page_token': next_token}) + '\n'
+        else:
+            yield '],"next_page_token":' + dumps(next_token) + '}'
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype), 200
+
+
+# Projekcja pól (?fields=): lista nazw pól albo nazwany preset. None oznacza pełne dokumenty.
+# 'summary' zawiera to, co pokazują listy w aplikacji (bez długich opisów i list narzędzi).
+FIELD_PRESETS = {
+    'summary': ['title', 'trade', 'status', 'location', 'price', 'assignedTo', 'reportCount', 'created_at'],
+    'full': None,
+}
+_FIELD_NAME_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,63}$')
+MAX_PROJECTED_FIELDS = 30
+
+
+def _requested_fields(args):
+    raw = (args.get('fields') or '').strip()
+    if not raw:
+        return None
+    if raw in FIELD_PRESETS:
+        return FIELD_PRESETS[raw]
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    if len(fields) > MAX_PROJECTED_FIELDS or not all(_FIELD_NAME_RE.match(f) for f in fields):
+        raise ValueError("Niepoprawny parametr fields")
+    return fields
+
+
+# Helper: Odpowiedź z listą zleceń - buforowana (tablica + nagłówek) albo strumieniowa.
+# required_fields - pola potrzebne samemu endpointowi mimo projekcji (join, hasReports).
+# Parametry strony są walidowane przed rozpoczęciem strumienia (ValueError -> 400 w endpointcie).
+def _list_orders(filters, enrich=None, required_fields=()):
+    if _wants_stream(request.args, request.headers):
+        return _stream_order_page(filters, enrich, required_fields)
+    orders, next_token = _fetch_order_page(filters, required_fields)
+    if enrich:
+        enrich(orders)
+    etag = _compute_etag(request.full_path, orders, next_token)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    return _page_response(orders, next_token, etag)
+
+
+# Normalizacja narzędzi (tools) do listy stringów
+def _normalize_tools(tools_payload):
+    try:
+        if isinstance(tools_payload, str):
+            return [s.strip() for s in tools_payload.split(',') if s.strip()]
+        elif isinstance(tools_payload, list):
+            return [str(s).strip() for s in tools_payload if str(s).strip()]
+    except Exception:
+        pass
+    return []
+
+
+# Helper: title/trade/status nowego zlecenia (POST /orders i zlecenia admina). Pola, po których
+# filtrujemy i indeksujemy listy, muszą być niepustym tekstem - lista czy obiekt w 'trade' psułby
+# feedy, wyszukiwarkę i cache zleceń. Zwraca ((title, trade, status), None) albo (None, komunikat błędu).
+def _order_fields(payload):
+    if not isinstance(payload, dict):
+        return None, "Pozycja nie jest obiektem JSON"
+    title = payload.get('title')
+    trade = payload.get('trade')
+    if not title or not trade:
+        return None, "Brakuje title/trade"
+    if not isinstance(title, str) or not isinstance(trade, str):
+        return None, "title i trade muszą być tekstem"
+    status = payload.get('status', 'open')
+    if not isinstance(status, str) or not status:
+        return None, "status musi być niepustym tekstem"
+    return (title, trade, status), None
+
+
+# Helper: Zlecenie admina z payloadu (walidacja jak w _order_fields oraz assignedTo, normalizacja tools).
+# Zwraca (zlecenie, None) albo (None, komunikat błędu).
+def _build_admin_order(payload, uid):
+    fields, error = _order_fields(payload)
+    if error:
+        return None, error
+    title, trade, status = fields
+    assigned_to = payload.get('assignedTo', None)
+    if assigned_to is not None and not isinstance(assigned_to, str):
+        return None, "assignedTo musi być tekstem (uid) albo null"
+
+    tools = _normalize_tools(payload.get('tools', []))
+
+    order = {
+        'title': title,
+        'description': payload.get('description'),
+        'trade': trade,
+        'status': status,
+        'price': payload.get('price'),
+        'location': payload.get('location'),
+        'ownerUid': uid,
+        'assignedTo': assigned_to,
+        'tools': tools,
+        'created_at': firestore.SERVER_TIMESTAMP,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+    return order, None
+
+
+# Import wsadowy: limit pozycji w jednym żądaniu (batche i równoległe commity - storage.write_orders)
+MAX_BULK_ORDERS = int(os.environ.get('MAX_BULK_ORDERS', '10000'))
+
+
+# Helper: NDJSON linia po linii - zwraca pary (payload, błąd); puste linie są pomijane
+def _parse_ndjson_items(lines):
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError:
+            yield None, "Niepoprawny JSON"
+
+
+# Helper: Feed branży - gotowy z pamięci albo zbudowany jednym zapytaniem (z cache zleceń, jeśli zdrowy).
+# Zwraca (body, etag, liczba zleceń). Gdy listener cache nie działa, feed nie jest zapamiętywany
+# (nie dostawałby zmian), a każde żądanie czyta bieżące dane.
+def _get_feed(trade):
+    dumps = jsoncodec.dumps
+    live = not orders_cache_enabled or orders_cache.is_healthy()
+    if live:
+        rendered = feeds.get(trade, dumps)
+        if rendered is not None:
+            return rendered
+    generation = feeds.generation(trade) if live else None
+    filters = {'trade': trade, 'status': FEED_STATUS}
+    if orders_cache.is_healthy():
+        orders = orders_cache.query(filters, limit=FEED_SIZE + 1)
+    else:
+        orders = list(storage.query_orders(filters, limit=FEED_SIZE + 1))
+    return feeds.load(trade, orders, generation, dumps)
+
+
+# Helper: Zlecenie zmienione przez ten proces. Z listenerem feedy i strumienie dostaną zmianę z on_snapshot;
+# bez niego są aktualizowane od razu na podstawie świeżo odczytanego zlecenia.
+# previous - stan zlecenia sprzed zmiany (jeśli endpoint go zna), potrzebny do zdarzeń 'remove'.
+def _order_changed(order_id, previous=None):
+    if orders_cache_enabled:
+        return
     try:
-        doc = db.collection('users').document(uid).get()
-        if doc.exists:
-            data = doc.to_dict()
-            return data.get('role', 'worker'), data
+        _on_order_change(order_id, storage.get_order(order_id), previous)
     except Exception:
-        logger.exception("Błąd przy pobieraniu roli użytkownika %s", uid)
-    return 'worker', {}
+        logger.exception("Nie udało się rozesłać zmiany zlecenia %s", order_id)
+        _on_orders_reset()
+
+
+# Filtry strumienia zmian: ?trade=, ?status=, ?assignedTo= (równość)
+def _stream_filters(args):
+    return {field: args[field] for field in OrderEvents.FILTER_FIELDS if args.get(field)}
+
+
+# Helper: Indeks wyszukiwania gotowy do użycia. Z listenerem budowany z cache zleceń (bez odczytów z bazy);
+# dopóki cache nie jest wczytany, zwraca False. Bez listenera - z pełnego odczytu kolekcji.
+def _ensure_search_index():
+    if orders_cache_enabled:
+        if search_index.loaded:
+            return True
+        if not orders_cache.is_healthy():
+            return False
+    elif search_index.loaded and search_index.age() <= SEARCH_MAX_AGE:
+        return True
+    with _search_build_lock:
+        # Inne żądanie mogło zbudować indeks, gdy czekaliśmy na blokadę
+        if search_index.loaded and (orders_cache_enabled or search_index.age() <= SEARCH_MAX_AGE):
+            return True
+        if orders_cache.is_healthy():
+            search_index.rebuild(orders_cache.query({}))
+        else:
+            search_index.rebuild(storage.query_orders({}))
+        logger.info("Zbudowano indeks wyszukiwania: %s", search_index.stats())
+    return True
+
+
+# Helper: Parametry wyszukiwania -> (zapytanie, filtry, limit, offset, projekcja); ValueError przy błędach
+def _search_params(args):
+    query = (args.get('q') or '').strip()
+    if not 2 <= len(query) <= 200:
+        raise ValueError("Parametr q musi mieć od 2 do 200 znaków")
+    try:
+        limit = int(args.get('limit', SEARCH_DEFAULT_LIMIT))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError("Niepoprawny limit/offset")
+    if limit < 1 or offset < 0:
+        raise ValueError("Niepoprawny limit/offset")
+    filters = {f: args[f] for f in SEARCH_FILTER_FIELDS if args.get(f)}
+    return query, filters, min(limit, SEARCH_MAX_LIMIT), offset, _requested_fields(args)
+
+
+def _search_results(hits, fields):
+    items = []
+    for score, order in hits:
+        item = order if fields is None else _project(order, fields)
+        item['score'] = score
+        items.append(item)
+    return items
+
+
+# Raport w formacie odpowiedzi {'id', 'data'} (created_at koduje jsoncodec jako ISO 8601);
+# listy raportów z wielu zleceń dodają 'order_id'
+def _report_to_json(report_id, data, order_id=None):
+    if order_id is not None:
+        return {'id': report_id, 'order_id': order_id, 'data': data}
+    return {
+        'id': report_id,
+        'data': data
+    }
+
+
+# Filtry listy raportów: ?author=<uid autora>, ?order_id=<id zlecenia>
+def _report_filters(args):
+    filters = {}
+    if args.get('author'):
+        filters['authorUid'] = args['author']
+    if args.get('order_id'):
+        filters['order_id'] = args['order_id']
+    return filters
+
+
+# ETag listy raportów - raporty się nie zmieniają, więc wystarczą ich id i daty
+def _reports_etag(path, reports, next_token):
+    keys = [{'id': (r.get('order_id'), r['id']), 'created_at': r['data'].get('created_at')} for r in reports]
+    return _compute_etag(path, keys, next_token)
+
+
+# Metryki per żądanie: czas, rozmiar odpowiedzi i liczba operacji na magazynie danych.
+# Odpowiedzi strumieniowe są mierzone dopiero po wysłaniu ostatniego fragmentu.
+@app.before_request
+def _start_request_metrics():
+    g.request_stats = metrics.RequestStats()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    stats = g.get('request_stats')
+    if stats is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    method = request.method
+    if not response.is_streamed:
+        metrics.observe_request(stats, route, method, response.status_code, response.calculate_content_length())
+        return response
+
+    sent = [0]
+
+    def counting(chunks):
+        try:
+            for chunk in chunks:
+                sent[0] += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            # Rozłączenie klienta: zamknięcie przekazywane do generatora endpointu (sprzątanie w finally)
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    response.response = counting(response.response)
+    response.call_on_close(lambda: metrics.observe_request(stats, route, method, response.status_code, sent[0]))
+    return response
+
+
+# Kompresja odpowiedzi (br/gzip wg Accept-Encoding) od COMPRESSION_MIN_SIZE bajtów.
+# Skompresowana treść jest zapamiętywana per ETag (listy, feed) albo skrót treści - ta sama strona listy
+# wysyłana wielu klientom jest kompresowana raz. Odpowiedzi strumieniowe idą bez kompresji.
+# Hook rejestrowany po metrykach, więc wykonuje się przed nimi (metryki widzą rozmiar po kompresji).
+compressor = ResponseCompressor(
+    min_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    cache_bytes=int(os.environ.get('COMPRESSION_CACHE_MB', '32')) * 1024 * 1024,
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '6')))
+
+
+@app.after_request
+def _compress_response(response):
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    encoded = compressor.encode(response.get_data(), request.accept_encodings, response.mimetype, etag)
+    if encoded is None:
+        return response
+    encoding, data = encoded
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        # Wariant skompresowany to inna reprezentacja - If-None-Match dopasowuje oba (match_etag)
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+
+def _cache_stats():
+    out = {}
+    for name, cache in (('token', token_cache), ('profile', profile_cache), ('revocation', tokens_valid_after)):
+        st = cache.stats()
+        out[(name, 'hits')] = st['hits']
+        out[(name, 'misses')] = st['misses']
+        out[(name, 'evictions')] = st['evictions']
+        out[(name, 'size')] = st['size']
+    out[('orders', 'size')] = orders_cache.stats()['orders']
+    out[('orders', 'healthy')] = int(orders_cache.is_healthy())
+    out[('search', 'size')] = search_index.stats()['orders']
+    st = compressor.stats()
+    out[('compression', 'hits')] = st['hits']
+    out[('compression', 'misses')] = st['misses']
+    out[('compression', 'bytes')] = st['bytes']
+    st = feeds.stats()
+    out[('feeds', 'hits')] = st['hits']
+    out[('feeds', 'misses')] = st['misses']
+    out[('feeds', 'size')] = st['orders']
+    return out
+
+
+def _order_stream_stats():
+    return {(stat,): value for stat, value in order_events.stats().items()}
+
+
+def _log_stats():
+    return {('dropped',): log_handler.dropped, ('queued',): log_handler.queue.qsize()}
+
+
+metrics.registry.register(metrics.Gauge('backend_cache', 'Statystyki cache w pamięci procesu',
+                                        ('cache', 'stat'), _cache_stats))
+metrics.registry.register(metrics.Gauge('order_stream', 'Strumienie SSE zmian zleceń: klienci, rozesłane zmiany, przepełnienia',
+                                        ('stat',), _order_stream_stats))
+metrics.registry.register(metrics.Gauge('log_records', 'Rekordy logu odrzucone przy pełnej kolejce / oczekujące na zapis',
+                                        ('state',), _log_stats))
+
+
+# Endpoint Debug: metryki w formacie Prometheusa (scrape)
+@app.route('/_debug/metrics', methods=['GET'])
+def debug_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 # Endpoint Debug: sprawdza czy backend widzi poprawny Project ID
@@ -106,6 +909,18 @@ def debug_sa_project():
     return jsonify({"service_account_project_id": SA_PROJECT_ID}), 200
 
 
+# Endpoint Debug: statystyki cache tokenów (trafienia/chybienia)
+@app.route('/_debug/token_cache', methods=['GET'])
+def debug_token_cache():
+    return jsonify(token_cache.stats()), 200
+
+
+# Endpoint Debug: stan cache zleceń (czy listener działa, liczba zleceń, świeżość)
+@app.route('/_debug/orders_cache', methods=['GET'])
+def debug_orders_cache():
+    return jsonify(orders_cache.stats()), 200
+
+
 # Endpoint Debug: pozwala ręcznie zweryfikować token (np. z Postmana)
 @app.route('/_debug/verify_token', methods=['POST'])
 def debug_verify_token():
@@ -114,7 +929,7 @@ def debug_verify_token():
     if not token:
         return jsonify({"msg": "Brakuje tokena w body"}), 400
     try:
-        decoded = auth.verify_id_token(token)
+        decoded = _verify_id_token(token)
         return jsonify({"ok": True, "decoded": decoded}), 200
     except Exception as e:
         logger.error("Debug verify failed: %s", e)
@@ -125,9 +940,9 @@ def debug_verify_token():
 @require_firebase_token
 def me():
     uid = request.firebase_user['uid']
-    doc = db.collection('users').document(uid).get()
-    if doc.exists:
-        return jsonify(doc.to_dict()), 200
+    profile = _get_user_profile(uid)
+    if profile:
+        return jsonify(profile), 200
     else:
         # Fallback do danych z tokena, jeśli brak profilu w DB
         basic = {
@@ -144,40 +959,114 @@ def get_orders():
     # Filtrowanie zleceń (Query params)
     trade = request.args.get('trade')
     status = request.args.get('status')
-    q = db.collection('orders')
+    filters = {}
     if trade:
-        q = q.where('trade', '==', trade)
+        filters['trade'] = trade
     if status:
-        q = q.where('status', '==', status)
-    q = q.order_by('created_at', direction=firestore.Query.DESCENDING)
-    
-    docs = q.stream()
-    orders = []
-    for d in docs:
-        data = d.to_dict()
-        data['id'] = d.id
-        orders.append(data)
-    return jsonify(orders), 200
+        filters['status'] = status
+
+    try:
+        return _list_orders(filters)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+
+# Feed workera: najnowsze otwarte zlecenia z branży z profilu (to samo co GET /orders?trade=...&status=open,
+# bez paginacji - maks. FEED_SIZE), z pamięci w czasie stałym. Admin może wskazać branżę przez ?trade=.
+@app.route('/feed', methods=['GET'])
+@require_firebase_token
+def get_feed():
+    uid = request.firebase_user['uid']
+    trade = _get_user_profile(uid).get('trade')
+    if request.args.get('trade') and _get_user_role(uid) == 'admin':
+        trade = request.args['trade']
+    if not trade:
+        return jsonify({"msg": "Brak branży w profilu"}), 400
+
+    body, etag, _ = _get_feed(trade)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp, 200
+
+
+# Strumień zmian zleceń (Server-Sent Events), filtrowany po trade/status/assignedTo.
+# Wszystkie połączenia procesu zasila jedno źródło (listener on_snapshot cache zleceń); wolny klient
+# dostaje scalone zmiany albo 'reset' (patrz order_events.OrderEvents) i nigdy nie blokuje innych.
+# Zdarzenia: upsert (zlecenie z 'id'), remove ({"id"}), reset (pobierz listę od nowa).
+@app.route('/orders/stream', methods=['GET'])
+@require_firebase_token
+def stream_orders():
+    sub = order_events.subscribe(_stream_filters(request.args))
+    if sub is None:
+        return jsonify({"msg": "Zbyt wiele otwartych strumieni"}), 503
+
+    def generate():
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            while True:
+                if not sub.wait(SSE_HEARTBEAT_SECONDS):
+                    yield ': ping\n\n'
+                    continue
+                for seq, event, data in sub.drain():
+                    yield format_sse(seq, event, data)
+        finally:
+            order_events.unsubscribe(sub)
+
+    resp = Response(generate(), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp, 200
+
+
+# Wyszukiwanie pełnotekstowe w tytule, opisie, tagach i narzędziach (?q=), z filtrami ?trade= i ?status=.
+# Polskie znaki są sprowadzane do ASCII, końcówki odmiany odcinane (syfonu -> syfon), ostatnie słowo
+# dopasowywane też jako prefiks. Wyniki posortowane trafnością (pole 'score'), liczba wszystkich
+# trafień w nagłówku X-Total-Count, kolejne strony przez ?offset=.
+@app.route('/orders/search', methods=['GET'])
+def search_orders():
+    try:
+        query, filters, limit, offset, fields = _search_params(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if not _ensure_search_index():
+        return jsonify({"msg": "Indeks wyszukiwania jest w trakcie budowy, spróbuj za chwilę"}), 503
+
+    total, hits = search_index.search(query, filters, limit=limit, offset=offset)
+    resp = jsoncodec.response(_search_results(hits, fields), Response)
+    resp.headers['X-Total-Count'] = str(total)
+    return resp, 200
 
 
 @app.route('/orders/<order_id>', methods=['GET'])
 def get_order(order_id):
-    doc = db.collection('orders').document(order_id).get()
-    if not doc.exists:
+    try:
+        fields = _requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if orders_cache.is_healthy():
+        data = orders_cache.get(order_id)
+        if data is None:
+            return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+        data['id'] = order_id
+        return jsoncodec.response(data if fields is None else _project(data, fields), Response)
+
+    order = storage.get_order(order_id, fields=fields)
+    if order is None:
         return jsonify({"msg": "Zlecenie nie istnieje"}), 404
-    data = doc.to_dict()
-    data['id'] = doc.id
-    return jsonify(data), 200
+    return jsoncodec.response(order, Response)
 
 
 @app.route('/orders', methods=['POST'])
 @require_firebase_token
 def create_order():
     payload = request.get_json() or {}
-    title = payload.get('title')
-    trade = payload.get('trade')
-    if not title or not trade:
-        return jsonify({"msg": "Brakuje title/trade"}), 400
+    fields, error = _order_fields(payload)
+    if error:
+        return jsonify({"msg": error}), 400
+    title, trade, status = fields
     uid = request.firebase_user['uid']
     
     # SERVER_TIMESTAMP zapewnia spójność czasu na serwerze Google
@@ -185,7 +1074,7 @@ def create_order():
         'title': title,
         'description': payload.get('description'),
         'trade': trade,
-        'status': payload.get('status', 'open'),
+        'status': status,
         'price': payload.get('price'),
         'location': payload.get('location'),
         'ownerUid': uid,
@@ -193,63 +1082,63 @@ def create_order():
         'created_at': firestore.SERVER_TIMESTAMP,
         'updated_at': firestore.SERVER_TIMESTAMP
     }
-    doc_ref = db.collection('orders').add(order)
-    return jsonify({"id": doc_ref[1].id}), 201
+    order_id = storage.create_order(order)
+    _order_changed(order_id)
+    return jsonify({"id": order_id}), 201
 
 
 @app.route('/orders/<order_id>/assign', methods=['POST'])
 @require_firebase_token
 def assign_order(order_id):
     uid = request.firebase_user['uid']
-    user_doc = db.collection('users').document(uid).get()
-    user = user_doc.to_dict() if user_doc.exists else {}
-    role = user.get('role', 'worker')
-    
-    order_ref = db.collection('orders').document(order_id)
-    order_doc = order_ref.get()
-    if not order_doc.exists:
+
+    # Profil i zlecenie jednym odczytem wsadowym
+    profile, order, version = _get_profile_with_order(uid, order_id)
+    if order is None:
         return jsonify({"msg": "Zlecenie nie istnieje"}), 404
-    order = order_doc.to_dict()
+    role = _role_from_claims(request.firebase_user, uid) or profile.get('role', 'worker')
 
-    # Logika dla Workera: może wziąć zlecenie tylko ze swojej branży
+    # Logika dla Workera: może wziąć zlecenie tylko ze swojej branży i tylko wolne
     if role == 'worker':
-        if user.get('trade') != order.get('trade'):
+        if profile.get('trade') != order.get('trade'):
             return jsonify({"msg": "Branża nie pasuje"}), 403
-        order_ref.update({
-            'assignedTo': uid,
-            'status': 'assigned',
-            'updated_at': firestore.SERVER_TIMESTAMP
-        })
-        return jsonify({"msg": "Przypisano użytkownika"}), 200
-    
+        if order.get('assignedTo') not in (None, uid):
+            return jsonify({"msg": "Zlecenie zostało już przypisane"}), 409
+        assignee, msg = uid, "Przypisano użytkownika"
+
     # Logika dla Admina: może przypisać dowolnego workera
     elif role == 'admin':
         data = request.get_json() or {}
         worker_uid = data.get('worker_uid')
         if not worker_uid:
             return jsonify({"msg": "Brakuje worker_uid"}), 400
-        order_ref.update({
-            'assignedTo': worker_uid,
+        assignee, msg = worker_uid, "Przypisano wskazanego worker"
+    else:
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    # Zapis warunkowy: przechodzi tylko, jeśli zlecenie nie zmieniło się od odczytu.
+    # Równoległe przypisanie przez kogoś innego kończy się od razu 409 zamiast nadpisania.
+    try:
+        storage.update_order(order_id, {
+            'assignedTo': assignee,
             'status': 'assigned',
             'updated_at': firestore.SERVER_TIMESTAMP
-        })
-        return jsonify({"msg": "Przypisano wskazanego worker"}), 200
-    return jsonify({"msg": "Brak uprawnień"}), 403
+        }, version=version)
+    except StorageConflict:
+        return jsonify({"msg": "Zlecenie zostało zmienione w międzyczasie, spróbuj ponownie"}), 409
+    _order_changed(order_id, previous=order)
+    return jsonify({"msg": msg}), 200
 
 
 @app.route('/orders/<order_id>/report', methods=['POST'])
 @require_firebase_token
 def post_report(order_id):
     uid = request.firebase_user['uid']
-    user_doc = db.collection('users').document(uid).get()
-    user = user_doc.to_dict() if user_doc.exists else {}
-    role = user.get('role', 'worker')
+    role = _get_user_role(uid)
 
-    order_ref = db.collection('orders').document(order_id)
-    order_doc = order_ref.get()
-    if not order_doc.exists:
+    order = storage.get_order(order_id)
+    if order is None:
         return jsonify({"msg": "Zlecenie nie istnieje"}), 404
-    order = order_doc.to_dict()
 
     # RBAC: Raportować może tylko admin lub przypisany wykonawca
     if role != 'admin' and order.get('assignedTo') != uid:
@@ -262,18 +1151,15 @@ def post_report(order_id):
 
     report = {
         'authorUid': uid,
-        'authorName': user.get('displayName') or request.firebase_user.get('name'),
+        'authorName': _get_user_profile(uid).get('displayName') or request.firebase_user.get('name'),
         'text': text,
         'created_at': firestore.SERVER_TIMESTAMP
     }
 
-    # Zapis raportu do pod-kolekcji (subcollection)
-    write_result = order_ref.collection('reports').add(report)
-    try:
-        report_ref = write_result[1]
-        report_id = report_ref.id
-    except Exception:
-        report_id = None
+    # Zapis raportu razem z licznikami na zleceniu (atomowo), dzięki czemu
+    # listy admina mogą czytać 'hasReports' wprost z dokumentu zlecenia
+    report_id = storage.add_report(order_id, report)
+    _order_changed(order_id, previous=order)
 
     return jsonify({"msg": "Zapisano raport", "id": report_id}), 201
 
@@ -286,125 +1172,111 @@ def post_report(order_id):
 @require_firebase_token
 def admin_available_orders():
     uid = request.firebase_user['uid']
-    role, _ = _get_user_role(uid)
+    role = _get_user_role(uid)
     if role != 'admin':
         return jsonify({"msg": "Brak uprawnień"}), 403
 
     # Pobieranie "wolnych" zleceń
-    q = db.collection('orders') \
-        .where('status', '==', 'open') \
-        .where('assignedTo', '==', None) \
-        .order_by('created_at', direction=firestore.Query.DESCENDING)
-    docs = q.stream()
-    orders = []
-    for d in docs:
-        data = d.to_dict()
-        data['id'] = d.id
-        # Sprawdzenie obecności raportów (limit 1 dla wydajności)
-        try:
-            reports = d.reference.collection('reports').limit(1).get()
-            data['hasReports'] = len(reports) > 0
-        except Exception:
-            data['hasReports'] = False
-        orders.append(data)
-    return jsonify(orders), 200
+    filters = {'status': 'open', 'assignedTo': None}
+    try:
+        return _list_orders(filters, enrich=_add_has_reports, required_fields=['reportCount'])
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
 
 @app.route('/admin/orders/current', methods=['GET'])
 @require_firebase_token
 def admin_current_orders():
     uid = request.firebase_user['uid']
-    role, _ = _get_user_role(uid)
+    role = _get_user_role(uid)
     if role != 'admin':
         return jsonify({"msg": "Brak uprawnień"}), 403
 
-    q = db.collection('orders').order_by('created_at', direction=firestore.Query.DESCENDING)
-    docs = q.stream()
-    orders = []
-    for d in docs:
-        data = d.to_dict()
-        data['id'] = d.id
-        # Join: pobranie danych przypisanego usera (jeśli istnieje)
-        assigned_uid = data.get('assignedTo')
-        if assigned_uid:
-            user_doc = db.collection('users').document(assigned_uid).get()
-            if user_doc.exists:
-                u = user_doc.to_dict()
-                data['assignedUser'] = {
-                    'uid': assigned_uid,
-                    'displayName': u.get('displayName'),
-                    'email': u.get('email'),
-                    'trade': u.get('trade')
-                }
-            else:
-                data['assignedUser'] = {'uid': assigned_uid}
-        else:
-            data['assignedUser'] = None
-
-        try:
-            reports = d.reference.collection('reports').limit(1).get()
-            data['hasReports'] = len(reports) > 0
-        except Exception:
-            data['hasReports'] = False
-
-        orders.append(data)
-    return jsonify(orders), 200
+    try:
+        return _list_orders({}, enrich=_add_assigned_users,
+                            required_fields=['assignedTo', 'reportCount'])
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
 
 @app.route('/admin/orders', methods=['POST'])
 @require_firebase_token
 def admin_create_order():
     uid = request.firebase_user['uid']
-    role, _ = _get_user_role(uid)
+    role = _get_user_role(uid)
     if role != 'admin':
         return jsonify({"msg": "Brak uprawnień"}), 403
 
     payload = request.get_json() or {}
-    title = payload.get('title')
-    trade = payload.get('trade')
-    if not title or not trade:
-        return jsonify({"msg": "Brakuje title/trade"}), 400
+    order, error = _build_admin_order(payload, uid)
+    if error:
+        return jsonify({"msg": error}), 400
+    order_id = storage.create_order(order)
+    _order_changed(order_id)
+    return jsonify({"msg": "Utworzono zlecenie", "id": order_id}), 201
 
-    # Normalizacja narzędzi (tools) do listy stringów
-    tools_payload = payload.get('tools', [])
-    tools = []
-    try:
-        if isinstance(tools_payload, str):
-            tools = [s.strip() for s in tools_payload.split(',') if s.strip()]
-        elif isinstance(tools_payload, list):
-            tools = [str(s).strip() for s in tools_payload if str(s).strip()]
-        else:
-            tools = []
-    except Exception:
-        tools = []
 
-    order = {
-        'title': title,
-        'description': payload.get('description'),
-        'trade': trade,
-        'status': payload.get('status', 'open'),
-        'price': payload.get('price'),
-        'location': payload.get('location'),
-        'ownerUid': uid,
-        'assignedTo': payload.get('assignedTo', None),
-        'tools': tools,
-        'created_at': firestore.SERVER_TIMESTAMP,
-        'updated_at': firestore.SERVER_TIMESTAMP
-    }
-    write_result = db.collection('orders').add(order)
-    try:
-        doc_ref = write_result[1]
-        order_id = doc_ref.id
-    except Exception:
-        order_id = None
-    return jsonify({"msg": "Utworzono zlecenie", "id": order_id}), 201
+# Import wielu zleceń naraz: tablica JSON (lub {"orders": [...]}) albo NDJSON (jedno zlecenie na linię).
+# Każda pozycja przechodzi tę samą walidację co POST /admin/orders; poprawne są zapisywane
+# batchami (w Firestore po 500 operacji, commitowane równolegle). Odpowiedź zawiera wynik
+# dla każdej pozycji (index + id albo error) w kolejności wejścia.
+@app.route('/admin/orders/bulk', methods=['POST'])
+@require_firebase_token
+def admin_bulk_create_orders():
+    uid = request.firebase_user['uid']
+    role = _get_user_role(uid)
+    if role != 'admin':
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = _parse_ndjson_items(request.stream)
+    else:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('orders')
+        if not isinstance(payload, list):
+            return jsonify({"msg": "Oczekiwano tablicy zleceń albo NDJSON"}), 400
+        items = ((item, None) for item in payload)
+
+    results = []
+    pending = []
+    for index, (item, error) in enumerate(items):
+        if index >= MAX_BULK_ORDERS:
+            return jsonify({"msg": f"Maksymalnie {MAX_BULK_ORDERS} zleceń w jednym żądaniu"}), 413
+        if error is None:
+            order, error = _build_admin_order(item, uid)
+        if error:
+            results.append({'index': index, 'error': error})
+            continue
+        order_id = storage.new_order_id()
+        results.append({'index': index, 'id': order_id})
+        pending.append((order_id, order))
+
+    # Batch jest atomowy - pozycje z nieudanego commitu dostają 'error' zamiast 'id'
+    failed_ids = storage.write_orders(pending)
+    for result in results:
+        if result.get('id') in failed_ids:
+            del result['id']
+            result['error'] = "Błąd zapisu"
+    if not orders_cache_enabled:
+        # Wiele zleceń naraz - taniej przebudować feedy dotkniętych branż i indeks wyszukiwania
+        # przy następnym odczycie, a klientom strumieni wysłać 'reset' niż rozsyłać każde zlecenie osobno
+        for trade in {order['trade'] for _, order in pending}:
+            feeds.invalidate(trade)
+        search_index.clear()
+        order_events.reset()
+
+    created = sum(1 for r in results if 'id' in r)
+    failed = len(results) - created
+    code = 201 if not failed else (207 if created else 400)
+    return jsonify({"created": created, "failed": failed, "results": results}), code
 
 
 @app.route('/admin/users', methods=['POST'])
 @require_firebase_token
 def admin_create_user():
     uid = request.firebase_user['uid']
-    role, _ = _get_user_role(uid)
+    role = _get_user_role(uid)
     if role != 'admin':
         return jsonify({"msg": "Brak uprawnień"}), 403
 
@@ -436,47 +1308,98 @@ def admin_create_user():
             'trade': trade,
             'created_at': firestore.SERVER_TIMESTAMP
         }
-        db.collection('users').document(new_user.uid).set(profile, merge=True)
+        storage.set_user(new_user.uid, profile)
+        _invalidate_user_profile(new_user.uid)
         return jsonify({"msg": "Utworzono użytkownika", "uid": new_user.uid}), 201
     except Exception as e:
         logger.exception("Błąd tworzenia użytkownika: %s", e)
         return jsonify({"msg": "Błąd tworzenia użytkownika", "error": str(e)}), 400
 
 
+# Odwołanie sesji użytkownika: unieważnia refresh tokeny w Firebase i czyści cache tokenów
+@app.route('/admin/users/<user_uid>/revoke', methods=['POST'])
+@require_firebase_token
+def admin_revoke_user_tokens(user_uid):
+    uid = request.firebase_user['uid']
+    role = _get_user_role(uid)
+    if role != 'admin':
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    try:
+        auth.revoke_refresh_tokens(user_uid)
+    except Exception as e:
+        logger.exception("Błąd odwoływania tokenów %s: %s", user_uid, e)
+        return jsonify({"msg": "Błąd odwoływania tokenów", "error": str(e)}), 400
+    _mark_tokens_revoked(user_uid)
+    removed = _invalidate_cached_tokens(user_uid)
+    _invalidate_user_profile(user_uid)
+    return jsonify({"msg": "Odwołano sesje użytkownika", "cachedTokensRemoved": removed}), 200
+
+
 @app.route('/admin/orders/<order_id>/reports', methods=['GET'])
 @require_firebase_token
 def admin_order_reports(order_id):
     uid = request.firebase_user['uid']
-    role, _ = _get_user_role(uid)
+    role = _get_user_role(uid)
     if role != 'admin':
         return jsonify({"msg": "Brak uprawnień"}), 403
 
-    order_ref = db.collection('orders').document(order_id)
-    if not order_ref.get().exists:
+    try:
+        limit = _page_limit(request.args)
+        page_token = request.args.get('page_token')
+        cursor = _decode_page_token(page_token) if page_token else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    if storage.get_order(order_id, fields=[]) is None:
         return jsonify({"msg": "Zlecenie nie istnieje"}), 404
 
-    reports_q = order_ref.collection('reports').order_by('created_at', direction=firestore.Query.DESCENDING)
-    docs = reports_q.stream()
-    reports = []
-    for d in docs:
-        data = d.to_dict()
-        # Serializacja daty: konwersja obiektu Firestore Timestamp na string ISO dla JSON
-        ca = data.get('created_at')
-        if ca is not None:
-            try:
-                if hasattr(ca, 'to_datetime'):
-                    data['created_at'] = ca.to_datetime().isoformat()
-                elif isinstance(ca, datetime):
-                    data['created_at'] = ca.isoformat()
-                else:
-                    data['created_at'] = str(ca)
-            except Exception:
-                data['created_at'] = str(ca)
-        reports.append({
-            'id': d.id,
-            'data': data
-        })
-    return jsonify(reports), 200
+    # Strona raportów (najnowsze najpierw) - o jeden dłuższa niż limit, żeby wiedzieć, czy jest następna
+    after = (cursor['created_at'], cursor['__name__']) if cursor else None
+    rows = storage.list_reports(order_id, after=after, limit=limit + 1)
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_token = _encode_page_token({'created_at': rows[-1][1].get('created_at'), 'id': rows[-1][0]})
+    reports = [_report_to_json(report_id, data) for report_id, data in rows]
+
+    etag = _reports_etag(request.full_path, reports, next_token)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    return _page_response(reports, next_token, etag)
+
+
+# Najnowsze raporty ze wszystkich zleceń jednym zapytaniem (collection_group) zamiast zapytania per zlecenie.
+# Stronami jak listy zleceń (?limit=, ?page_token=, token w X-Next-Page-Token), filtry: ?author=, ?order_id=.
+@app.route('/admin/reports', methods=['GET'])
+@require_firebase_token
+def admin_reports():
+    uid = request.firebase_user['uid']
+    role = _get_user_role(uid)
+    if role != 'admin':
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    try:
+        limit = _page_limit(request.args)
+        page_token = request.args.get('page_token')
+        after = _decode_report_token(page_token) if page_token else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    rows = list(storage.query_reports(_report_filters(request.args), after=after, limit=limit + 1))
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        order_id, report_id, data = rows[-1]
+        next_token = _encode_report_token(data.get('created_at'), order_id, report_id)
+    reports = [_report_to_json(report_id, data, order_id) for order_id, report_id, data in rows]
+
+    etag = _reports_etag(request.full_path, reports, next_token)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    return _page_response(reports, next_token, etag)
 
 
 if __name__ == '__main__':
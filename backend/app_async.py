@@ -0,0 +1,854 @@
+#!/usr/bin/env python3
+# backend/app_async.py - wariant ASGI backendu (Quart + asynchroniczny klient Firestore).
+# Te same trasy co app.py, ale żaden wątek nie czeka bezczynnie na odpowiedź Firestore,
+# a niezależne odczyty (np. rola użytkownika i dokument zlecenia) idą równolegle.
+#
+# Uruchomienie:  hypercorn app_async:app --bind 0.0.0.0:8000
+#           lub:  python app_async.py
+#
+# Konfiguracja, weryfikacja tokenów, cache i helpery (paginacja, projekcja, ETag) pochodzą z app.py,
+# dzięki czemu oba warianty zachowują się identycznie.
+import asyncio
+import time
+from functools import wraps
+
+from quart import Quart, Response, g, request, jsonify
+from quart.wrappers.response import DataBody, IterableBody
+from quart_cors import cors
+from firebase_admin import auth, firestore, firestore_async
+from google.api_core.exceptions import FailedPrecondition
+
+import app as core
+import jsoncodec
+import metrics
+from app import logger
+from compression import encoded_etag, match_etag
+from feeds import FEED_STATUS
+from order_events import format_sse
+from storage import BATCH_SIZE
+from token_verifier import CertificatesUnavailableError, TokenTimeError, UnknownKeyError
+
+# Wariant async działa wyłącznie na Firestore (AsyncClient), niezależnie od STORAGE_BACKEND
+adb = firestore_async.client()
+
+app = Quart(__name__)
+app.json = jsoncodec.FirestoreJSONProvider(app)
+app = cors(app, allow_origin='*', expose_headers=['X-Next-Page-Token', 'X-Total-Count', 'ETag'])
+
+
+# Weryfikacja bez blokowania pętli: zwykle w miejscu, a na odświeżenie certyfikatów (nieznany 'kid',
+# brak certyfikatów) czekamy w wątku
+async def _verify_id_token(id_token):
+    try:
+        return core._verify_id_token(id_token, refresh_wait=0)
+    except (UnknownKeyError, CertificatesUnavailableError):
+        return await asyncio.to_thread(core._verify_id_token, id_token)
+
+
+# Dekorator autoryzacji (wersja async) - cache tokenów i weryfikator współdzielone z app.py
+def require_firebase_token(fn):
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        header = request.headers.get('Authorization', '')
+        if not header or not header.startswith('Bearer '):
+            logger.warning("Brak nagłówka Authorization")
+            return jsonify({"msg": "Brak tokena"}), 401
+        id_token = header.split(' ', 1)[1]
+
+        cache_key = core._token_cache_key(id_token)
+        decoded = core.token_cache.get(cache_key)
+        cached = decoded is not None
+        if not cached:
+            try:
+                decoded = await _verify_id_token(id_token)
+            except TokenTimeError as e:
+                logger.error("Weryfikacja nieudana (błąd czasu): %s", e)
+                return jsonify({"msg": "Token nieprawidłowy (błąd czasu)", "error": str(e)}), 401
+            except CertificatesUnavailableError as e:
+                logger.error("Brak certyfikatów do weryfikacji tokena: %s", e)
+                return jsonify({"msg": "Weryfikacja tokenów chwilowo niedostępna, spróbuj za chwilę"}), 503
+            except Exception as e:
+                logger.error("Błąd weryfikacji tokena (nie czasowy): %s", e)
+                return jsonify({"msg": "Nieprawidłowy token", "error": str(e)}), 401
+        # Odwołanie sesji sprawdzane przy każdym żądaniu; odczyt z Firebase Auth (rzadki) w wątku.
+        # Porównujemy z raz odczytaną wartością - core._is_token_revoked mógłby po wygaśnięciu wpisu
+        # wywołać auth.get_user w pętli zdarzeń
+        valid_after = core.tokens_valid_after.get(decoded.get('uid'))
+        if valid_after is None and core.TOKEN_REVOCATION_CHECK:
+            try:
+                valid_after = await asyncio.to_thread(core._tokens_valid_after, decoded.get('uid'))
+            except Exception as e:
+                logger.error("Nie udało się sprawdzić odwołania sesji %s: %s", decoded.get('uid'), e)
+                return jsonify({"msg": "Nie można sprawdzić ważności sesji, spróbuj za chwilę"}), 503
+        if decoded.get('iat', 0) < (valid_after or 0):
+            return jsonify({"msg": "Token odwołany"}), 401
+        if not cached:
+            core.token_cache.set(cache_key, decoded, expires_at=decoded.get('exp'))
+        request.firebase_user = decoded
+        return await fn(*args, **kwargs)
+    return wrapper
+
+
+# Helper: Profil użytkownika (ten sam cache co w app.py, odczyt przez klienta async)
+async def _get_user_profile(uid):
+    profile = core.profile_cache.get(uid)
+    if profile is not None:
+        return profile
+    try:
+        doc = await adb.collection('users').document(uid).get()
+    except Exception:
+        logger.exception("Błąd przy pobieraniu profilu użytkownika %s", uid)
+        return {}
+    profile = doc.to_dict() if doc.exists else {}
+    core.profile_cache.set(uid, profile, expires_at=time.time() + core.PROFILE_CACHE_TTL)
+    return profile
+
+
+async def _get_profile_with_doc(uid, doc_ref):
+    profile = core.profile_cache.get(uid)
+    if profile is not None:
+        return profile, await doc_ref.get()
+    user_ref = adb.collection('users').document(uid)
+    snaps = {snap.reference.path: snap async for snap in adb.get_all([user_ref, doc_ref])}
+    user_doc = snaps[user_ref.path]
+    profile = user_doc.to_dict() if user_doc.exists else {}
+    core.profile_cache.set(uid, profile, expires_at=time.time() + core.PROFILE_CACHE_TTL)
+    return profile, snaps[doc_ref.path]
+
+
+async def _get_user_role(uid):
+    role = core._role_from_claims(getattr(request, 'firebase_user', None), uid)
+    return role or (await _get_user_profile(uid)).get('role', 'worker')
+
+
+async def _is_admin():
+    return await _get_user_role(request.firebase_user['uid']) == 'admin'
+
+
+async def _get_users_by_uid(uids):
+    uids = [u for u in set(uids) if u]
+    if not uids:
+        return {}
+    refs = [adb.collection('users').document(u) for u in uids]
+    return {snap.id: snap.to_dict() async for snap in adb.get_all(refs) if snap.exists}
+
+
+async def _add_has_reports(orders):
+    core._add_has_reports(orders)
+
+
+async def _add_assigned_users(orders):
+    users = await _get_users_by_uid(data.get('assignedTo') for data in orders)
+    core._apply_assigned_users(orders, users)
+
+
+# Helper: Po zapisie zlecenia - jak _order_changed w app.py. Bez listenera cache zleceń
+# (ORDERS_CACHE=0, magazyn memory/sqlite) nic innego nie powiadomi feedów, indeksu wyszukiwania
+# i strumieni SSE, więc rozsyłamy zmianę sami (stan po zapisie czytany przez AsyncClient).
+async def _order_changed(order_id, previous=None):
+    if core.orders_cache_enabled:
+        return
+    try:
+        doc = await adb.collection('orders').document(order_id).get()
+        core._on_order_change(order_id, doc.to_dict() if doc.exists else None, previous)
+    except Exception:
+        logger.exception("Nie udało się rozesłać zmiany zlecenia %s", order_id)
+        core._on_orders_reset()
+
+
+# Helper: Źródło strony zleceń - cache w pamięci (wspólny z app.py) albo zapytanie AsyncClient.
+# Zwraca listę (limit+1) albo asynchroniczny iterator; parametry walidowane od razu (ValueError).
+def _order_page_source(filters, limit, required_fields=()):
+    projection = core._projection(request.args, required_fields)
+    page_token = request.args.get('page_token')
+    cursor = core._decode_page_token(page_token) if page_token else None
+
+    if core.orders_cache.is_healthy():
+        after = (cursor['created_at'], cursor['__name__']) if cursor else None
+        orders = core.orders_cache.query(filters, after=after, limit=limit + 1)
+        if projection is not None:
+            orders = [core._project(o, projection) for o in orders]
+        return _aiter_list(orders)
+
+    q = adb.collection('orders')
+    for field, value in filters.items():
+        q = q.where(field, '==', value)
+    if projection is not None:
+        q = q.select(projection)
+    q = q.order_by('created_at', direction=firestore.Query.DESCENDING) \
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+    if cursor:
+        q = q.start_after(cursor)
+    return _aiter_docs(q.limit(limit + 1).stream())
+
+
+def _doc_to_order(d):
+    data = d.to_dict()
+    data['id'] = d.id
+    return data
+
+
+async def _aiter_list(items):
+    for item in items:
+        yield item
+
+
+async def _aiter_docs(stream):
+    async for d in stream:
+        yield _doc_to_order(d)
+
+
+async def _fetch_order_page(filters, required_fields=()):
+    limit = core._page_limit(request.args)
+    orders = [o async for o in _order_page_source(filters, limit, required_fields)]
+    next_token = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_token = core._encode_page_token(orders[-1])
+    return orders, next_token
+
+
+def _not_modified(etag):
+    matched = match_etag(request.if_none_match, etag)
+    if matched is None:
+        return None
+    resp = Response('', status=304)
+    resp.set_etag(matched)
+    return resp
+
+
+# Strumieniowanie strony (ten sam format co w app.py: koperta JSON albo NDJSON z tokenem na końcu)
+def _stream_order_page(filters, enrich=None, required_fields=()):
+    limit = core._page_limit(request.args, core.MAX_STREAM_PAGE_SIZE)
+    docs = _order_page_source(filters, limit, required_fields)
+    ndjson = core._wants_ndjson(request.args, request.headers)
+    dumps = app.json.dumps
+
+    async def generate():
+        yield '' if ndjson else '{"orders":['
+        first = True
+        last = None
+        has_more = False
+        chunk = []
+        count = 0
+
+        async def flush(chunk):
+            if enrich:
+                await enrich(chunk)
+            out = []
+            for data in chunk:
+                out.append(dumps(data) + '\n' if ndjson else ('' if first and not out else ',') + dumps(data))
+            return ''.join(out)
+
+        async for data in docs:
+            if count == limit:
+                has_more = True
+                break
+            count += 1
+            chunk.append(data)
+            if len(chunk) >= core.STREAM_CHUNK_SIZE:
+                yield await flush(chunk)
+                first = False
+                last = chunk[-1]
+                chunk = []
+        if chunk:
+            yield await flush(chunk)
+            last = chunk[-1]
+        next_token = core._encode_page_token(last) if has_more else None
+        if ndjson:
+            if next_token:
+                yield dumps({'next_page_token': next_token}) + '\n'
+        else:
+            yield '],"next_page_token":' + dumps(next_token) + '}'
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(generate(), mimetype=mimetype)
+
+
+async def _list_orders(filters, enrich=None, required_fields=()):
+    if core._wants_stream(request.args, request.headers):
+        return _stream_order_page(filters, enrich, required_fields)
+    orders, next_token = await _fetch_order_page(filters, required_fields)
+    if enrich:
+        await enrich(orders)
+    etag = core._compute_etag(request.full_path, orders, next_token)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    resp = jsoncodec.response(orders, Response)
+    if next_token:
+        resp.headers['X-Next-Page-Token'] = next_token
+    resp.set_etag(etag)
+    return resp
+
+
+# Helper: lista dla admina - najpierw rola (bez uprawnień nie czytamy zleceń), potem odczyt listy.
+# ValueError z parametrów -> 400.
+async def _admin_list(filters, enrich, required_fields):
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+    try:
+        return await _list_orders(filters, enrich, required_fields)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+
+# Metryki per żądanie - te same histogramy co w app.py (wspólny rejestr, GET /_debug/metrics).
+# Odczyty idą przez AsyncClient, a nie InstrumentedStorage, więc bez liczników operacji na magazynie.
+# Odpowiedzi strumieniowe są mierzone dopiero po wysłaniu ostatniego fragmentu.
+@app.before_request
+async def _start_request_metrics():
+    g.request_stats = metrics.RequestStats(ops=())
+
+
+@app.after_request
+async def _record_request_metrics(response):
+    stats = g.get('request_stats')
+    if stats is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    method = request.method
+    if not isinstance(response.response, IterableBody):
+        metrics.observe_request(stats, route, method, response.status_code, response.content_length)
+        return response
+
+    async def counting(chunks):
+        sent = 0
+        try:
+            async for chunk in chunks:
+                sent += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            # Rozłączenie klienta: zamknięcie przekazywane do generatora endpointu (sprzątanie w finally)
+            if hasattr(chunks, 'aclose'):
+                await chunks.aclose()
+            metrics.observe_request(stats, route, method, response.status_code, sent)
+
+    response.response = IterableBody(counting(response.response.iter))
+    return response
+
+
+# Kompresja odpowiedzi (jak w app.py) - wspólny cache skompresowanych treści.
+# Hook rejestrowany po metrykach, więc wykonuje się przed nimi (metryki widzą rozmiar po kompresji).
+@app.after_request
+async def _compress_response(response):
+    # Tylko treści w pamięci (DataBody) - generatory (strumienie, SSE) idą bez zmian
+    if (response.status_code != 200 or not isinstance(response.response, DataBody)
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    body = await response.get_data()
+    encoded = core.compressor.encode(body, request.accept_encodings, response.mimetype, etag)
+    if encoded is None:
+        return response
+    encoding, data = encoded
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak)
+    return response
+
+
+# Endpoint Debug: metryki w formacie Prometheusa (scrape)
+@app.route('/_debug/metrics', methods=['GET'])
+async def debug_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/_debug/sa_project', methods=['GET'])
+async def debug_sa_project():
+    return jsonify({"service_account_project_id": core.SA_PROJECT_ID}), 200
+
+
+@app.route('/_debug/token_cache', methods=['GET'])
+async def debug_token_cache():
+    return jsonify(core.token_cache.stats()), 200
+
+
+@app.route('/_debug/orders_cache', methods=['GET'])
+async def debug_orders_cache():
+    return jsonify(core.orders_cache.stats()), 200
+
+
+@app.route('/_debug/verify_token', methods=['POST'])
+async def debug_verify_token():
+    data = await request.get_json() or {}
+    token = data.get('token')
+    if not token:
+        return jsonify({"msg": "Brakuje tokena w body"}), 400
+    try:
+        decoded = await _verify_id_token(token)
+        return jsonify({"ok": True, "decoded": decoded}), 200
+    except Exception as e:
+        logger.error("Debug verify failed: %s", e)
+        return jsonify({"ok": False, "error": str(e)}), 401
+
+
+@app.route('/me', methods=['GET'])
+@require_firebase_token
+async def me():
+    uid = request.firebase_user['uid']
+    profile = await _get_user_profile(uid)
+    if profile:
+        return jsonify(profile), 200
+    basic = {
+        'uid': uid,
+        'email': request.firebase_user.get('email'),
+        'name': request.firebase_user.get('name'),
+        'role': 'worker'
+    }
+    return jsonify(basic), 200
+
+
+@app.route('/orders', methods=['GET'])
+async def get_orders():
+    trade = request.args.get('trade')
+    status = request.args.get('status')
+    filters = {}
+    if trade:
+        filters['trade'] = trade
+    if status:
+        filters['status'] = status
+    try:
+        return await _list_orders(filters)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+
+# Strumień zmian zleceń (SSE, jak w app.py) - wspólne źródło zdarzeń z app.py, ale połączenie
+# nie zajmuje wątku: listener budzi pętlę asyncio przez call_soon_threadsafe. Zapisy tego wariantu
+# docierają do strumieni przez listener cache zleceń, a bez niego przez _order_changed.
+@app.route('/orders/stream', methods=['GET'])
+@require_firebase_token
+async def stream_orders():
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    sub = core.order_events.subscribe(core._stream_filters(request.args),
+                                      on_ready=lambda: loop.call_soon_threadsafe(ready.set))
+    if sub is None:
+        return jsonify({"msg": "Zbyt wiele otwartych strumieni"}), 503
+
+    async def generate():
+        try:
+            yield f'retry: {core.SSE_RETRY_MS}\n\n'
+            while True:
+                try:
+                    await asyncio.wait_for(ready.wait(), core.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                ready.clear()
+                for seq, event, data in sub.drain():
+                    yield format_sse(seq, event, data)
+        finally:
+            core.order_events.unsubscribe(sub)
+
+    resp = Response(generate(), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    resp.timeout = None
+    return resp, 200
+
+
+# Wyszukiwanie pełnotekstowe (jak w app.py) - wspólny indeks w pamięci; ewentualna budowa indeksu
+# (odczyt całej kolekcji) w wątku, żeby nie blokować pętli
+@app.route('/orders/search', methods=['GET'])
+async def search_orders():
+    try:
+        query, filters, limit, offset, fields = core._search_params(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if not await asyncio.to_thread(core._ensure_search_index):
+        return jsonify({"msg": "Indeks wyszukiwania jest w trakcie budowy, spróbuj za chwilę"}), 503
+
+    total, hits = core.search_index.search(query, filters, limit=limit, offset=offset)
+    resp = jsoncodec.response(core._search_results(hits, fields), Response)
+    resp.headers['X-Total-Count'] = str(total)
+    return resp, 200
+
+
+# Feed workera (jak w app.py). Aktualizuje go listener cache zleceń, a bez listenera _order_changed
+# przy zapisach tego procesu (zmiany innych procesów ogranicza FEED_MAX_AGE).
+@app.route('/feed', methods=['GET'])
+@require_firebase_token
+async def get_feed():
+    uid = request.firebase_user['uid']
+    trade = (await _get_user_profile(uid)).get('trade')
+    if request.args.get('trade') and await _get_user_role(uid) == 'admin':
+        trade = request.args['trade']
+    if not trade:
+        return jsonify({"msg": "Brak branży w profilu"}), 400
+
+    dumps = jsoncodec.dumps
+    live = not core.orders_cache_enabled or core.orders_cache.is_healthy()
+    rendered = core.feeds.get(trade, dumps) if live else None
+    if rendered is None:
+        generation = core.feeds.generation(trade) if live else None
+        if core.orders_cache_enabled and live:
+            orders = core.orders_cache.query({'trade': trade, 'status': FEED_STATUS}, limit=core.FEED_SIZE + 1)
+        else:
+            q = adb.collection('orders').where('trade', '==', trade).where('status', '==', FEED_STATUS) \
+                .order_by('created_at', direction=firestore.Query.DESCENDING) \
+                .order_by('__name__', direction=firestore.Query.DESCENDING)
+            orders = [_doc_to_order(d) async for d in q.limit(core.FEED_SIZE + 1).stream()]
+        rendered = core.feeds.load(trade, orders, generation, dumps)
+
+    body, etag, _ = rendered
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp, 200
+
+
+@app.route('/orders/<order_id>', methods=['GET'])
+async def get_order(order_id):
+    try:
+        fields = core._requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if core.orders_cache.is_healthy():
+        data = core.orders_cache.get(order_id)
+        if data is None:
+            return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+        data['id'] = order_id
+        return jsoncodec.response(data if fields is None else core._project(data, fields), Response)
+
+    doc = await adb.collection('orders').document(order_id).get(field_paths=fields)
+    if not doc.exists:
+        return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+    return jsoncodec.response(_doc_to_order(doc), Response)
+
+
+@app.route('/orders', methods=['POST'])
+@require_firebase_token
+async def create_order():
+    payload = await request.get_json() or {}
+    fields, error = core._order_fields(payload)
+    if error:
+        return jsonify({"msg": error}), 400
+    title, trade, status = fields
+    order = {
+        'title': title,
+        'description': payload.get('description'),
+        'trade': trade,
+        'status': status,
+        'price': payload.get('price'),
+        'location': payload.get('location'),
+        'ownerUid': request.firebase_user['uid'],
+        'assignedTo': None,
+        'created_at': firestore.SERVER_TIMESTAMP,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+    _, doc_ref = await adb.collection('orders').add(order)
+    await _order_changed(doc_ref.id)
+    return jsonify({"id": doc_ref.id}), 201
+
+
+@app.route('/orders/<order_id>/assign', methods=['POST'])
+@require_firebase_token
+async def assign_order(order_id):
+    uid = request.firebase_user['uid']
+    order_ref = adb.collection('orders').document(order_id)
+    profile, order_doc = await _get_profile_with_doc(uid, order_ref)
+    if not order_doc.exists:
+        return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+    order = order_doc.to_dict()
+    role = core._role_from_claims(request.firebase_user, uid) or profile.get('role', 'worker')
+
+    if role == 'worker':
+        if profile.get('trade') != order.get('trade'):
+            return jsonify({"msg": "Branża nie pasuje"}), 403
+        if order.get('assignedTo') not in (None, uid):
+            return jsonify({"msg": "Zlecenie zostało już przypisane"}), 409
+        assignee, msg = uid, "Przypisano użytkownika"
+    elif role == 'admin':
+        data = await request.get_json() or {}
+        worker_uid = data.get('worker_uid')
+        if not worker_uid:
+            return jsonify({"msg": "Brakuje worker_uid"}), 400
+        assignee, msg = worker_uid, "Przypisano wskazanego worker"
+    else:
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    # Zapis warunkowy (precondition na update_time) - jak w app.py
+    try:
+        await order_ref.update({
+            'assignedTo': assignee,
+            'status': 'assigned',
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }, option=adb.write_option(last_update_time=order_doc.update_time))
+    except FailedPrecondition:
+        return jsonify({"msg": "Zlecenie zostało zmienione w międzyczasie, spróbuj ponownie"}), 409
+    await _order_changed(order_id, previous=order)
+    return jsonify({"msg": msg}), 200
+
+
+@app.route('/orders/<order_id>/report', methods=['POST'])
+@require_firebase_token
+async def post_report(order_id):
+    uid = request.firebase_user['uid']
+    order_ref = adb.collection('orders').document(order_id)
+    # Profil (rola i displayName) i zlecenie jednym odczytem wsadowym
+    profile, order_doc = await _get_profile_with_doc(uid, order_ref)
+    if not order_doc.exists:
+        return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+    order = order_doc.to_dict()
+    role = core._role_from_claims(request.firebase_user, uid) or profile.get('role', 'worker')
+
+    if role != 'admin' and order.get('assignedTo') != uid:
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    payload = await request.get_json() or {}
+    text = payload.get('text')
+    if not text or not str(text).strip():
+        return jsonify({"msg": "Brakuje treści raportu"}), 400
+
+    report = {
+        'authorUid': uid,
+        'authorName': profile.get('displayName') or request.firebase_user.get('name'),
+        'text': text,
+        'created_at': firestore.SERVER_TIMESTAMP
+    }
+    report_ref = order_ref.collection('reports').document()
+    batch = adb.batch()
+    batch.set(report_ref, report)
+    batch.update(order_ref, {
+        'reportCount': firestore.Increment(1),
+        'lastReportAt': firestore.SERVER_TIMESTAMP
+    })
+    await batch.commit()
+    await _order_changed(order_id, previous=order)
+    return jsonify({"msg": "Zapisano raport", "id": report_ref.id}), 201
+
+
+@app.route('/admin/orders/available', methods=['GET'])
+@require_firebase_token
+async def admin_available_orders():
+    return await _admin_list({'status': 'open', 'assignedTo': None}, _add_has_reports, ['reportCount'])
+
+
+@app.route('/admin/orders/current', methods=['GET'])
+@require_firebase_token
+async def admin_current_orders():
+    return await _admin_list({}, _add_assigned_users, ['assignedTo', 'reportCount'])
+
+
+@app.route('/admin/orders', methods=['POST'])
+@require_firebase_token
+async def admin_create_order():
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+    payload = await request.get_json() or {}
+    order, error = core._build_admin_order(payload, request.firebase_user['uid'])
+    if error:
+        return jsonify({"msg": error}), 400
+    _, doc_ref = await adb.collection('orders').add(order)
+    await _order_changed(doc_ref.id)
+    return jsonify({"msg": "Utworzono zlecenie", "id": doc_ref.id}), 201
+
+
+# Import wielu zleceń (format i walidacja jak w app.py); batche commitowane współbieżnie
+@app.route('/admin/orders/bulk', methods=['POST'])
+@require_firebase_token
+async def admin_bulk_create_orders():
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+    uid = request.firebase_user['uid']
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = core._parse_ndjson_items((await request.get_data()).splitlines())
+    else:
+        payload = await request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('orders')
+        if not isinstance(payload, list):
+            return jsonify({"msg": "Oczekiwano tablicy zleceń albo NDJSON"}), 400
+        items = ((item, None) for item in payload)
+
+    results = []
+    pending = []
+    for index, (item, error) in enumerate(items):
+        if index >= core.MAX_BULK_ORDERS:
+            return jsonify({"msg": f"Maksymalnie {core.MAX_BULK_ORDERS} zleceń w jednym żądaniu"}), 413
+        if error is None:
+            order, error = core._build_admin_order(item, uid)
+        if error:
+            results.append({'index': index, 'error': error})
+            continue
+        ref = adb.collection('orders').document()
+        results.append({'index': index, 'id': ref.id})
+        pending.append((ref, order, results[-1]))
+
+    async def commit(chunk):
+        batch = adb.batch()
+        for ref, order, _ in chunk:
+            batch.set(ref, order)
+        try:
+            await batch.commit()
+        except Exception as e:
+            logger.exception("Błąd zapisu batcha zleceń: %s", e)
+            for _, _, result in chunk:
+                del result['id']
+                result['error'] = "Błąd zapisu"
+
+    size = BATCH_SIZE
+    await asyncio.gather(*(commit(pending[i:i + size]) for i in range(0, len(pending), size)))
+    if not core.orders_cache_enabled:
+        # Jak w app.py: feedy dotkniętych branż i indeks przebudowane przy następnym odczycie, strumienie dostają 'reset'
+        for trade in {order['trade'] for _, order, _ in pending}:
+            core.feeds.invalidate(trade)
+        core.search_index.clear()
+        core.order_events.reset()
+
+    created = sum(1 for r in results if 'id' in r)
+    failed = len(results) - created
+    code = 201 if not failed else (207 if created else 400)
+    return jsonify({"created": created, "failed": failed, "results": results}), code
+
+
+@app.route('/admin/users', methods=['POST'])
+@require_firebase_token
+async def admin_create_user():
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    data = await request.get_json() or {}
+    email = data.get('email')
+    password = data.get('password')
+    display_name = data.get('displayName', '')
+    trade = data.get('trade', '')
+    new_role = data.get('role', 'worker')
+    if not email or not password:
+        return jsonify({"msg": "Brakuje email/password"}), 400
+
+    try:
+        # SDK Auth jest synchroniczne - wywołania HTTP idą do puli wątków, pętla zdarzeń nie czeka
+        new_user = await asyncio.to_thread(
+            auth.create_user, email=email, password=password, display_name=display_name)
+        try:
+            await asyncio.to_thread(auth.set_custom_user_claims, new_user.uid, {'role': new_role})
+        except Exception:
+            logger.warning("Nie udało się ustawić custom claims dla %s", new_user.uid)
+        profile = {
+            'email': email,
+            'displayName': display_name,
+            'role': new_role,
+            'trade': trade,
+            'created_at': firestore.SERVER_TIMESTAMP
+        }
+        await adb.collection('users').document(new_user.uid).set(profile, merge=True)
+        core._invalidate_user_profile(new_user.uid)
+        return jsonify({"msg": "Utworzono użytkownika", "uid": new_user.uid}), 201
+    except Exception as e:
+        logger.exception("Błąd tworzenia użytkownika: %s", e)
+        return jsonify({"msg": "Błąd tworzenia użytkownika", "error": str(e)}), 400
+
+
+@app.route('/admin/users/<user_uid>/revoke', methods=['POST'])
+@require_firebase_token
+async def admin_revoke_user_tokens(user_uid):
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+    try:
+        await asyncio.to_thread(auth.revoke_refresh_tokens, user_uid)
+    except Exception as e:
+        logger.exception("Błąd odwoływania tokenów %s: %s", user_uid, e)
+        return jsonify({"msg": "Błąd odwoływania tokenów", "error": str(e)}), 400
+    core._mark_tokens_revoked(user_uid)
+    removed = core._invalidate_cached_tokens(user_uid)
+    core._invalidate_user_profile(user_uid)
+    return jsonify({"msg": "Odwołano sesje użytkownika", "cachedTokensRemoved": removed}), 200
+
+
+@app.route('/admin/orders/<order_id>/reports', methods=['GET'])
+@require_firebase_token
+async def admin_order_reports(order_id):
+    try:
+        limit = core._page_limit(request.args)
+        page_token = request.args.get('page_token')
+        cursor = core._decode_page_token(page_token) if page_token else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    order_ref = adb.collection('orders').document(order_id)
+    reports_q = order_ref.collection('reports').order_by('created_at', direction=firestore.Query.DESCENDING) \
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+    if cursor:
+        reports_q = reports_q.start_after(cursor)
+
+    async def load_reports():
+        return [(d.id, d.to_dict()) async for d in reports_q.limit(limit + 1).stream()]
+
+    # Najpierw rola - bez uprawnień nie czytamy danych; potem zlecenie i raporty naraz
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+    order_doc, rows = await asyncio.gather(order_ref.get(), load_reports())
+    if not order_doc.exists:
+        return jsonify({"msg": "Zlecenie nie istnieje"}), 404
+
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_token = core._encode_page_token({'created_at': rows[-1][1].get('created_at'), 'id': rows[-1][0]})
+    reports = [core._report_to_json(report_id, data) for report_id, data in rows]
+    return _reports_response(reports, next_token)
+
+
+# Najnowsze raporty ze wszystkich zleceń (collection_group) - jak GET /admin/reports w app.py
+@app.route('/admin/reports', methods=['GET'])
+@require_firebase_token
+async def admin_reports():
+    try:
+        limit = core._page_limit(request.args)
+        page_token = request.args.get('page_token')
+        after = core._decode_report_token(page_token) if page_token else None
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if not await _is_admin():
+        return jsonify({"msg": "Brak uprawnień"}), 403
+
+    filters = core._report_filters(request.args)
+    order_id = filters.pop('order_id', None)
+    if order_id is not None:
+        q = adb.collection('orders').document(order_id).collection('reports')
+    else:
+        q = adb.collection_group('reports')
+    for field, value in filters.items():
+        q = q.where(field, '==', value)
+    q = q.order_by('created_at', direction=firestore.Query.DESCENDING) \
+        .order_by('__name__', direction=firestore.Query.DESCENDING)
+    if after is not None:
+        ref = adb.collection('orders').document(after[1]).collection('reports').document(after[2])
+        q = q.start_after({'created_at': after[0], '__name__': ref})
+
+    async def load_reports():
+        return [(d.reference.parent.parent.id, d.id, d.to_dict()) async for d in q.limit(limit + 1).stream()]
+
+    rows = await load_reports()
+
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        order_id, report_id, data = rows[-1]
+        next_token = core._encode_report_token(data.get('created_at'), order_id, report_id)
+    reports = [core._report_to_json(report_id, data, order_id) for order_id, report_id, data in rows]
+    return _reports_response(reports, next_token)
+
+
+def _reports_response(reports, next_token):
+    etag = core._reports_etag(request.full_path, reports, next_token)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    resp = jsoncodec.response(reports, Response)
+    if next_token:
+        resp.headers['X-Next-Page-Token'] = next_token
+    resp.set_etag(etag)
+    return resp
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=8000)
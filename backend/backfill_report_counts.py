@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Skrypt jednorazowy: uzupełnia pola reportCount / lastReportAt na istniejących zleceniach.
+# Nowe raporty aktualizują te pola same (post_report), skrypt jest potrzebny tylko dla starszych danych.
+#
+# Uruchamiać przy wstrzymanych zapisach raportów (backend zatrzymany lub tryb tylko do odczytu).
+# Każde zlecenie liczone jest i zapisywane w osobnej transakcji, więc raport dodany w trakcie
+# nie zostanie nadpisany starszą liczbą (transakcja zostanie powtórzona), ale pełny przebieg
+# po wszystkich zleceniach nie jest jednym spójnym zrzutem.
+import sys
+import os
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+
+# Liczba raportów i data ostatniego raportu policzone w tej samej transakcji co zapis na zleceniu -
+# równoległy post_report (Increment w batchu) koliduje z transakcją i wymusza jej powtórzenie
+@firestore.transactional
+def _backfill_order(transaction, order_ref):
+    snap = next(iter(transaction.get(order_ref)), None)
+    if snap is None or not snap.exists:
+        return False
+    reports_ref = order_ref.collection('reports')
+    # Zapytanie agregujące count() liczy po stronie serwera, bez pobierania dokumentów
+    count = reports_ref.count().get(transaction=transaction)[0][0].value
+    last_report_at = None
+    if count:
+        latest = list(transaction.get(
+            reports_ref.order_by('created_at', direction=firestore.Query.DESCENDING).limit(1)))
+        if latest:
+            last_report_at = latest[0].to_dict().get('created_at')
+
+    data = snap.to_dict() or {}
+    if data.get('reportCount') == count and data.get('lastReportAt') == last_report_at:
+        return False
+    transaction.update(order_ref, {'reportCount': count, 'lastReportAt': last_report_at})
+    return True
+
+
+def main():
+    sa_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "serviceAccountKey.json")
+
+    if not os.path.exists(sa_path):
+        print("BŁĄD: Brak pliku serviceAccountKey.json pod ścieżką:", sa_path)
+        sys.exit(2)
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(sa_path)
+        firebase_admin.initialize_app(cred)
+
+    db = firestore.client()
+
+    checked = 0
+    updated = 0
+    # Same referencje (bez pól) - dane zlecenia czyta dopiero transakcja
+    for order in db.collection('orders').select([]).stream():
+        if _backfill_order(db.transaction(), order.reference):
+            updated += 1
+        checked += 1
+
+    print(f"Zaktualizowano liczniki raportów dla {updated} z {checked} zleceń.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# backend/bench.py - test obciążeniowy endpointów: przepustowość i opóźnienia p50/p95/p99 per trasa.
+#
+# Backend działa na lokalnych emulatorach Firebase (Firestore + Auth), dane generuje seed.py
+# (te same ziarno i parametry => te same id zleceń, więc --no-seed pozwala użyć wcześniej wgranych danych).
+# Seed wgrywa dokumenty do Firestore i konta do Auth - bez kont sprawdzenie odwołania sesji zwraca 401.
+# Ruch odtwarza wywołania aplikacji: worker (main_panel.dart) - lista zleceń, szczegóły, raport,
+# przypisanie; admin (admin_panel.dart) - listy wolnych/bieżących zleceń i raporty zlecenia.
+#
+#   firebase emulators:start --only firestore,auth
+#   python bench.py --concurrency 10,100,1000 --duration 30 --out bench.json
+#   python bench.py --async                       # ten sam ruch na app_async (hypercorn)
+#   python bench.py --url http://host:8000 --no-seed
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+import seed
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, 'serviceAccountKey.json')
+
+# Scenariusze: (waga, nazwa). Nazwa jest jednocześnie kluczem trasy w raporcie.
+WORKER_MIX = (
+    (50, 'GET /orders'),
+    (25, 'GET /orders/<id>'),
+    (20, 'POST /orders/<id>/report'),
+    (5, 'POST /orders/<id>/assign'),
+)
+ADMIN_MIX = (
+    (35, 'GET /admin/orders/available'),
+    (40, 'GET /admin/orders/current'),
+    (25, 'GET /admin/orders/<id>/reports'),
+)
+# Odpowiedzi 4xx będące normalnym wynikiem scenariusza (nie liczone jako błędy):
+# przypisanie zlecenia, które inny worker właśnie wziął
+EXPECTED_STATUSES = {
+    'POST /orders/<id>/assign': {409},
+}
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark endpointów backendu (emulator Firebase).")
+    p.add_argument('--concurrency', default='10,100,1000', help="liczby równoległych klientów, po przecinku")
+    p.add_argument('--duration', type=float, default=20, help="czas pomiaru na poziom współbieżności [s]")
+    p.add_argument('--warmup', type=float, default=3, help="rozgrzewka przed pomiarem [s]")
+    p.add_argument('--admin-ratio', type=float, default=0.1, help="udział klientów-adminów")
+    p.add_argument('--users', type=int, default=50)
+    p.add_argument('--orders', type=int, default=2000)
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--no-seed', action='store_true', help="nie wgrywaj danych (już są w emulatorze)")
+    p.add_argument('--url', help="adres działającego backendu (bez uruchamiania własnego)")
+    p.add_argument('--async', dest='use_async', action='store_true', help="uruchom app_async zamiast app")
+    p.add_argument('--port', type=int, default=0, help="port uruchamianego backendu (0 = wolny)")
+    p.add_argument('--timeout', type=float, default=30)
+    p.add_argument('--out', help="plik wynikowy JSON (domyślnie stdout)")
+    return p.parse_args(argv)
+
+
+# Ten sam project_id co w app.py (klucz serwisowy albo FIREBASE_PROJECT_ID dla backendów lokalnych)
+def _project_id():
+    if not os.path.exists(SERVICE_ACCOUNT_PATH):
+        return os.environ.get('FIREBASE_PROJECT_ID', 'demo-local')
+    with open(SERVICE_ACCOUNT_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f).get('project_id')
+
+
+# Emulator Auth akceptuje niepodpisane tokeny (alg=none) - nie trzeba logowania przez REST
+def _emulator_token(project_id, user):
+    def enc(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b'=').decode()
+    now = int(time.time())
+    payload = {
+        'iss': f'https://securetoken.google.com/{project_id}',
+        'aud': project_id,
+        'sub': user['uid'],
+        'iat': now,
+        'exp': now + 3600,
+        'auth_time': now,
+        'email': user['email'],
+        'name': user['displayName'],
+        'role': user['role'],
+        'firebase': {'sign_in_provider': 'password', 'identities': {}},
+    }
+    return f"{enc({'alg': 'none', 'typ': 'JWT'})}.{enc(payload)}."
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, env):
+    port = args.port or _free_port()
+    if args.use_async:
+        cmd = [sys.executable, '-m', 'hypercorn', 'app_async:app', '--bind', f'127.0.0.1:{port}']
+    else:
+        cmd = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port),
+               '--no-reload', '--no-debugger', '--with-threads']
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"Backend zakończył się przy starcie (kod {proc.returncode})")
+        try:
+            if httpx.get(url + '/_debug/sa_project', timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    proc.terminate()
+    raise SystemExit("Backend nie wystartował w ciągu 60s")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    # Metoda najbliższej rangi
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples, elapsed):
+    routes = {}
+    total = 0
+    for route, items in sorted(samples.items()):
+        latencies = sorted(ms for ms, _ in items)
+        statuses = defaultdict(int)
+        for _, status in items:
+            statuses[str(status)] += 1
+        # Błąd to brak odpowiedzi albo status >= 400 - np. 401 dla wszystkich żądań znaczy, że mierzony
+        # jest tylko odrzucony token, a nie trasa
+        expected = EXPECTED_STATUSES.get(route, ())
+        errors = sum(n for s, n in statuses.items()
+                     if not s.isdigit() or (int(s) >= 400 and int(s) not in expected))
+        total += len(items)
+        routes[route] = {
+            'count': len(items),
+            'errors': errors,
+            'rps': round(len(items) / elapsed, 1),
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2),
+            'status': dict(statuses),
+        }
+    return {'requests': total, 'throughput_rps': round(total / elapsed, 1), 'routes': routes}
+
+
+# Dane potrzebne generatorowi ruchu: tokeny, zlecenia per branża, zlecenia przypisane do workera
+class Workload:
+    def __init__(self, project_id, users, orders):
+        self.admins = [u for u in users if u['role'] == 'admin']
+        self.workers = [u for u in users if u['role'] == 'worker']
+        self.tokens = {u['uid']: _emulator_token(project_id, u) for u in users}
+        self.order_ids = [o['id'] for o, _ in orders]
+        self.open_by_trade = defaultdict(list)
+        self.assigned_to = defaultdict(list)
+        for o, _ in orders:
+            if o['assignedTo']:
+                self.assigned_to[o['assignedTo']].append(o['id'])
+            elif o['status'] == 'open':
+                self.open_by_trade[o['trade']].append(o['id'])
+
+    def request(self, rng, user, name):
+        headers = {'Authorization': 'Bearer ' + self.tokens[user['uid']]}
+        if name == 'GET /orders':
+            return 'GET', '/orders', {'trade': user['trade'], 'status': 'open', 'limit': 100}, None, headers
+        if name == 'GET /orders/<id>':
+            return 'GET', f'/orders/{rng.choice(self.order_ids)}', None, None, headers
+        if name == 'POST /orders/<id>/report':
+            own = self.assigned_to.get(user['uid']) or self.order_ids
+            return 'POST', f'/orders/{rng.choice(own)}/report', None, {'text': "Raport z testu obciążeniowego"}, headers
+        if name == 'POST /orders/<id>/assign':
+            pool = self.open_by_trade.get(user['trade']) or self.order_ids
+            return 'POST', f'/orders/{rng.choice(pool)}/assign', None, None, headers
+        if name == 'GET /admin/orders/available':
+            return 'GET', '/admin/orders/available', {'limit': 500, 'fields': 'summary'}, None, headers
+        if name == 'GET /admin/orders/current':
+            return 'GET', '/admin/orders/current', {'limit': 500, 'fields': 'summary'}, None, headers
+        if name == 'GET /admin/orders/<id>/reports':
+            return 'GET', f'/admin/orders/{rng.choice(self.order_ids)}/reports', None, None, headers
+        raise ValueError(name)
+
+
+async def _client(client, workload, rng, user, mix, until, record_from, samples):
+    names = [n for _, n in mix]
+    weights = [w for w, _ in mix]
+    while True:
+        now = time.perf_counter()
+        if now >= until:
+            return
+        name = rng.choices(names, weights)[0]
+        method, path, params, body, headers = workload.request(rng, user, name)
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, path, params=params, json=body, headers=headers)
+            await resp.aread()
+            status = resp.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if started >= record_from:
+            samples[name].append(((time.perf_counter() - started) * 1000, status))
+
+
+async def run_level(url, workload, concurrency, args):
+    samples = defaultdict(list)
+    rng = random.Random(args.seed + concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        record_from = start + args.warmup
+        until = record_from + args.duration
+        tasks = []
+        for i in range(concurrency):
+            if workload.admins and rng.random() < args.admin_ratio:
+                user, mix = rng.choice(workload.admins), ADMIN_MIX
+            else:
+                user, mix = rng.choice(workload.workers), WORKER_MIX
+            tasks.append(_client(client, workload, random.Random(rng.random()), user, mix,
+                                 until, record_from, samples))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - record_from
+    result = {'concurrency': concurrency, 'duration_s': round(elapsed, 2), **summarize(samples, elapsed)}
+    for route, stats in result['routes'].items():
+        if stats['errors']:
+            print(f"  UWAGA: {route}: {stats['errors']}/{stats['count']} błędów {stats['status']}", file=sys.stderr)
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    project_id = _project_id()
+
+    # Te same generatory co seed.py - id zleceń są deterministyczne dla danego ziarna
+    rng = random.Random(args.seed)
+    users = seed.generate_users(rng, args.users)
+    orders = seed.generate_orders(rng, args.orders, users, 3, 90)
+
+    os.environ.setdefault('FIRESTORE_EMULATOR_HOST', 'localhost:8080')
+    os.environ.setdefault('FIREBASE_AUTH_EMULATOR_HOST', 'localhost:9099')
+    if not args.no_seed:
+        # Komunikaty seeda na stderr - stdout to raport JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            db = seed.init_firebase(seed.parse_args(['--emulator', '--project', project_id]))
+            # Konta w emulatorze Auth: backend sprawdza odwołanie sesji (auth.get_user) przy każdym żądaniu
+            seed.import_auth_users(users, 'worker')
+        written = seed.write_batched(db, seed.iter_writes(db, users, orders), 8)
+        print(f"Wgrano {written} dokumentów do emulatora", file=sys.stderr)
+
+    proc = None
+    url = args.url
+    if not url:
+        proc, url = start_server(args, dict(os.environ))
+    try:
+        workload = Workload(project_id, users, orders)
+        runs = []
+        for level in [int(c) for c in args.concurrency.split(',') if c.strip()]:
+            print(f"Współbieżność {level}...", file=sys.stderr)
+            runs.append(asyncio.run(run_level(url, workload, level, args)))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    result = {
+        'config': {
+            'server': 'app_async' if args.use_async else ('external' if args.url else 'app'),
+            'url': url,
+            'users': args.users,
+            'orders': args.orders,
+            'seed': args.seed,
+            'duration_s': args.duration,
+            'admin_ratio': args.admin_ratio,
+            'orders_cache': os.environ.get('ORDERS_CACHE', '1'),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'runs': runs,
+    }
+    out = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(out + '\n')
+    else:
+        print(out)
+
+
+if __name__ == '__main__':
+    main()
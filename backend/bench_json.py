@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# backend/bench_json.py - czas kodowania list zleceń do JSON: domyślny koder Flask (jsonify)
+# kontra jsoncodec (orjson z obsługą typów Firestore), dla rosnących rozmiarów wyniku.
+#
+# Dane z seed.generate_orders, daty zamienione na DatetimeWithNanoseconds - tak jak zwraca je Firestore.
+# Nie potrzebuje emulatora ani backendu.
+#
+#   python bench_json.py
+#   python bench_json.py --sizes 100,1000,10000,50000 --repeat 5 --out bench_json.json
+import argparse
+import json
+import random
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+import jsoncodec
+import seed
+
+DATE_FIELDS = ("created_at", "updated_at", "lastReportAt")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark kodowania JSON list zleceń.")
+    p.add_argument("--sizes", default="100,1000,10000,50000", help="liczby zleceń w wyniku, po przecinku")
+    p.add_argument("--repeat", type=int, default=5, help="liczba powtórzeń na rozmiar (liczy się najlepszy czas)")
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", help="plik wynikowy JSON (domyślnie stdout)")
+    return p.parse_args(argv)
+
+
+# Zlecenia w postaci, w jakiej trafiają do odpowiedzi (słownik z 'id', daty Firestore)
+def make_orders(rng, count, users):
+    orders = []
+    for order, _ in seed.generate_orders(rng, count, users, max_reports=3, days=90):
+        for field in DATE_FIELDS:
+            value = order.get(field)
+            if value is not None:
+                order[field] = DatetimeWithNanoseconds.fromtimestamp(value.timestamp(), tz=value.tzinfo)
+        orders.append(order)
+    return orders
+
+
+# Najlepszy czas z repeat wywołań [ms] i rozmiar wyniku w bajtach
+def measure(encode, orders, repeat):
+    best = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode(orders)
+        elapsed = time.perf_counter() - start
+        size = len(body)
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 3), size
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    users = seed.generate_users(rng, args.users)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    orders = make_orders(rng, max(sizes), users)
+
+    # Domyślny koder Flask w konfiguracji jsonify (sort_keys, ensure_ascii) plus kodowanie do bajtów
+    flask_json = DefaultJSONProvider(Flask(__name__))
+
+    def flask_encode(items):
+        return flask_json.dumps(items).encode("utf-8")
+
+    runs = []
+    for size in sizes:
+        chunk = orders[:size]
+        flask_ms, flask_bytes = measure(flask_encode, chunk, args.repeat)
+        codec_ms, codec_bytes = measure(jsoncodec.dumps, chunk, args.repeat)
+        print(f"{size} zleceń: flask {flask_ms} ms, jsoncodec {codec_ms} ms", file=sys.stderr)
+        runs.append({
+            "orders": size,
+            "flask_ms": flask_ms,
+            "jsoncodec_ms": codec_ms,
+            "speedup": round(flask_ms / codec_ms, 1) if codec_ms else None,
+            "flask_bytes": flask_bytes,
+            "jsoncodec_bytes": codec_bytes,
+        })
+
+    result = {
+        "config": {
+            "backend": "orjson" if jsoncodec.orjson is not None else "json",
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "runs": runs,
+    }
+    out = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+    else:
+        print(out)
+
+
+if __name__ == "__main__":
+    main()
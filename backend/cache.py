@@ -0,0 +1,72 @@
+# backend/cache.py - wspólne cache w pamięci procesu (bezpieczne wątkowo)
+import threading
+import time
+from collections import OrderedDict
+
+
+# LRU z ograniczonym rozmiarem i czasem wygaśnięcia ustawianym per wpis.
+# Wpis wygasa w chwili expires_at (timestamp epoch w sekundach) albo po jawnym usunięciu.
+class ExpiringLRUCache:
+    def __init__(self, maxsize=1024, clock=time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expires_at=None):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    # Usuwa wszystkie wpisy, dla których predicate(key, value) zwraca True
+    def discard_where(self, predicate):
+        with self._lock:
+            doomed = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+            }
@@ -1,19 +1,13 @@
 #!/usr/bin/env python3
 # Skrypt narzędziowy: Sprawdza dokumenty w pod-kolekcji orders/<order_id>/reports
+# Eksport raportów wszystkich zleceń (audyt): export_reports.py
 import sys
 import os
-import json
-from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials, firestore
 
-# Helper: Serializacja obiektów Timestamp Firestore do stringa (ISO 8601)
-# Biblioteka JSON nie obsługuje natywnie typów datetime/Timestamp
-def ts_to_str(v):
-    try:
-        return v.to_datetime().isoformat()
-    except Exception:
-        return str(v)
+# Ten sam koder JSON co w API (daty Firestore -> ISO 8601)
+import jsoncodec
 
 def main():
     # Walidacja argumentów CLI (wymagany ID zlecenia)
@@ -54,17 +48,13 @@ def main():
 
     out = []
     for d in docs:
-        data = d.to_dict()
-        # Normalizacja daty przed zrzutem do JSON
-        if 'created_at' in data:
-            data['created_at'] = ts_to_str(data['created_at'])
         out.append({
             'id': d.id,
-            'data': data
+            'data': d.to_dict()
         })
 
-    # ensure_ascii=False gwarantuje poprawne wyświetlanie polskich znaków w terminalu
-    print(json.dumps(out, indent=2, ensure_ascii=False))
+    # Wynik w UTF-8, więc polskie znaki wyświetlają się poprawnie w terminalu
+    print(jsoncodec.dumps(out, pretty=True).decode('utf-8'))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
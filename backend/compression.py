@@ -0,0 +1,96 @@
+# backend/compression.py - kompresja odpowiedzi (br/gzip) z cache skompresowanych treści
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli jest opcjonalne - bez niego tylko gzip
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/plain', 'text/html', 'text/csv')
+
+
+# Kompresuje treść odpowiedzi algorytmem wybranym z Accept-Encoding (br przed gzip przy równej wadze).
+# Wynik trafia do LRU ograniczonego sumą bajtów, z kluczem (wersja treści, kodowanie):
+# wersja to ETag odpowiedzi albo skrót treści, więc ta sama lista wysłana do wielu klientów
+# jest kompresowana raz. Treści mniejsze niż min_size idą bez kompresji.
+class ResponseCompressor:
+    def __init__(self, min_size=1024, cache_bytes=32 * 1024 * 1024, gzip_level=6, brotli_quality=6):
+        self.min_size = min_size
+        self.cache_bytes = cache_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # (wersja, kodowanie) -> bajty
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    # accept_encodings - obiekt Accept z werkzeug/quart (request.accept_encodings).
+    # Zwraca (kodowanie, skompresowana treść) albo None, gdy kompresja się nie opłaca / nie jest akceptowana.
+    def encode(self, body, accept_encodings, mimetype, version=None):
+        if len(body) < self.min_size or mimetype not in COMPRESSIBLE_MIMETYPES:
+            return None
+        encoding = accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return None
+        key = (version or hashlib.sha256(body).hexdigest(), encoding)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return encoding, data
+            self.misses += 1
+        data = self._compress(body, encoding)
+        if len(data) >= len(body):
+            return None
+        self._put(key, data)
+        return encoding, data
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _put(self, key, data):
+        if len(data) > self.cache_bytes:
+            return
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self._cached_bytes -= len(old)
+            self._cache[key] = data
+            self._cached_bytes += len(data)
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._cache),
+                'bytes': self._cached_bytes,
+            }
+
+
+# Silny ETag musi być inny dla każdego kodowania treści - wariant skompresowany dostaje sufiks kodowania
+def encoded_etag(etag, encoding):
+    return f'{etag}-{encoding}'
+
+
+# ETag z If-None-Match pasujący do wersji treści w dowolnym kodowaniu (bez sufiksu, -br, -gzip)
+# albo None. Zwracany jest ten, który klient ma u siebie - trafia do nagłówka odpowiedzi 304.
+def match_etag(if_none_match, etag):
+    if if_none_match.contains(etag):
+        return etag
+    for encoding in ('br', 'gzip'):
+        tag = encoded_etag(etag, encoding)
+        if if_none_match.contains(tag):
+            return tag
+    return None
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# backend/export_reports.py - eksport wszystkich raportów (orders/*/reports) do NDJSON na potrzeby audytu.
+# Następca check_raports.py: zamiast raportów jednego zlecenia wczytanych do pamięci - jedno zapytanie
+# collection_group('reports') podzielone na partycje (PartitionQuery) czytane równolegle stronami.
+# Pamięć nie rośnie z liczbą raportów: wątki czytające oddają strony do ograniczonej kolejki,
+# a jeden wątek zapisuje je od razu do pliku / stdout.
+#
+# Punkt kontrolny (--checkpoint) zapamiętuje granice partycji, ostatni zapisany dokument każdej z nich
+# i długość pliku wynikowego. Przerwany eksport uruchomiony ponownie z tym samym --checkpoint
+# obcina plik do ostatniego punktu kontrolnego i czyta dalej od zapamiętanych kursorów, więc żaden
+# raport nie jest pominięty ani zdublowany. Z --gzip każda strona to osobny człon gzip
+# (plik wieloczłonowy czytają gzip/zcat), dzięki czemu obcięty plik pozostaje poprawny.
+#
+#   python export_reports.py --out raporty.ndjson.gz --checkpoint raporty.ckpt
+#   python export_reports.py --partitions 32 --workers 16 --out raporty.ndjson
+#   python export_reports.py --emulator | jq .
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jsoncodec
+from seed import init_firebase
+
+COLLECTION = "reports"
+# Stron czekających na zapis na jeden wątek czytający - ogranicza pamięć, gdy zapis nie nadąża
+QUEUE_PAGES_PER_WORKER = 2
+# Jak często (s) zapisywać punkt kontrolny; zawsze także na końcu i po błędzie
+CHECKPOINT_INTERVAL = 5.0
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Eksport wszystkich raportów zleceń do NDJSON.")
+    p.add_argument("--out", default="-", help="plik wynikowy (domyślnie stdout)")
+    p.add_argument("--gzip", action="store_true", help="kompresuj wynik (domyślnie dla plików *.gz)")
+    p.add_argument("--partitions", type=int, default=16, help="docelowa liczba partycji zapytania")
+    p.add_argument("--workers", type=int, default=8, help="liczba partycji czytanych równolegle")
+    p.add_argument("--page-size", type=int, default=500, help="dokumentów na jedno zapytanie")
+    p.add_argument("--checkpoint", help="plik punktu kontrolnego (wznawianie przerwanego eksportu)")
+    p.add_argument("--emulator", action="store_true",
+                   help="użyj lokalnego emulatora (FIRESTORE_EMULATOR_HOST)")
+    p.add_argument("--project", default="demo-seed", help="project id dla emulatora")
+    args = p.parse_args(argv)
+    # Wznowienie obcina plik wynikowy do punktu kontrolnego - stdout nie da się obciąć ani dopisać
+    if args.checkpoint and args.out == "-":
+        p.error("--checkpoint wymaga pliku wynikowego (--out), nie stdout")
+    if args.out.endswith(".gz"):
+        args.gzip = True
+    return args
+
+
+# Linia NDJSON: id raportu, id zlecenia i dane (daty Firestore jako ISO 8601)
+def report_line(doc):
+    return jsoncodec.dumps({
+        "id": doc.id,
+        "order_id": doc.reference.parent.parent.id,
+        "data": doc.to_dict(),
+    }) + b"\n"
+
+
+# Granice partycji jako ścieżki dokumentów - dają się zapisać w punkcie kontrolnym
+def plan_partitions(db, count):
+    parts = []
+    for partition in db.collection_group(COLLECTION).get_partitions(count):
+        parts.append({
+            "start": partition.start_at.path if partition.start_at else None,
+            "end": partition.end_at.path if partition.end_at else None,
+            "last": None,
+            "count": 0,
+            "done": False,
+        })
+    return parts
+
+
+# Zapytanie partycji w porządku __name__ (jak PartitionQuery), od ostatniego zapisanego dokumentu
+def partition_query(db, start, last, end):
+    q = db.collection_group(COLLECTION).order_by("__name__")
+    if last:
+        q = q.start_after([db.document(last)])
+    elif start:
+        q = q.start_at([db.document(start)])
+    if end:
+        q = q.end_before([db.document(end)])
+    return q
+
+
+# Wątek czytający: strony partycji do kolejki jako (indeks partycji, linie, ostatni dokument, liczba, koniec)
+def read_partition(db, index, part, page_size, pages, stop):
+    last = part["last"]
+    while not stop.is_set():
+        docs = list(partition_query(db, part["start"], last, part["end"]).limit(page_size).stream())
+        done = len(docs) < page_size
+        if docs:
+            last = docs[-1].reference.path
+        page = (index, b"".join(report_line(d) for d in docs), last, len(docs), done)
+        # put z limitem czasu - po błędzie zapisu (stop) wątek nie może zawisnąć na pełnej kolejce
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        if done:
+            return
+
+
+class Output:
+    def __init__(self, path, compress, offset=None):
+        self.compress = compress
+        if path == "-":
+            self._file = sys.stdout.buffer
+            self.offset = None
+        elif offset is None:
+            self._file = open(path, "wb")
+            self.offset = 0
+        else:
+            # Wznowienie: wszystko za ostatnim punktem kontrolnym zostanie zapisane ponownie
+            if not os.path.exists(path) or os.path.getsize(path) < offset:
+                raise SystemExit(f"BŁĄD: plik {path} jest krótszy niż w punkcie kontrolnym ({offset} B)")
+            self._file = open(path, "ab")
+            self._file.truncate(offset)
+            self.offset = offset
+
+    def write(self, lines):
+        if not lines:
+            return
+        data = gzip.compress(lines, mtime=0) if self.compress else lines
+        self._file.write(data)
+        if self.offset is not None:
+            self.offset += len(data)
+
+    # Dane muszą być na dysku, zanim punkt kontrolny wskaże ich koniec
+    def sync(self):
+        self._file.flush()
+        if self.offset is not None:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not sys.stdout.buffer:
+            self._file.close()
+
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Komunikaty startowe na stderr - stdout może być strumieniem NDJSON
+    with contextlib.redirect_stdout(sys.stderr):
+        db = init_firebase(args)
+
+    state = load_checkpoint(args.checkpoint)
+    if state is not None:
+        if state["out"] != args.out or state["gzip"] != args.gzip:
+            print(f"BŁĄD: punkt kontrolny dotyczy eksportu do {state['out']} (gzip={state['gzip']})", file=sys.stderr)
+            sys.exit(2)
+        print(f"Wznawianie: {state['exported']} raportów już wyeksportowanych", file=sys.stderr)
+    else:
+        state = {
+            "collection_group": COLLECTION,
+            "out": args.out,
+            "gzip": args.gzip,
+            "offset": None,
+            "exported": 0,
+            "partitions": plan_partitions(db, args.partitions),
+        }
+    parts = state["partitions"]
+    pending = [i for i, part in enumerate(parts) if not part["done"]]
+
+    out = Output(args.out, args.gzip, state["offset"])
+    pages = queue.Queue(maxsize=max(1, args.workers) * QUEUE_PAGES_PER_WORKER)
+    stop = threading.Event()
+
+    def checkpoint():
+        out.sync()
+        state["offset"] = out.offset
+        save_checkpoint(args.checkpoint, state)
+
+    started = time.monotonic()
+    last_checkpoint = started
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = [pool.submit(read_partition, db, i, dict(parts[i]), args.page_size, pages, stop)
+                       for i in pending]
+            try:
+                remaining = len(pending)
+                while remaining:
+                    try:
+                        index, lines, last, count, done = pages.get(timeout=1)
+                    except queue.Empty:
+                        for f in futures:
+                            if f.done() and f.exception() is not None:
+                                raise f.exception()
+                        continue
+                    out.write(lines)
+                    part = parts[index]
+                    part["last"] = last
+                    part["count"] += count
+                    part["done"] = done
+                    state["exported"] += count
+                    if done:
+                        remaining -= 1
+                    now = time.monotonic()
+                    if now - last_checkpoint >= CHECKPOINT_INTERVAL:
+                        checkpoint()
+                        last_checkpoint = now
+                        print(f"... {state['exported']} raportów, partycje {len(parts) - remaining}/{len(parts)}",
+                              file=sys.stderr)
+            finally:
+                stop.set()
+        checkpoint()
+    except BaseException:
+        # Zapisane strony są spójne z kursorami partycji - kolejne uruchomienie zacznie od nich
+        checkpoint()
+        raise
+    finally:
+        out.close()
+
+    elapsed = time.monotonic() - started
+    print(f"Wyeksportowano {state['exported']} raportów z {len(parts)} partycji w {elapsed:.1f} s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# backend/feeds.py - zmaterializowane listy otwartych zleceń per branża (feed workera)
+import bisect
+import hashlib
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+
+FEED_STATUS = 'open'
+
+
+# Feed branży to najnowsze otwarte zlecenia tej branży - dokładnie to, o co pyta aplikacja workera
+# (GET /orders?trade=...&status=open), posortowane malejąco po (created_at, id).
+# Feed budowany jest leniwie przy pierwszym odczycie (load) i dalej aktualizowany przyrostowo (apply)
+# przy każdej zmianie zlecenia. Treść JSON i ETag liczone są raz na wersję feedu, więc odczyt
+# to wyszukanie w słowniku i zwrot gotowych bajtów.
+# max_age (sekundy) ogranicza nieaktualność, gdy zmiany z innych procesów nie docierają przez apply;
+# None - feed ważny aż do zmiany.
+class TradeFeeds:
+    def __init__(self, size=200, max_age=None, clock=time.monotonic):
+        self.size = size
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions = itertools.count(1)
+        self._feeds = {}   # branża -> _Feed
+        self._where = {}   # id zlecenia -> branża feedu, w którym jest
+        self._gen = {}     # branża -> licznik zmian (wykrywa zmiany w trakcie load)
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, trade):
+        with self._lock:
+            return self._gen.get(trade, 0)
+
+    # Zwraca (body, etag, liczba zleceń) albo None, jeśli feed trzeba zbudować (load).
+    # dumps - serializator zwracający bajty (jsoncodec.dumps)
+    def get(self, trade, dumps):
+        with self._lock:
+            feed = self._feeds.get(trade)
+            if feed is not None and self.max_age is not None and self._clock() - feed.built_at > self.max_age:
+                self._drop(trade)
+                feed = None
+            if feed is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return feed.render(dumps)
+
+    # Buduje feed z wyniku zapytania (do size + 1 zleceń z polem 'id', posortowane jak feed).
+    # generation - wartość generation(trade) sprzed zapytania: jeśli w międzyczasie przyszła zmiana
+    # (albo generation to None), wynik jest zwracany, ale nie zapamiętywany.
+    def load(self, trade, orders, generation, dumps):
+        feed = _Feed(trade, self._clock())
+        feed.complete = len(orders) <= self.size
+        for order in orders[:self.size]:
+            if _timestamp(order.get('created_at')) is not None:
+                feed.insert(order['id'], order)
+        feed.version = next(self._versions)
+        rendered = feed.render(dumps)
+        with self._lock:
+            if generation is not None and self._gen.get(trade, 0) == generation and trade not in self._feeds:
+                self._feeds[trade] = feed
+                for order_id in feed.items:
+                    self._where[order_id] = trade
+        return rendered
+
+    # Zmiana zlecenia: data to aktualne dane (bez 'id') albo None, gdy zlecenie usunięto
+    def apply(self, order_id, data):
+        with self._lock:
+            old_trade = self._where.pop(order_id, None)
+            if old_trade is not None:
+                self._gen[old_trade] = self._gen.get(old_trade, 0) + 1
+                feed = self._feeds[old_trade]
+                feed.remove(order_id)
+                if not feed.complete:
+                    # Z obciętego feedu nie wiadomo, co wskoczy na zwolnione miejsce - budujemy od nowa
+                    self._drop(old_trade)
+                else:
+                    feed.version = next(self._versions)
+            # Zlecenia z trade innym niż tekst albo created_at innym niż data nie trafiają do feedu
+            # (tak jak na listy w orders_cache) - nie da się ich użyć jako klucza ani porównać
+            if data is None or data.get('status') != FEED_STATUS or _timestamp(data.get('created_at')) is None:
+                return
+            trade = data.get('trade')
+            if not isinstance(trade, str):
+                return
+            self._gen[trade] = self._gen.get(trade, 0) + 1
+            feed = self._feeds.get(trade)
+            if feed is None:
+                return
+            item = dict(data)
+            item['id'] = order_id
+            feed.insert(order_id, item)
+            self._where[order_id] = trade
+            if len(feed.items) > self.size:
+                del self._where[feed.pop_oldest()]
+                feed.complete = False
+            feed.version = next(self._versions)
+
+    # Unieważnia feed branży (np. po imporcie wielu zleceń naraz)
+    def invalidate(self, trade):
+        with self._lock:
+            self._gen[trade] = self._gen.get(trade, 0) + 1
+            self._drop(trade)
+
+    def clear(self):
+        with self._lock:
+            for trade in list(self._feeds):
+                self._gen[trade] = self._gen.get(trade, 0) + 1
+            self._feeds.clear()
+            self._where.clear()
+
+    def _drop(self, trade):
+        feed = self._feeds.pop(trade, None)
+        if feed is not None:
+            for order_id in feed.items:
+                self._where.pop(order_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'feeds': len(self._feeds),
+                'orders': len(self._where),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class _Feed:
+    def __init__(self, trade, built_at):
+        self.trade = trade
+        self.built_at = built_at
+        self.items = {}    # id -> zlecenie (z polem 'id')
+        self._keys = []    # posortowane rosnąco (created_at, id)
+        self.complete = True
+        self.version = 0
+        self._rendered = None  # (wersja, body, etag, liczba zleceń)
+
+    def insert(self, order_id, item):
+        self.items[order_id] = item
+        bisect.insort(self._keys, (_timestamp(item['created_at']), order_id))
+
+    def remove(self, order_id):
+        item = self.items.pop(order_id)
+        key = (_timestamp(item['created_at']), order_id)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def pop_oldest(self):
+        _, order_id = self._keys.pop(0)
+        del self.items[order_id]
+        return order_id
+
+    # Treść i ETag (skrót treści - zgodny między procesami) liczone raz na wersję
+    def render(self, dumps):
+        rendered = self._rendered
+        if rendered is None or rendered[0] != self.version:
+            body = dumps([self.items[order_id] for _, order_id in reversed(self._keys)])
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            rendered = self._rendered = (self.version, body, etag, len(self._keys))
+        return rendered[1:]
+
+
+# Klucz sortowania jak w orders_cache: tylko daty, data bez strefy traktowana jako UTC
+def _timestamp(value):
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,72 @@
+# backend/jsoncodec.py - wspólne kodowanie JSON odpowiedzi (orjson) z obsługą typów Firestore.
+# Daty (także DatetimeWithNanoseconds z Firestore) -> ISO 8601, GeoPoint -> {latitude, longitude},
+# DocumentReference -> ścieżka dokumentu. Bez orjson działa na standardowym module json.
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+from google.cloud.firestore_v1 import GeoPoint
+from google.cloud.firestore_v1.base_document import BaseDocumentReference
+
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - wolniejsza ścieżka przez json
+    orjson = None
+
+MIMETYPE = 'application/json'
+
+
+# Typy, których koder nie zna natywnie. orjson sam koduje datetime, ale nie jego podklasy
+# (DatetimeWithNanoseconds), więc te trafiają tutaj.
+def default(obj):
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if hasattr(obj, 'to_datetime'):
+        # Timestamp z protobufa / starsze typy Firestore
+        return obj.to_datetime().isoformat()
+    if isinstance(obj, GeoPoint):
+        return {'latitude': obj.latitude, 'longitude': obj.longitude}
+    if isinstance(obj, BaseDocumentReference):
+        return obj.path
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError(f"Typ {type(obj).__name__} nie jest serializowalny do JSON")
+
+
+if orjson is not None:
+    def dumps(obj, pretty=False):
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps(obj, pretty=False):
+        return json.dumps(obj, default=default, ensure_ascii=False, indent=2 if pretty else None,
+                          separators=None if pretty else (',', ':')).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+# Odpowiedź JSON bez pośredniego str - do gorących ścieżek (listy, feed, wyszukiwanie)
+def response(obj, response_class, status=200):
+    return response_class(dumps(obj), status=status, mimetype=MIMETYPE)
+
+
+# Provider dla Flask/Quart (app.json): jsonify i app.json.dumps w całej aplikacji idą przez ten sam koder
+class FirestoreJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=MIMETYPE)
@@ -0,0 +1,162 @@
+# backend/jsonlog.py - nieblokujące logowanie strukturalne (JSON, jedna linia na wpis).
+# Wątek żądania tylko filtruje i wrzuca rekord do kolejki; formatowanie, maskowanie tokenów
+# i zapis na dysk/stderr robi osobny wątek (QueueListener).
+#
+#   LOG_LEVEL=INFO                         poziom globalny
+#   LOG_LEVELS=backend.tokens=DEBUG,urllib3=WARNING
+#   LOG_DEBUG_SAMPLE=0.01                  jaki ułamek rekordów DEBUG z żądań trafia do logu
+#   LOG_DEBUG_SAMPLE_ROUTES=/orders=0,/orders/<order_id>/assign=1
+#   LOG_FILE=/var/log/backend.jsonl        domyślnie stderr
+#   LOG_QUEUE_SIZE=10000                   przy przepełnieniu rekordy są odrzucane (nie blokujemy żądań)
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import traceback
+from datetime import datetime, timezone
+
+# Atrybuty, które ma każdy LogRecord - wszystko poza nimi to pola dodane przez extra={...}
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Tokeny JWT (trzy segmenty base64url, nagłówek zaczyna się od eyJ) i wartości nagłówków Bearer/Basic
+_TOKEN_RE = re.compile(r'eyJ[\w-]*\.[\w-]*\.[\w-]*|(?<=Bearer )[^\s"\',]+|(?<=Basic )[^\s"\',]+')
+_SECRET_KEYS = ('authorization', 'token', 'password', 'secret', 'private_key', 'cookie')
+REDACTED = '[REDACTED]'
+
+
+def redact(text):
+    return _TOKEN_RE.sub(REDACTED, text)
+
+
+def _redact_value(key, value):
+    if any(s in key.lower() for s in _SECRET_KEYS):
+        return REDACTED
+    if isinstance(value, str):
+        return redact(value)
+    if isinstance(value, dict):
+        return {k: _redact_value(str(k), v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(key, v) for v in value]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return redact(str(value))
+
+
+# Formatowanie w wątku listenera: msg % args, wyjątek i pola extra, wszystko po maskowaniu tokenów
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': redact(record.getMessage()),
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = _redact_value(key, value)
+        if record.exc_info:
+            entry['exc'] = redact(''.join(traceback.format_exception(*record.exc_info)))
+        elif record.exc_text:
+            entry['exc'] = redact(record.exc_text)
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# Próbkowanie rekordów DEBUG per trasa. context() zwraca słownik z kontekstem żądania
+# (m.in. 'route') albo None poza żądaniem - rekordy spoza żądań nie są próbkowane.
+class DebugSampler(logging.Filter):
+    def __init__(self, default_rate=1.0, route_rates=None, context=None, rng=random.random):
+        super().__init__()
+        self.default_rate = default_rate
+        self.route_rates = route_rates or {}
+        self.context = context
+        self._rng = rng
+
+    def filter(self, record):
+        ctx = self.context() if self.context is not None else None
+        if ctx:
+            record.__dict__.update(ctx)
+        if record.levelno >= logging.INFO or not ctx:
+            return True
+        rate = self.route_rates.get(ctx.get('route'), self.default_rate)
+        return rate >= 1 or (rate > 0 and self._rng() < rate)
+
+
+# QueueHandler bez formatowania w wątku wołającym (standardowy prepare() robi msg % args)
+# i bez blokowania przy pełnej kolejce - nadmiarowe rekordy są liczone w .dropped.
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+        self.listener = None
+
+    def prepare(self, record):
+        return record
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()  # dopisuje zaległe rekordy z kolejki
+        super().close()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_rates(spec):
+    rates = {}
+    for item in filter(None, (s.strip() for s in spec.split(','))):
+        route, _, rate = item.rpartition('=')
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in filter(None, (s.strip() for s in spec.split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+# Instaluje handler kolejkowy na root loggerze i startuje wątek zapisu. Zwraca handler
+# (np. do odczytu .dropped). Wywołanie ponowne podmienia poprzednią konfigurację.
+def setup_logging(context=None, env=os.environ):
+    q = queue.Queue(maxsize=int(env.get('LOG_QUEUE_SIZE', '10000')))
+    log_file = env.get('LOG_FILE')
+    if log_file:
+        output = logging.handlers.WatchedFileHandler(log_file, encoding='utf-8')
+    else:
+        output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter())
+
+    handler = AsyncQueueHandler(q)
+    handler.addFilter(DebugSampler(float(env.get('LOG_DEBUG_SAMPLE', '0.01')),
+                                   _parse_rates(env.get('LOG_DEBUG_SAMPLE_ROUTES', '')),
+                                   context))
+    listener = logging.handlers.QueueListener(q, output, respect_handler_level=False)
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+        if isinstance(old, AsyncQueueHandler):
+            old.close()
+    root.addHandler(handler)
+    root.setLevel(env.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in _parse_levels(env.get('LOG_LEVELS', '')).items():
+        logging.getLogger(name).setLevel(level)
+
+    handler.listener = listener
+    listener.start()
+    atexit.register(handler.close)
+    return handler
@@ -0,0 +1,245 @@
+# backend/metrics.py - metryki procesu w formacie tekstowym Prometheusa (bez zewnętrznych zależności).
+# Histogramy czasu/rozmiaru odpowiedzi per trasa, liczniki operacji na magazynie danych per żądanie
+# i czas weryfikacji tokenów. Eksport: render() -> treść dla /_debug/metrics.
+import bisect
+import threading
+import time
+
+# Kubełki domyślne: czas [s], rozmiar [B], liczba operacji na żądanie
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+OPS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _fmt(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, doc, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [liczniki kubełków..., suma, liczba]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, ("le", _fmt(float(bound))))} {cumulative}'
+            yield f'{self.name}_bucket{_labels(self.labelnames, labels, ("le", "+Inf"))} {series[-1]}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(series[-2])}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}'
+
+
+# Wartości odczytywane w chwili eksportu (np. statystyki cache): fn() -> {(etykiety...): wartość}
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, doc, labelnames, fn):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def samples(self):
+        for labels, value in sorted(self.fn().items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for m in self._metrics:
+            lines.append(f'# HELP {m.name} {m.doc}')
+            lines.append(f'# TYPE {m.name} {m.kind}')
+            lines.extend(m.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Czas obsługi żądania', ('route', 'method', 'status')))
+http_response_size = registry.register(Histogram(
+    'http_response_size_bytes', 'Rozmiar treści odpowiedzi', ('route', 'method'), SIZE_BUCKETS))
+storage_ops_per_request = registry.register(Histogram(
+    'storage_operations_per_request', 'Operacje na magazynie danych (read/write/query) w jednym żądaniu',
+    ('route', 'method', 'op'), OPS_BUCKETS))
+storage_ops_total = registry.register(Counter(
+    'storage_operations_total', 'Operacje na magazynie danych', ('backend', 'op')))
+auth_verify_duration = registry.register(Histogram(
+    'auth_verify_duration_seconds', 'Czas weryfikacji ID tokena (bez trafień w cache)', ('result',)))
+auth_token_cache = registry.register(Counter(
+    'auth_token_cache_total', 'Odczyty cache zweryfikowanych tokenów', ('result',)))
+
+
+# Liczniki jednego żądania (read/write/query); trzymane w kontekście żądania przez app.py.
+# ops=() - tylko czas i rozmiar odpowiedzi (app_async czyta Firestore z pominięciem InstrumentedStorage)
+class RequestStats:
+    OPS = ('read', 'write', 'query')
+
+    def __init__(self, ops=OPS):
+        self.started = time.perf_counter()
+        self.ops = dict.fromkeys(ops, 0)
+
+    def add(self, op, n=1):
+        self.ops[op] += n
+
+
+# Magazyn danych z licznikami operacji. Odczyt = dokument zwrócony przez bazę (tak liczy je Firestore),
+# zapytanie = jedno wywołanie query/stream, zapis = jeden zapisany dokument.
+# current() zwraca RequestStats bieżącego żądania albo None (poza żądaniem).
+class InstrumentedStorage:
+    def __init__(self, storage, current):
+        self._storage = storage
+        self._current = current
+        self.name = storage.name
+
+    def __getattr__(self, attr):
+        return getattr(self._storage, attr)
+
+    def _count(self, op, n=1):
+        if not n:
+            return
+        storage_ops_total.inc(self.name, op, amount=n)
+        stats = self._current()
+        if stats is not None:
+            stats.add(op, n)
+
+    def get_user(self, uid):
+        self._count('read')
+        return self._storage.get_user(uid)
+
+    def get_users(self, uids):
+        self._count('read', len(uids))
+        return self._storage.get_users(uids)
+
+    def set_user(self, uid, data):
+        self._count('write')
+        return self._storage.set_user(uid, data)
+
+    def get_user_and_order(self, uid, order_id):
+        self._count('read', 2)
+        return self._storage.get_user_and_order(uid, order_id)
+
+    def get_order(self, order_id, fields=None):
+        self._count('read')
+        return self._storage.get_order(order_id, fields=fields)
+
+    def get_order_for_update(self, order_id):
+        self._count('read')
+        return self._storage.get_order_for_update(order_id)
+
+    def query_orders(self, filters, fields=None, after=None, limit=None):
+        self._count('query')
+        stats = self._current()
+        for order in self._storage.query_orders(filters, fields=fields, after=after, limit=limit):
+            storage_ops_total.inc(self.name, 'read')
+            if stats is not None:
+                stats.add('read')
+            yield order
+
+    def create_order(self, data):
+        self._count('write')
+        return self._storage.create_order(data)
+
+    def write_orders(self, items):
+        self._count('write', len(items))
+        return self._storage.write_orders(items)
+
+    def update_order(self, order_id, data, version=None):
+        self._count('write')
+        return self._storage.update_order(order_id, data, version=version)
+
+    def add_report(self, order_id, report):
+        self._count('write', 2)
+        return self._storage.add_report(order_id, report)
+
+    def list_reports(self, order_id, after=None, limit=None):
+        self._count('query')
+        reports = self._storage.list_reports(order_id, after=after, limit=limit)
+        self._count('read', len(reports))
+        return reports
+
+    def query_reports(self, filters, after=None, limit=None):
+        self._count('query')
+        stats = self._current()
+        for report in self._storage.query_reports(filters, after=after, limit=limit):
+            storage_ops_total.inc(self.name, 'read')
+            if stats is not None:
+                stats.add('read')
+            yield report
+
+
+def observe_request(stats, route, method, status, size):
+    http_request_duration.observe(time.perf_counter() - stats.started, route, method, str(status))
+    if size is not None:
+        http_response_size.observe(size, route, method)
+    for op, n in stats.ops.items():
+        storage_ops_per_request.observe(n, route, method, op)
+
+
+def render():
+    return registry.render()
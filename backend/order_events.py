@@ -0,0 +1,134 @@
+# backend/order_events.py - rozsyłanie zmian zleceń do subskrybentów (GET /orders/stream, SSE)
+import itertools
+import threading
+from collections import OrderedDict
+
+
+# Jedno źródło zmian na proces (listener cache zleceń albo endpointy zapisujące) rozsyłane
+# do wszystkich podłączonych klientów. Publikacja nigdy nie czeka na klienta:
+# - zdarzenia czekające na wysłanie są scalane per zlecenie (wolny klient dostaje tylko
+#   najnowszy stan każdego zlecenia),
+# - gdy mimo to zaległości przekroczą max_pending, kolejka klienta jest czyszczona
+#   i dostaje on jedno zdarzenie 'reset' (ma pobrać listę od nowa).
+class OrderEvents:
+    FILTER_FIELDS = ('trade', 'status', 'assignedTo')
+
+    def __init__(self, dumps, max_subscribers=5000, max_pending=1000):
+        self._dumps = dumps
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._seq = itertools.count(1)
+        self.published = 0
+        self.overflows = 0
+
+    # filters - słownik pole -> wartość (pola z FILTER_FIELDS). on_ready() wołane (z wątku publikującego)
+    # przy każdym nowym zdarzeniu - np. do obudzenia pętli asyncio. None, gdy osiągnięto limit klientów.
+    def subscribe(self, filters, on_ready=None):
+        sub = Subscription(self, filters, self.max_pending, on_ready)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    # Zmiana zlecenia: data - aktualny stan (None po usunięciu), previous - stan sprzed zmiany, jeśli znany.
+    # Klient dostaje 'upsert', gdy zlecenie pasuje do jego filtrów, albo 'remove', gdy przestało pasować.
+    def publish(self, order_id, data, previous=None):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        seq = next(self._seq)
+        upsert = remove = None
+        for sub in subscribers:
+            if data is not None and sub.matches(data):
+                if upsert is None:
+                    item = dict(data)
+                    item['id'] = order_id
+                    upsert = (seq, 'upsert', self._dumps(item))
+                sub.push(order_id, upsert)
+            elif previous is not None and sub.matches(previous):
+                if remove is None:
+                    remove = (seq, 'remove', self._dumps({'id': order_id}))
+                sub.push(order_id, remove)
+        self.published += 1
+
+    # Pełny snapshot wczytany od nowa (np. po ponownej subskrypcji listenera) - zmiany mogły przepaść
+    def reset(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.overflow(count=False)
+
+    def stats(self):
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {'subscribers': subscribers, 'published': self.published, 'overflows': self.overflows}
+
+
+class Subscription:
+    def __init__(self, events, filters, max_pending, on_ready=None):
+        self._events = events
+        self.filters = dict(filters)
+        self.max_pending = max_pending
+        self._on_ready = on_ready
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()  # id zlecenia -> (seq, typ, dane JSON)
+        self._reset = False
+        self._ready = threading.Event()
+
+    def matches(self, data):
+        return all(data.get(field) == value for field, value in self.filters.items())
+
+    def push(self, order_id, event):
+        with self._lock:
+            if self._reset:
+                return
+            self._pending.pop(order_id, None)
+            self._pending[order_id] = event
+            if len(self._pending) > self.max_pending:
+                self._events.overflows += 1
+                self._pending.clear()
+                self._reset = True
+        self._wake()
+
+    def overflow(self, count=True):
+        with self._lock:
+            if count:
+                self._events.overflows += 1
+            self._pending.clear()
+            self._reset = True
+        self._wake()
+
+    def _wake(self):
+        self._ready.set()
+        if self._on_ready is not None:
+            self._on_ready()
+
+    # Zdarzenia do wysłania w kolejności wystąpienia: lista (seq, typ, dane JSON).
+    # Po przepełnieniu zwraca jedno zdarzenie 'reset'.
+    def drain(self):
+        with self._lock:
+            self._ready.clear()
+            if self._reset:
+                self._reset = False
+                return [(None, 'reset', '{}')]
+            events = list(self._pending.values())
+            self._pending.clear()
+            return events
+
+    # Czeka (w wątku) na nowe zdarzenia; False po upływie timeout
+    def wait(self, timeout):
+        return self._ready.wait(timeout)
+
+
+# Zdarzenie w formacie text/event-stream
+def format_sse(seq, event, data):
+    head = f'id: {seq}\n' if seq is not None else ''
+    return f'{head}event: {event}\ndata: {data}\n\n'
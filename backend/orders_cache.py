@@ -0,0 +1,235 @@
+# backend/orders_cache.py - cache zleceń w pamięci procesu utrzymywany przez listener on_snapshot
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger("backend.orders_cache")
+
+
+# Jeden listener Firestore na worker utrzymuje kopię kolekcji 'orders' w pamięci.
+# Zlecenia są indeksowane po id oraz po polach z INDEXED_FIELDS (posortowane listy kluczy
+# (created_at, id)), więc strona listy to wyszukiwanie binarne + odczyt kilkudziesięciu elementów.
+# Gwarancja świeżości: potwierdzeniem jest snapshot albo heartbeat strumienia (Firestore przy braku zmian
+# przysyła NO_CHANGE z nowym resume token - monitor sprawdza go co check_interval sekund).
+# Samo watch.is_active nie wystarcza - pozostaje True także w trakcie ponownego łączenia.
+# Jeśli potwierdzenia brak dłużej niż max_staleness, is_healthy() zwraca False, endpointy wracają
+# do bezpośrednich zapytań do Firestore, a monitor subskrybuje listener od nowa.
+class OrdersCache:
+    INDEXED_FIELDS = ('trade', 'status')
+
+    def __init__(self, max_staleness=120, check_interval=5, clock=time.time):
+        self.max_staleness = max_staleness
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._collection = None
+        self._watch = None
+        self._monitor = None
+        self._resume_token = None
+        self._subscribed_at = 0
+        self._listeners = []
+        self._reset()
+
+    def _reset(self):
+        self._orders = {}    # id -> dane zlecenia
+        self._keys = {}      # id -> klucz sortowania (created_at, id) albo None
+        self._all = []       # posortowane rosnąco klucze wszystkich zleceń z created_at
+        self._by_field = {f: {} for f in self.INDEXED_FIELDS}  # pole -> wartość -> posortowane klucze
+        self._loaded = False
+        self._last_ok = 0
+        self._read_time = None
+
+    # Powiadomienia o zmianach z listenera: on_change(id, dane albo None przy usunięciu, poprzednie dane)
+    # dla każdej zmiany, on_reset() po wczytaniu pełnego snapshotu (start i ponowna subskrypcja)
+    def add_listener(self, on_change, on_reset=None):
+        self._listeners.append((on_change, on_reset))
+
+    def _notify(self, order_id=None, data=None, previous=None, reset=False):
+        for on_change, on_reset in self._listeners:
+            try:
+                if reset:
+                    if on_reset is not None:
+                        on_reset()
+                else:
+                    on_change(order_id, data, previous)
+            except Exception:
+                logger.exception("Błąd w obserwatorze zmian zleceń")
+
+    def start(self, collection_ref):
+        self._collection = collection_ref
+        self._subscribe()
+        if self._monitor is None:
+            self._monitor = threading.Thread(target=self._run_monitor, name='orders-cache-monitor', daemon=True)
+            self._monitor.start()
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    def _subscribe(self):
+        with self._lock:
+            self._loaded = False
+        self._resume_token = None
+        self._subscribed_at = self._clock()
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception:
+                pass
+        self._watch = self._collection.on_snapshot(self._on_snapshot)
+        logger.info("Uruchomiono listener zleceń")
+
+    def _run_monitor(self):
+        while True:
+            time.sleep(self.check_interval)
+            self._check()
+
+    def _check(self):
+        watch = self._watch
+        if watch is not None and watch.is_active:
+            token = getattr(watch, 'resume_token', None)
+            if token is not None and token != self._resume_token:
+                # Heartbeat: strumień jest aktualny, choć zmian nie było
+                self._resume_token = token
+                if self._loaded:
+                    self._last_ok = self._clock()
+            # Od subskrypcji liczy się też czas oczekiwania na pierwszy snapshot
+            silent = self._clock() - max(self._last_ok, self._subscribed_at)
+            if silent <= self.max_staleness:
+                return
+            logger.warning("Brak snapshotu i heartbeatu listenera zleceń od %.0f s - ponowna subskrypcja", silent)
+        else:
+            logger.warning("Listener zleceń nieaktywny - ponowna subskrypcja")
+        try:
+            self._subscribe()
+        except Exception as e:
+            logger.warning("Ponowna subskrypcja nieudana: %s", e)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            if not self._loaded:
+                # Pierwszy snapshot (także po ponownej subskrypcji) zawiera całą kolekcję
+                self._reset()
+                for d in docs:
+                    self._upsert(d.id, d.to_dict())
+                self._loaded = True
+                self._notify(reset=True)
+            else:
+                for change in changes:
+                    order_id = change.document.id
+                    previous = self._orders.get(order_id)
+                    if change.type.name == 'REMOVED':
+                        self._remove(order_id)
+                        self._notify(order_id, None, previous)
+                    else:
+                        data = change.document.to_dict()
+                        self._upsert(order_id, data)
+                        self._notify(order_id, data, previous)
+            self._read_time = read_time
+            self._last_ok = self._clock()
+
+    def _upsert(self, order_id, data):
+        self._remove(order_id)
+        self._orders[order_id] = data
+        created_at = _timestamp(data.get('created_at'))
+        if created_at is None:
+            # Bez created_at zlecenie nie trafia na listy (tak samo jak przy order_by w Firestore);
+            # created_at innego typu niż data nie da się porównać z resztą kluczy
+            if data.get('created_at') is not None:
+                logger.warning("Zlecenie %s pominięte na listach: created_at nie jest datą (%r)",
+                               order_id, data.get('created_at'))
+            self._keys[order_id] = None
+            return
+        key = (created_at, order_id)
+        self._keys[order_id] = key
+        bisect.insort(self._all, key)
+        for field in self.INDEXED_FIELDS:
+            if field in data and _indexable(data[field]):
+                bisect.insort(self._by_field[field].setdefault(data[field], []), key)
+
+    def _remove(self, order_id):
+        data = self._orders.pop(order_id, None)
+        key = self._keys.pop(order_id, None)
+        if data is None or key is None:
+            return
+        _discard(self._all, key)
+        for field in self.INDEXED_FIELDS:
+            if field in data and _indexable(data[field]):
+                bucket = self._by_field[field].get(data[field])
+                if bucket is not None:
+                    _discard(bucket, key)
+                    if not bucket:
+                        del self._by_field[field][data[field]]
+
+    # Zapis bezpośredni (bez listenera) - używany przez MemoryStorage, które trzyma tu swoje dane
+    def put(self, order_id, data):
+        with self._lock:
+            self._upsert(order_id, data)
+            self._loaded = True
+
+    def is_healthy(self):
+        return self._loaded and (self._clock() - self._last_ok) <= self.max_staleness
+
+    def get(self, order_id):
+        with self._lock:
+            data = self._orders.get(order_id)
+            return None if data is None else dict(data)
+
+    # Zwraca do limit zleceń (kopie z polem 'id') spełniających filtry równościowe,
+    # posortowanych malejąco po (created_at, id) i leżących za kursorem 'after'.
+    def query(self, filters, after=None, limit=None):
+        if after is not None:
+            created_at = _timestamp(after[0])
+            if created_at is None:
+                raise ValueError("Niepoprawny kursor")
+            after = (created_at, after[1])
+        with self._lock:
+            base = self._all
+            for field, value in filters.items():
+                if field in self._by_field and _indexable(value):
+                    bucket = self._by_field[field].get(value, [])
+                    if len(bucket) < len(base):
+                        base = bucket
+            end = bisect.bisect_left(base, after) if after is not None else len(base)
+            out = []
+            for i in range(end - 1, -1, -1):
+                order_id = base[i][1]
+                data = self._orders[order_id]
+                if all(field in data and data[field] == value for field, value in filters.items()):
+                    item = dict(data)
+                    item['id'] = order_id
+                    out.append(item)
+                    if limit is not None and len(out) >= limit:
+                        break
+            return out
+
+    def stats(self):
+        with self._lock:
+            return {
+                'healthy': self.is_healthy(),
+                'loaded': self._loaded,
+                'orders': len(self._orders),
+                'secondsSinceConfirmed': round(self._clock() - self._last_ok, 1) if self._last_ok else None,
+                'readTime': self._read_time.isoformat() if self._read_time is not None else None,
+            }
+
+
+# Klucz sortowania: tylko daty (jak timestampy Firestore); data bez strefy traktowana jako UTC
+def _timestamp(value):
+    if not isinstance(value, datetime):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+# Indeksowane są tylko wartości skalarne - lista czy słownik w polu nie może być kluczem
+def _indexable(value):
+    return value is None or isinstance(value, (str, int, float))
+
+
+def _discard(sorted_list, key):
+    i = bisect.bisect_left(sorted_list, key)
+    if i < len(sorted_list) and sorted_list[i] == key:
+        del sorted_list[i]
@@ -0,0 +1,332 @@
+# backend/search.py - pełnotekstowy indeks zleceń w pamięci procesu (GET /orders/search)
+import bisect
+import functools
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Pola indeksowane i ich wagi w rankingu (tytuł waży najwięcej)
+FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'tools': 2.0, 'description': 1.0}
+# Pola, po których można zawęzić wyniki (równość, jak w GET /orders)
+FILTER_FIELDS = ('trade', 'status')
+
+# Parametry BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MIN_TOKEN_LENGTH = 2
+# Ostatnie słowo zapytania dopasowywane jest też jako prefiks (wyszukiwanie w trakcie pisania)
+MAX_PREFIX_EXPANSIONS = 50
+MIN_PREFIX_LENGTH = 3
+# Wyniki ostatnich zapytań (czyszczone przy każdej zmianie indeksu) - powtarzane zapytania w czasie pisania
+RESULT_CACHE_SIZE = 256
+
+_FOLD = str.maketrans('ąćęłńóśźż', 'acelnoszz')
+_WORD_RE = re.compile(r'[^\W_]+')
+STOPWORDS = frozenset((
+    'a', 'i', 'o', 'u', 'w', 'z', 'na', 'do', 'od', 'po', 'ze', 'we', 'za', 'dla', 'oraz', 'lub',
+    'czy', 'jest', 'sie', 'nie', 'to', 'ten', 'ta', 'te', 'tak', 'jak', 'przy', 'pod', 'nad', 'bez',
+))
+# Końcówki fleksyjne (po usunięciu znaków diakrytycznych), najdłuższe najpierw.
+# Prosty stemmer: odcina jedną końcówkę, jeśli zostaje co najmniej MIN_STEM_LENGTH znaków,
+# np. rozdzielnica/rozdzielnicy/rozdzielnice -> rozdzielnik, syfon/syfonu/syfonem -> syfon.
+_SUFFIXES = sorted((
+    'owego', 'owych', 'owymi', 'owemu', 'ami', 'ach', 'owi', 'owa', 'owe', 'owy', 'ego', 'emu', 'ych',
+    'ymi', 'imi', 'ich', 'iem', 'iej', 'om', 'ow', 'em', 'ej', 'ym', 'im', 'ia', 'ie', 'iu', 'ii',
+    'a', 'e', 'i', 'o', 'u', 'y',
+), key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+
+
+def fold(text):
+    text = unicodedata.normalize('NFC', text.lower()).translate(_FOLD)
+    # Pozostałe znaki diakrytyczne (np. z innych języków) - rozkład NFD i usunięcie akcentów
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFD', text) if not unicodedata.combining(c))
+    return text
+
+
+def stem(token):
+    if token.isdigit():
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            token = token[:-len(suffix)]
+            break
+    # Oboczności w temacie: łazienka/łazience (k:c), rura/rurze (r:rz)
+    if token.endswith('c'):
+        return token[:-1] + 'k'
+    if token.endswith('rz'):
+        return token[:-1]
+    return token
+
+
+# Słowo -> termin indeksu (albo None dla słów pomijanych); słowa się powtarzają, więc wynik jest zapamiętywany
+@functools.lru_cache(maxsize=65536)
+def _term(word):
+    word = fold(word)
+    if len(word) < MIN_TOKEN_LENGTH or word in STOPWORDS:
+        return None
+    return stem(word)
+
+
+def tokenize(text):
+    return [t for t in map(_term, _WORD_RE.findall(text.lower())) if t is not None]
+
+
+def _field_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(v) for v in value if v is not None)
+    return str(value)
+
+
+# Indeks odwrócony: termin -> {id zlecenia: ważona liczba wystąpień}, ranking BM25.
+# Zapytanie to iloczyn terminów (każde słowo musi wystąpić), ostatnie słowo działa też jako prefiks.
+# Przebudowa (rebuild) nie blokuje wyszukiwań ani zmian - zmiany w trakcie są odtwarzane na nowym indeksie.
+class OrderSearchIndex:
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._index = None
+        self._replay = None
+        self._results = OrderedDict()  # (zapytanie, filtry, limit + offset) -> (liczba trafień, wyniki)
+        self.built_at = None
+
+    @property
+    def loaded(self):
+        return self._index is not None
+
+    def age(self):
+        return None if self.built_at is None else self._clock() - self.built_at
+
+    # orders - iterowalne zlecenia z polem 'id' (cała kolekcja)
+    def rebuild(self, orders):
+        with self._build_lock:
+            with self._lock:
+                self._replay = []
+            index = _Index()
+            for order in orders:
+                index.apply(order['id'], order)
+            with self._lock:
+                for order_id, data in self._replay:
+                    index.apply(order_id, data)
+                self._replay = None
+                self._index = index
+                self._results.clear()
+                self.built_at = self._clock()
+
+    # Zmiana zlecenia: data - aktualne dane albo None po usunięciu
+    def apply(self, order_id, data):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((order_id, data))
+            if self._index is not None:
+                self._index.apply(order_id, data)
+                self._results.clear()
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._results.clear()
+            self.built_at = None
+
+    # Zwraca (liczba trafień, [(wynik, zlecenie z polem 'id')...]) dla strony offset..offset+limit
+    def search(self, query, filters=None, limit=20, offset=0):
+        filters = filters or {}
+        key = (query, tuple(sorted(filters.items())), offset + limit)
+        with self._lock:
+            if self._index is None:
+                return 0, []
+            cached = self._results.get(key)
+            if cached is None:
+                cached = self._results[key] = self._index.search(query, filters, offset + limit)
+                if len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(key)
+            total, top = cached
+            return total, [(score, dict(item)) for score, item in top[offset:]]
+
+    def stats(self):
+        with self._lock:
+            index = self._index
+            if index is None:
+                return {'loaded': False, 'orders': 0, 'terms': 0}
+            return {'loaded': True, 'orders': len(index.docs), 'terms': len(index.postings)}
+
+
+class _Index:
+    def __init__(self):
+        self.postings = {}   # termin -> {id: ważone tf}
+        self.terms = []      # posortowany słownik terminów (dopasowanie prefiksów)
+        self.docs = {}       # id -> (zlecenie, terminy, długość dokumentu, klucz remisu)
+        self.by_field = {f: {} for f in FILTER_FIELDS}  # pole -> wartość -> zbiór id
+        self.total_length = 0.0
+
+    def apply(self, order_id, data):
+        self._remove(order_id)
+        if data is None:
+            return
+        weights = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(data.get(field))):
+                weights[term] = weights.get(term, 0.0) + weight
+                length += weight
+        item = dict(data)
+        item['id'] = order_id
+        self.docs[order_id] = (item, tuple(weights), length, _sort_created(item.get('created_at')))
+        self.total_length += length
+        for field in FILTER_FIELDS:
+            if _filterable(item.get(field)):
+                self.by_field[field].setdefault(item[field], set()).add(order_id)
+        for term, tf in weights.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            posting[order_id] = tf
+
+    def _remove(self, order_id):
+        doc = self.docs.pop(order_id, None)
+        if doc is None:
+            return
+        item, terms, length, _ = doc
+        self.total_length -= length
+        for field in FILTER_FIELDS:
+            if not _filterable(item.get(field)):
+                continue
+            ids = self.by_field[field][item[field]]
+            ids.discard(order_id)
+            if not ids:
+                del self.by_field[field][item[field]]
+        for term in terms:
+            posting = self.postings[term]
+            del posting[order_id]
+            if not posting:
+                del self.postings[term]
+                i = bisect.bisect_left(self.terms, term)
+                del self.terms[i]
+
+    def _expand(self, prefix):
+        out = []
+        i = bisect.bisect_left(self.terms, prefix)
+        while i < len(self.terms) and self.terms[i].startswith(prefix) and len(out) < MAX_PREFIX_EXPANSIONS:
+            out.append(self.terms[i])
+            i += 1
+        return out
+
+    def _group_ids(self, terms):
+        ids = set(self.postings[terms[0]])
+        for t in terms[1:]:
+            ids.update(self.postings[t])
+        return ids
+
+    # Zwraca (liczba trafień, [(wynik, zlecenie)...]) - najlepsze top wyników
+    def search(self, query, filters, top):
+        words = [fold(w) for w in _WORD_RE.findall(query.lower())]
+        # Krótkie słowa i słowa pomijane przy indeksowaniu nie zawężają wyników (ostatnie - jako prefiks tak)
+        words = [w for i, w in enumerate(words)
+                 if (len(w) >= MIN_TOKEN_LENGTH and w not in STOPWORDS) or i == len(words) - 1]
+        if not words or not self.docs:
+            return 0, []
+        # Każde słowo zapytania to grupa terminów (rdzeń, a dla ostatniego słowa także rozwinięcia prefiksu)
+        # Ostatnie słowo pomijane przy indeksowaniu ("syfon w", "syfon na") zostaje tylko jako prefiks
+        # i jest opcjonalne: zawęża wyniki, jeśli coś pasuje, inaczej jest ignorowane.
+        # Brak dopasowania słowa treści oznacza brak wyników.
+        groups = []
+        optional = None
+        for i, word in enumerate(words):
+            terms = {stem(word)} if len(word) >= MIN_TOKEN_LENGTH else set()
+            if i == len(words) - 1 and len(word) >= MIN_PREFIX_LENGTH:
+                terms.update(self._expand(word))
+            terms = [t for t in terms if t in self.postings]
+            if i == len(words) - 1 and _term(word) is None:
+                optional = terms or None
+                continue
+            if not terms:
+                return 0, []
+            groups.append(terms)
+
+        # Najpierw najrzadsza grupa - najmniejszy zbiór kandydatów do przecięcia
+        groups.sort(key=lambda terms: sum(len(self.postings[t]) for t in terms))
+        candidates = None
+        for terms in groups:
+            ids = self._group_ids(terms)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return 0, []
+        if optional is not None:
+            ids = self._group_ids(optional)
+            narrowed = ids if candidates is None else candidates & ids
+            if narrowed:
+                candidates = narrowed
+                groups.append(optional)
+        if candidates is None:
+            return 0, []
+        for field, value in filters.items():
+            candidates &= self.by_field[field].get(value, set())
+
+        # BM25: idf terminu i normalizacja długością dokumentu (a + c * długość)
+        n = len(self.docs)
+        k1p1 = BM25_K1 + 1
+        a = BM25_K1 * (1 - BM25_B)
+        c = BM25_K1 * BM25_B / (self.total_length / n)
+        weighted = [[(self.postings[t], math.log(1 + (n - len(self.postings[t]) + 0.5) / (len(self.postings[t]) + 0.5)))
+                     for t in terms] for terms in groups]
+        docs = self.docs
+        if len(weighted) == 1 and len(weighted[0]) == 1:
+            # Najczęstszy przypadek - jedno słowo bez rozwinięć prefiksu
+            posting, idf = weighted[0][0]
+            scored = []
+            for order_id in candidates:
+                tf = posting[order_id]
+                doc = docs[order_id]
+                scored.append((idf * tf * k1p1 / (tf + a + c * doc[2]), doc[3], order_id))
+        else:
+            scored = []
+            for order_id in candidates:
+                _, _, length, created = docs[order_id]
+                norm = a + c * length
+                score = 0.0
+                for group in weighted:
+                    # W grupie liczy się najlepiej pasujący termin (rdzeń albo rozwinięcie prefiksu)
+                    best = 0.0
+                    for posting, idf in group:
+                        tf = posting.get(order_id)
+                        if tf:
+                            s = idf * tf * k1p1 / (tf + norm)
+                            if s > best:
+                                best = s
+                    score += best
+                scored.append((score, created, order_id))
+
+        return len(scored), [(round(score, 4), docs[order_id][0])
+                             for score, _, order_id in heapq.nlargest(top, scored)]
+
+
+# Filtry przychodzą z query stringu - indeksowane są tylko wartości tekstowe
+# (lista czy słownik w polu trade/status nie może być kluczem, a i tak nie pasuje do żadnego filtra)
+def _filterable(value):
+    return isinstance(value, str)
+
+
+# Rozstrzyganie remisów: nowsze zlecenia wyżej (różne typy created_at sprowadzone do liczby)
+def _sort_created(value):
+    if value is None:
+        return 0.0
+    if hasattr(value, 'timestamp'):
+        try:
+            return value.timestamp()
+        except Exception:
+            return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    return 0.0
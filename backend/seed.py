@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# backend/seed.py - generator danych syntetycznych (zastępuje seed_data.py i seed_data2.py).
+# Tworzy N użytkowników i M zleceń z raportami na bazie słowników branż/narzędzi z dawnych seedów.
+# Stałe ziarno losowania => te same dane (i te same id) przy każdym uruchomieniu, więc ponowny
+# seed nadpisuje dokumenty zamiast je dublować.
+#
+# Przykłady:
+#   python seed.py                                   # 50 userów, 1000 zleceń, projekt z serviceAccountKey.json
+#   python seed.py --users 500 --orders 100000       # zbiór "produkcyjny" do testów pojemności
+#   python seed.py --emulator --project demo-test    # lokalny emulator (Firestore :8080, Auth :9099)
+import argparse
+import hashlib
+import os
+import random
+import string
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import firebase_admin
+from firebase_admin import credentials, auth, firestore
+from google.auth.credentials import AnonymousCredentials
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, 'serviceAccountKey.json')
+
+# Limity API: operacje w batchu Firestore / rekordy w jednym auth.import_users
+BATCH_SIZE = 500
+AUTH_IMPORT_SIZE = 1000
+
+# --- SŁOWNIKI (z seed_data.py / seed_data2.py) ---
+TRADES = {
+    'murarz': {
+        'titles': [
+            'Naprawa muru przy wejściu', 'Położenie płytek w łazience', 'Wymiana stopnia schodów',
+            'Malowanie fragmentu ściany', 'Drobne prace murarskie - ławka', 'Naprawa pęknięć elewacji',
+            'Murowanie ścianki działowej', 'Wyrównanie podłoża pod panele', 'Tynkowanie garażu',
+            'Renowacja murka ogrodowego', 'Murowanie grilla ogrodowego', 'Naprawa schodów betonowych',
+        ],
+        'tools': [
+            'kielnia', 'młotek', 'mieszadło', 'waga tynkowa', 'krzyżyki dystansowe', 'szpachla', 'miarka',
+            'przecinarka do płytek', 'piła', 'wkrętarka', 'klin', 'pędzle', 'wałki', 'folia ochronna',
+            'szpachelka', 'cement', 'rusztowanie przestawne', 'grunt', 'rusztowanie', 'poziomica', 'paca',
+        ],
+        'tags': ['remont', 'glazura', 'malowanie', 'elewacja', 'konstrukcja', 'podłoga', 'tynk', 'ogród'],
+        'sentences': [
+            'Na powierzchni widoczne są pęknięcia oraz drobne ubytki tynku.',
+            'Prace obejmują oczyszczenie uszkodzonych miejsc oraz ich uzupełnienie odpowiednią zaprawą.',
+            'Należy zachować pion i poziom na całej długości.',
+            'Podłoże wymaga wyrównania przed dalszymi pracami wykończeniowymi.',
+            'Całość powinna zostać zabezpieczona przed wpływem warunków atmosferycznych.',
+            'Efektem ma być równa i stabilna powierzchnia gotowa do dalszych prac.',
+        ],
+    },
+    'elektryk': {
+        'titles': [
+            'Instalacja gniazdka', 'Przegląd instalacji elektrycznej', 'Podłączenie płyty indukcyjnej',
+            'Podłączyć oświetlenie zewnętrzne', 'Wymiana rozdzielnicy elektrycznej',
+            'Montaż oświetlenia sufitowego', 'Podłączenie piekarnika', 'Naprawa gniazdka elektrycznego',
+            'Instalacja czujnika ruchu', 'Montaż gniazd USB',
+        ],
+        'tools': [
+            'śrubokręt izolowany', 'wkrętarka', 'tester napięcia', 'zaciskarka', 'miernik elektryczny',
+            'latarka', 'zestaw bezpieczników', 'kabel 3-fazowy', 'tester obciążeniowy', 'kabel outdoor',
+            'uszczelki', 'poziomica', 'miernik', 'śrubokręt',
+        ],
+        'tags': ['bezpieczeństwo', 'przegląd', 'AGD', 'oświetlenie', 'smart', 'modernizacja'],
+        'sentences': [
+            'Należy wykonać montaż zgodnie z obowiązującymi normami bezpieczeństwa.',
+            'Prace obejmują prowadzenie przewodów, montaż puszek i podłączenie urządzeń.',
+            'Trzeba zweryfikować stan przewodów oraz działanie zabezpieczeń różnicowoprądowych.',
+            'Po wykonaniu konieczny jest test bezpieczeństwa i poprawne oznakowanie obwodu.',
+            'W razie wykrycia problemów wykonawca ma przygotować raport i propozycję naprawy.',
+        ],
+    },
+    'hydraulik': {
+        'titles': [
+            'Naprawa instalacji wodnej', 'Uszczelnienie rury grzewczej', 'Wymiana baterii łazienkowej',
+            'Wymiana zaworu głównego', 'Naprawa spłuczki', 'Montaż kabiny prysznicowej',
+            'Odpowietrzenie instalacji grzewczej', 'Wymiana syfonu', 'Przegląd instalacji wodnej',
+        ],
+        'tools': [
+            'klucz nastawny', 'taśma teflonowa', 'uszczelki', 'nożyce do rur', 'klucz rurkowy',
+            'taśma uszczelniająca', 'manometr', 'śrubokręt', 'klucz', 'wkrętarka', 'poziomica',
+            'silikon', 'klucz do grzejników', 'latarka',
+        ],
+        'tags': ['pilne', 'łazienka', 'ogrzewanie', 'przegląd'],
+        'sentences': [
+            'Należy zlokalizować przeciek i naprawić połączenia.',
+            'Możliwe, że konieczna będzie wymiana odcinka rury lub uszczelnień przy złączkach.',
+            'Po naprawie przeprowadzony będzie test szczelności i przegląd pozostałych przyłączy.',
+            'Trzeba sprawdzić ciśnienie instalacji oraz ewentualnie odpowietrzyć układ.',
+            'Po zakończeniu system powinien działać równomiernie.',
+        ],
+    },
+}
+
+STREETS = ['Lipowa', 'Polna', 'Słoneczna', 'Leśna', 'Miodowa', 'Fabryczna', 'Długa', 'Ogrodowa',
+           'Krótka', 'Parkowa']
+ESTATES = ['Os. Zielone', 'Os. Nowe', 'Rynek']
+FIRST_NAMES = ['Marek', 'Janek', 'Piotr', 'Anna', 'Kasia', 'Tomasz', 'Ewa', 'Paweł', 'Agnieszka', 'Michał']
+REPORT_SENTENCES = [
+    'Rozpoczęto prace zgodnie z planem.',
+    'Dostarczono materiały na miejsce zlecenia.',
+    'Wykonano pierwszy etap prac, bez uwag.',
+    'Konieczna była dodatkowa wymiana elementów.',
+    'Zakończono prace i uporządkowano miejsce.',
+    'Klient potwierdził odbiór prac.',
+]
+
+# Rozkład statusów generowanych zleceń
+STATUS_WEIGHTS = (('open', 50), ('assigned', 35), ('closed', 15))
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Generator danych testowych (users, orders, reports).")
+    p.add_argument('--users', type=int, default=50, help="liczba workerów (oprócz admina)")
+    p.add_argument('--orders', type=int, default=1000, help="liczba zleceń")
+    p.add_argument('--max-reports', type=int, default=3, help="maks. liczba raportów na przypisane zlecenie")
+    p.add_argument('--days', type=int, default=90, help="zakres dat created_at (dni wstecz)")
+    p.add_argument('--seed', type=int, default=42, help="ziarno losowania")
+    p.add_argument('--workers', type=int, default=8, help="liczba równoległych commitów")
+    p.add_argument('--password', default='worker', help="hasło wszystkich kont testowych")
+    p.add_argument('--skip-auth', action='store_true', help="nie twórz kont w Firebase Auth")
+    p.add_argument('--emulator', action='store_true',
+                   help="użyj lokalnego emulatora (FIRESTORE_EMULATOR_HOST / FIREBASE_AUTH_EMULATOR_HOST)")
+    p.add_argument('--project', default='demo-seed', help="project id dla emulatora")
+    return p.parse_args(argv)
+
+
+# Poświadczenia dla emulatora - nie wymaga klucza serwisowego
+class _EmulatorCredential(credentials.Base):
+    def get_credential(self):
+        return AnonymousCredentials()
+
+
+def init_firebase(args):
+    if args.emulator:
+        os.environ.setdefault('FIRESTORE_EMULATOR_HOST', 'localhost:8080')
+        os.environ.setdefault('FIREBASE_AUTH_EMULATOR_HOST', 'localhost:9099')
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(_EmulatorCredential(), {'projectId': args.project})
+        print(f"Emulator: firestore={os.environ['FIRESTORE_EMULATOR_HOST']} "
+              f"auth={os.environ['FIREBASE_AUTH_EMULATOR_HOST']} project={args.project}")
+    else:
+        if not os.path.exists(SERVICE_ACCOUNT_PATH):
+            print("Brak pliku serviceAccountKey.json w katalogu backend/. Nie commituj klucza do repo.")
+            sys.exit(1)
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(SERVICE_ACCOUNT_PATH))
+    return firestore.client()
+
+
+# Id w stylu Firestore (20 znaków), ale z generatora o stałym ziarnie
+def _doc_id(rng):
+    return ''.join(rng.choices(string.ascii_letters + string.digits, k=20))
+
+
+def generate_users(rng, count):
+    users = [{'uid': 'seed-admin', 'email': 'admin@example.com', 'displayName': 'Administrator',
+              'role': 'admin', 'trade': ''}]
+    trades = list(TRADES)
+    for i in range(count):
+        trade = trades[i % len(trades)]
+        users.append({
+            'uid': f'seed-worker-{i:05d}',
+            'email': f'worker{i:05d}@example.com',
+            'displayName': f'{rng.choice(FIRST_NAMES)} {trade.capitalize()} {i}',
+            'role': 'worker',
+            'trade': trade,
+        })
+    return users
+
+
+# Zlecenia razem z raportami: zwraca listę (zlecenie, [raporty]).
+# reportCount / lastReportAt są spójne z raportami (tak jak utrzymuje je post_report).
+def generate_orders(rng, count, users, max_reports, days):
+    admin = users[0]
+    by_trade = {}
+    for u in users[1:]:
+        by_trade.setdefault(u['trade'], []).append(u)
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    statuses = [s for s, _ in STATUS_WEIGHTS]
+    weights = [w for _, w in STATUS_WEIGHTS]
+    out = []
+    for _ in range(count):
+        trade = rng.choice(list(TRADES))
+        vocab = TRADES[trade]
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        status = rng.choices(statuses, weights)[0]
+        assignee = None
+        if status != 'open' and by_trade.get(trade):
+            assignee = rng.choice(by_trade[trade])
+        else:
+            status = 'open'
+
+        reports = []
+        if assignee is not None:
+            t = created_at
+            for _ in range(rng.randint(0, max_reports)):
+                t = t + timedelta(seconds=rng.randrange(1, 3 * 86400))
+                if t > now:
+                    break
+                reports.append({
+                    'id': _doc_id(rng),
+                    'authorUid': assignee['uid'],
+                    'authorName': assignee['displayName'],
+                    'text': ' '.join(rng.sample(REPORT_SENTENCES, 2)),
+                    'created_at': t,
+                })
+
+        if rng.random() < 0.7:
+            location = f'Ulica {rng.choice(STREETS)} {rng.randint(1, 40)}'
+        else:
+            location = f'{rng.choice(ESTATES)} {rng.randint(1, 30)}'
+        participants = [admin['uid']] + ([assignee['uid']] if assignee else [])
+        order = {
+            'id': _doc_id(rng),
+            'title': rng.choice(vocab['titles']),
+            'description': ' '.join(rng.sample(vocab['sentences'], 3)),
+            'trade': trade,
+            'status': status,
+            'price': rng.randrange(100, 5000, 50),
+            'location': location,
+            'ownerUid': admin['uid'],
+            'assignedTo': assignee['uid'] if assignee else None,
+            'created_at': created_at,
+            'updated_at': reports[-1]['created_at'] if reports else created_at,
+            'tags': rng.sample(vocab['tags'], rng.randint(0, 2)),
+            'tools': rng.sample(vocab['tools'], rng.randint(2, 5)),
+            'participants': participants,
+            'reportCount': len(reports),
+            'lastReportAt': reports[-1]['created_at'] if reports else None,
+        }
+        out.append((order, reports))
+    return out
+
+
+# Konta w Auth hurtem: import_users przyjmuje do 1000 rekordów na wywołanie (zamiast create_user po kolei).
+# Hasło przekazywane jako SHA-256 bez soli; rola od razu w custom claims.
+def import_auth_users(users, password):
+    password_hash = hashlib.sha256(password.encode('utf-8')).digest()
+    hash_alg = auth.UserImportHash.sha256(rounds=1)
+    imported = failed = 0
+    for i in range(0, len(users), AUTH_IMPORT_SIZE):
+        chunk = users[i:i + AUTH_IMPORT_SIZE]
+        records = [
+            auth.ImportUserRecord(
+                uid=u['uid'], email=u['email'], display_name=u['displayName'],
+                custom_claims={'role': u['role']}, password_hash=password_hash,
+            )
+            for u in chunk
+        ]
+        result = auth.import_users(records, hash_alg=hash_alg)
+        imported += result.success_count
+        failed += result.failure_count
+        for err in result.errors[:5]:
+            print(f"  Auth: {chunk[err.index]['email']}: {err.reason}")
+    print(f"Auth: zaimportowano {imported}, błędy {failed} (istniejące konta zostają bez zmian)")
+
+
+# Operacje zapisu (ref, dane) dla wszystkich kolekcji
+def iter_writes(db, users, orders):
+    for u in users:
+        profile = {k: v for k, v in u.items() if k != 'uid'}
+        profile['created_at'] = firestore.SERVER_TIMESTAMP
+        yield db.collection('users').document(u['uid']), profile
+    for order, reports in orders:
+        data = dict(order)
+        order_ref = db.collection('orders').document(data.pop('id'))
+        yield order_ref, data
+        for r in reports:
+            r = dict(r)
+            yield order_ref.collection('reports').document(r.pop('id')), r
+
+
+# Batche po BATCH_SIZE commitowane równolegle; liczba batchy w locie jest ograniczona,
+# żeby przy dużych zbiorach nie trzymać w pamięci wszystkich naraz.
+def write_batched(db, writes, workers):
+    written = 0
+
+    def commit(chunk):
+        batch = db.batch()
+        for ref, data in chunk:
+            batch.set(ref, data)
+        batch.commit()
+        return len(chunk)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        chunk = []
+        for w in writes:
+            chunk.append(w)
+            if len(chunk) >= BATCH_SIZE:
+                in_flight.append(pool.submit(commit, chunk))
+                chunk = []
+            if len(in_flight) >= workers * 2:
+                written += in_flight.pop(0).result()
+        if chunk:
+            in_flight.append(pool.submit(commit, chunk))
+        for f in in_flight:
+            written += f.result()
+    return written
+
+
+def seed(argv=None):
+    args = parse_args(argv)
+    db = init_firebase(args)
+    rng = random.Random(args.seed)
+
+    started = time.time()
+    users = generate_users(rng, args.users)
+    orders = generate_orders(rng, args.orders, users, args.max_reports, args.days)
+    report_total = sum(len(r) for _, r in orders)
+    print(f"Wygenerowano: {len(users)} użytkowników, {len(orders)} zleceń, {report_total} raportów "
+          f"(seed={args.seed})")
+
+    if not args.skip_auth:
+        import_auth_users(users, args.password)
+
+    written = write_batched(db, iter_writes(db, users, orders), args.workers)
+    print(f"Firestore: zapisano {written} dokumentów w {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    seed()
@@ -0,0 +1,587 @@
+# backend/storage.py - dostęp do danych (użytkownicy, zlecenia, raporty) za wspólnym interfejsem.
+# Implementacje: Firestore (produkcja), pamięć procesu i SQLite (instance/storage.sqlite3) -
+# dwie ostatnie pozwalają uruchomić i profilować backend bez sieci i bez klucza serwisowego.
+# Wybór przez STORAGE_BACKEND (firestore | memory | sqlite), patrz create_storage().
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+
+from orders_cache import OrdersCache
+
+logger = logging.getLogger("backend.storage")
+
+# Limit operacji w jednym batchu Firestore
+BATCH_SIZE = 500
+
+
+# Zapis warunkowy odrzucony - dokument zmienił się od odczytu
+class StorageConflict(Exception):
+    pass
+
+
+# Interfejs repozytorium. Zlecenia zwracane są jako słowniki z polem 'id'.
+# 'version' to nieprzezroczysty znacznik wersji dokumentu do zapisu warunkowego (update_order).
+# Wartości firestore.SERVER_TIMESTAMP w zapisywanych danych oznaczają "czas serwera".
+class Storage(ABC):
+    name = None
+
+    @abstractmethod
+    def get_user(self, uid):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_users(self, uids):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_user(self, uid, data):
+        raise NotImplementedError
+
+    # (profil lub None, zlecenie lub None, wersja zlecenia) - jednym odczytem, jeśli backend pozwala
+    def get_user_and_order(self, uid, order_id):
+        return (self.get_user(uid),) + self.get_order_for_update(order_id)
+
+    @abstractmethod
+    def get_order(self, order_id, fields=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_order_for_update(self, order_id):
+        raise NotImplementedError
+
+    # Zlecenia spełniające filtry równościowe, malejąco po (created_at, id), za kursorem after
+    @abstractmethod
+    def query_orders(self, filters, fields=None, after=None, limit=None):
+        raise NotImplementedError
+
+    def new_order_id(self):
+        return uuid.uuid4().hex[:20]
+
+    def create_order(self, data):
+        order_id = self.new_order_id()
+        self.write_orders([(order_id, data)])
+        return order_id
+
+    # Zapis wielu zleceń [(id, dane)]; zwraca zbiór id, których nie udało się zapisać
+    @abstractmethod
+    def write_orders(self, items):
+        raise NotImplementedError
+
+    # Zapis warunkowy (version z get_order_for_update) - StorageConflict, jeśli dokument się zmienił
+    @abstractmethod
+    def update_order(self, order_id, data, version=None):
+        raise NotImplementedError
+
+    # Raport + reportCount/lastReportAt na zleceniu atomowo; zwraca id raportu
+    @abstractmethod
+    def add_report(self, order_id, report):
+        raise NotImplementedError
+
+    # Raporty zlecenia [(id, dane)] malejąco po (created_at, id), za kursorem after = (created_at, id)
+    @abstractmethod
+    def list_reports(self, order_id, after=None, limit=None):
+        raise NotImplementedError
+
+    # Raporty wszystkich zleceń (id zlecenia, id raportu, dane) malejąco po (created_at, id zlecenia, id raportu).
+    # filters - równość na polach raportu (np. authorUid) oraz 'order_id';
+    # after - kursor (created_at, id zlecenia, id raportu) ostatniego raportu poprzedniej strony
+    @abstractmethod
+    def query_reports(self, filters, after=None, limit=None):
+        raise NotImplementedError
+
+
+def _project(data, fields):
+    if fields is None:
+        return data
+    out = {f: data[f] for f in fields if f in data}
+    if 'id' in data:
+        out['id'] = data['id']
+    return out
+
+
+# Podmiana SERVER_TIMESTAMP na bieżący czas (backendy lokalne)
+def _resolve(data, now=None):
+    now = now or datetime.now(timezone.utc)
+    return {k: (now if v is firestore.SERVER_TIMESTAMP else v) for k, v in data.items()}
+
+
+class FirestoreStorage(Storage):
+    name = 'firestore'
+
+    def __init__(self, db=None, write_workers=4):
+        self.db = db if db is not None else firestore.client()
+        self.write_workers = write_workers
+
+    def get_user(self, uid):
+        doc = self.db.collection('users').document(uid).get()
+        return doc.to_dict() if doc.exists else None
+
+    # Wiele profili jednym wywołaniem get_all (BatchGetDocuments)
+    def get_users(self, uids):
+        refs = [self.db.collection('users').document(u) for u in uids]
+        if not refs:
+            return {}
+        return {snap.id: snap.to_dict() for snap in self.db.get_all(refs) if snap.exists}
+
+    def set_user(self, uid, data):
+        self.db.collection('users').document(uid).set(data, merge=True)
+
+    def get_user_and_order(self, uid, order_id):
+        user_ref = self.db.collection('users').document(uid)
+        order_ref = self.db.collection('orders').document(order_id)
+        snaps = {snap.reference.path: snap for snap in self.db.get_all([user_ref, order_ref])}
+        user_doc = snaps[user_ref.path]
+        order, version = self._versioned(snaps[order_ref.path])
+        return (user_doc.to_dict() if user_doc.exists else None), order, version
+
+    def get_order(self, order_id, fields=None):
+        doc = self.db.collection('orders').document(order_id).get(field_paths=fields)
+        return _doc_to_dict(doc) if doc.exists else None
+
+    def get_order_for_update(self, order_id):
+        return self._versioned(self.db.collection('orders').document(order_id).get())
+
+    def _versioned(self, doc):
+        if not doc.exists:
+            return None, None
+        return _doc_to_dict(doc), doc.update_time
+
+    def query_orders(self, filters, fields=None, after=None, limit=None):
+        q = self.db.collection('orders')
+        for field, value in filters.items():
+            q = q.where(field, '==', value)
+        if fields is not None:
+            # Projekcja po stronie Firestore (select) - niepotrzebne pola nie opuszczają bazy
+            q = q.select(fields)
+        q = q.order_by('created_at', direction=firestore.Query.DESCENDING) \
+            .order_by('__name__', direction=firestore.Query.DESCENDING)  # '__name__' = id dokumentu
+        if after is not None:
+            q = q.start_after({'created_at': after[0], '__name__': after[1]})
+        if limit is not None:
+            q = q.limit(limit)
+        return (_doc_to_dict(d) for d in q.stream())
+
+    def new_order_id(self):
+        return self.db.collection('orders').document().id
+
+    def create_order(self, data):
+        _, doc_ref = self.db.collection('orders').add(data)
+        return doc_ref.id
+
+    # Batche po BATCH_SIZE commitowane równolegle. Batch jest atomowy, więc błąd commitu
+    # oznacza wszystkie jego pozycje jako nieudane.
+    def write_orders(self, items):
+        chunks = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        failed = set()
+
+        def commit(chunk):
+            batch = self.db.batch()
+            for order_id, data in chunk:
+                batch.set(self.db.collection('orders').document(order_id), data)
+            try:
+                batch.commit()
+            except Exception as e:
+                logger.exception("Błąd zapisu batcha zleceń: %s", e)
+                failed.update(order_id for order_id, _ in chunk)
+
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                commit(chunk)
+        else:
+            with ThreadPoolExecutor(max_workers=self.write_workers) as pool:
+                list(pool.map(commit, chunks))
+        return failed
+
+    def update_order(self, order_id, data, version=None):
+        option = self.db.write_option(last_update_time=version) if version is not None else None
+        try:
+            self.db.collection('orders').document(order_id).update(data, option=option)
+        except FailedPrecondition as e:
+            raise StorageConflict(str(e))
+
+    # Raport do pod-kolekcji razem z licznikami na zleceniu w jednym batchu
+    def add_report(self, order_id, report):
+        order_ref = self.db.collection('orders').document(order_id)
+        report_ref = order_ref.collection('reports').document()
+        batch = self.db.batch()
+        batch.set(report_ref, report)
+        batch.update(order_ref, {
+            'reportCount': firestore.Increment(1),
+            'lastReportAt': firestore.SERVER_TIMESTAMP
+        })
+        batch.commit()
+        return report_ref.id
+
+    def list_reports(self, order_id, after=None, limit=None):
+        q = self.db.collection('orders').document(order_id).collection('reports') \
+            .order_by('created_at', direction=firestore.Query.DESCENDING) \
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        if after is not None:
+            q = q.start_after({'created_at': after[0], '__name__': after[1]})
+        if limit is not None:
+            q = q.limit(limit)
+        return [(d.id, d.to_dict()) for d in q.stream()]
+
+    # Jedno zapytanie collection_group('reports') zamiast zapytania per zlecenie.
+    # Wymaga indeksów o zakresie grupy kolekcji: created_at DESC (pole pojedyncze)
+    # oraz authorUid ASC + created_at DESC (złożony) dla filtra autora.
+    # Z filtrem order_id wystarcza pod-kolekcja zlecenia (ta sama kolejność, '__name__' to pełna ścieżka).
+    def query_reports(self, filters, after=None, limit=None):
+        filters = dict(filters)
+        order_id = filters.pop('order_id', None)
+        if order_id is not None:
+            q = self.db.collection('orders').document(order_id).collection('reports')
+        else:
+            q = self.db.collection_group('reports')
+        for field, value in filters.items():
+            q = q.where(field, '==', value)
+        q = q.order_by('created_at', direction=firestore.Query.DESCENDING) \
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        if after is not None:
+            ref = self.db.collection('orders').document(after[1]).collection('reports').document(after[2])
+            q = q.start_after({'created_at': after[0], '__name__': ref})
+        if limit is not None:
+            q = q.limit(limit)
+        return ((d.reference.parent.parent.id, d.id, d.to_dict()) for d in q.stream())
+
+
+def _doc_to_dict(doc):
+    data = doc.to_dict()
+    data['id'] = doc.id
+    return data
+
+
+# Wszystko w pamięci procesu. Zlecenia trzymane w indeksie OrdersCache (ten sam, którego
+# używa listener Firestore), więc listy kosztują tyle samo co odczyt z cache.
+class MemoryStorage(Storage):
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users = {}
+        self._orders = OrdersCache()
+        self._versions = {}
+        self._reports = {}  # order_id -> {report_id: dane}
+
+    def get_user(self, uid):
+        with self._lock:
+            user = self._users.get(uid)
+            return None if user is None else dict(user)
+
+    def get_users(self, uids):
+        with self._lock:
+            return {u: dict(self._users[u]) for u in uids if u in self._users}
+
+    def set_user(self, uid, data):
+        with self._lock:
+            self._users.setdefault(uid, {}).update(_resolve(data))
+
+    def get_order(self, order_id, fields=None):
+        data = self._orders.get(order_id)
+        if data is None:
+            return None
+        data['id'] = order_id
+        return _project(data, fields)
+
+    def get_order_for_update(self, order_id):
+        with self._lock:
+            return self.get_order(order_id), self._versions.get(order_id)
+
+    def query_orders(self, filters, fields=None, after=None, limit=None):
+        return iter([_project(o, fields) for o in self._orders.query(filters, after=after, limit=limit)])
+
+    def write_orders(self, items):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for order_id, data in items:
+                self._orders.put(order_id, _resolve(data, now))
+                self._versions[order_id] = self._versions.get(order_id, 0) + 1
+        return set()
+
+    def update_order(self, order_id, data, version=None):
+        with self._lock:
+            current = self._orders.get(order_id)
+            if current is None:
+                raise KeyError(order_id)
+            if version is not None and self._versions.get(order_id) != version:
+                raise StorageConflict(order_id)
+            current.update(_resolve(data))
+            self._orders.put(order_id, current)
+            self._versions[order_id] = self._versions.get(order_id, 0) + 1
+
+    def add_report(self, order_id, report):
+        now = datetime.now(timezone.utc)
+        report_id = self.new_order_id()
+        with self._lock:
+            current = self._orders.get(order_id)
+            if current is None:
+                raise KeyError(order_id)
+            self._reports.setdefault(order_id, {})[report_id] = _resolve(report, now)
+            current['reportCount'] = (current.get('reportCount') or 0) + 1
+            current['lastReportAt'] = now
+            self._orders.put(order_id, current)
+            self._versions[order_id] = self._versions.get(order_id, 0) + 1
+        return report_id
+
+    def list_reports(self, order_id, after=None, limit=None):
+        after = None if after is None else (after[0], order_id, after[1])
+        return [(rid, data) for _, rid, data in self.query_reports({'order_id': order_id}, after=after, limit=limit)]
+
+    def query_reports(self, filters, after=None, limit=None):
+        filters = dict(filters)
+        order_id = filters.pop('order_id', None)
+        with self._lock:
+            if order_id is not None:
+                source = [(order_id, self._reports.get(order_id, {}))]
+            else:
+                source = list(self._reports.items())
+            reports = [(oid, rid, dict(r)) for oid, by_id in source for rid, r in by_id.items()
+                       if all(r.get(f) == v for f, v in filters.items())]
+        reports.sort(key=lambda r: _report_key(r[2].get('created_at'), r[0], r[1]), reverse=True)
+        if after is not None:
+            cursor = _report_key(*after)
+            reports = [r for r in reports if _report_key(r[2].get('created_at'), r[0], r[1]) < cursor]
+        return iter(reports[:limit] if limit is not None else reports)
+
+
+# Klucz sortowania raportów zgodny z kursorem query_reports (raporty bez daty na końcu)
+def _report_key(created_at, order_id, report_id):
+    return created_at is not None, created_at, order_id, report_id
+
+
+# Kodowanie dat w kolumnach JSON (SQLite nie ma typu daty)
+def _json_default(value):
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    raise TypeError(f"Nieobsługiwany typ: {type(value).__name__}")
+
+
+def _json_hook(obj):
+    if len(obj) == 1 and '$dt' in obj:
+        return datetime.fromisoformat(obj['$dt'])
+    return obj
+
+
+def _dumps(data):
+    return json.dumps(data, default=_json_default, ensure_ascii=False)
+
+
+def _loads(raw):
+    return json.loads(raw, object_hook=_json_hook)
+
+
+# Klucz sortowania created_at - ISO w UTC porównuje się poprawnie jako tekst
+def _sort_key(created_at):
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at.astimezone(timezone.utc).isoformat(timespec='microseconds')
+    return created_at
+
+
+# SQLite: dokument jako JSON w kolumnie 'data', klucz sortowania i wersja w osobnych kolumnach.
+# Filtry równościowe przez json_extract. Jedno połączenie na wątek w trybie autocommit,
+# transakcje zapisu jawnie przez BEGIN.
+class SqliteStorage(Storage):
+    name = 'sqlite'
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS users (uid TEXT PRIMARY KEY, data TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS orders (id TEXT PRIMARY KEY, created_at TEXT, "
+        "version INTEGER NOT NULL DEFAULT 1, data TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at DESC, id DESC)",
+        "CREATE TABLE IF NOT EXISTS reports (id TEXT PRIMARY KEY, order_id TEXT NOT NULL, "
+        "created_at TEXT, data TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS reports_order ON reports (order_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at DESC, order_id DESC, id DESC)",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        for stmt in self.SCHEMA:
+            conn.execute(stmt)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_user(self, uid):
+        conn = self._conn()
+        row = conn.execute("SELECT data FROM users WHERE uid = ?", (uid,)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def get_users(self, uids):
+        uids = list(uids)
+        if not uids:
+            return {}
+        conn = self._conn()
+        rows = conn.execute(
+            f"SELECT uid, data FROM users WHERE uid IN ({','.join('?' * len(uids))})", uids).fetchall()
+        return {uid: _loads(data) for uid, data in rows}
+
+    def set_user(self, uid, data):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM users WHERE uid = ?", (uid,)).fetchone()
+            merged = _loads(row[0]) if row else {}
+            merged.update(_resolve(data))
+            conn.execute("INSERT OR REPLACE INTO users (uid, data) VALUES (?, ?)", (uid, _dumps(merged)))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get_order(self, order_id, fields=None):
+        order, _ = self.get_order_for_update(order_id)
+        return None if order is None else _project(order, fields)
+
+    def get_order_for_update(self, order_id):
+        conn = self._conn()
+        row = conn.execute("SELECT data, version FROM orders WHERE id = ?", (order_id,)).fetchone()
+        if row is None:
+            return None, None
+        data = _loads(row[0])
+        data['id'] = order_id
+        return data, row[1]
+
+    def query_orders(self, filters, fields=None, after=None, limit=None):
+        sql = "SELECT id, data FROM orders WHERE created_at IS NOT NULL"
+        params = []
+        for field, value in filters.items():
+            path = '$.' + field
+            if value is None:
+                sql += " AND json_type(data, ?) = 'null'"
+                params.append(path)
+            else:
+                sql += " AND json_extract(data, ?) = ?"
+                params += [path, value]
+        if after is not None:
+            key = _sort_key(after[0])
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [key, key, after[1]]
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        conn = self._conn()
+        rows = conn.execute(sql, params).fetchall()
+        out = []
+        for order_id, raw in rows:
+            data = _loads(raw)
+            data['id'] = order_id
+            out.append(_project(data, fields))
+        return iter(out)
+
+    def write_orders(self, items):
+        now = datetime.now(timezone.utc)
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            for order_id, data in items:
+                data = _resolve(data, now)
+                conn.execute(
+                    "INSERT INTO orders (id, created_at, version, data) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at, "
+                    "version = orders.version + 1, data = excluded.data",
+                    (order_id, _sort_key(data.get('created_at')), _dumps(data)))
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            logger.exception("Błąd zapisu zleceń: %s", e)
+            return {order_id for order_id, _ in items}
+        conn.execute("COMMIT")
+        return set()
+
+    def update_order(self, order_id, data, version=None):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data, version FROM orders WHERE id = ?", (order_id,)).fetchone()
+            if row is None:
+                raise KeyError(order_id)
+            if version is not None and row[1] != version:
+                raise StorageConflict(order_id)
+            merged = _loads(row[0])
+            merged.update(_resolve(data))
+            conn.execute("UPDATE orders SET data = ?, created_at = ?, version = version + 1 WHERE id = ?",
+                         (_dumps(merged), _sort_key(merged.get('created_at')), order_id))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def add_report(self, order_id, report):
+        now = datetime.now(timezone.utc)
+        report = _resolve(report, now)
+        report_id = self.new_order_id()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM orders WHERE id = ?", (order_id,)).fetchone()
+            if row is None:
+                raise KeyError(order_id)
+            order = _loads(row[0])
+            order['reportCount'] = (order.get('reportCount') or 0) + 1
+            order['lastReportAt'] = now
+            conn.execute("UPDATE orders SET data = ?, version = version + 1 WHERE id = ?",
+                         (_dumps(order), order_id))
+            conn.execute("INSERT INTO reports (id, order_id, created_at, data) VALUES (?, ?, ?, ?)",
+                         (report_id, order_id, _sort_key(report.get('created_at')), _dumps(report)))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return report_id
+
+    def list_reports(self, order_id, after=None, limit=None):
+        after = None if after is None else (after[0], order_id, after[1])
+        return [(rid, data) for _, rid, data in self.query_reports({'order_id': order_id}, after=after, limit=limit)]
+
+    def query_reports(self, filters, after=None, limit=None):
+        sql = "SELECT order_id, id, data FROM reports WHERE 1 = 1"
+        params = []
+        for field, value in filters.items():
+            if field == 'order_id':
+                sql += " AND order_id = ?"
+                params.append(value)
+            else:
+                sql += " AND json_extract(data, ?) = ?"
+                params += ['$.' + field, value]
+        if after is not None:
+            key = _sort_key(after[0])
+            sql += " AND (created_at < ? OR (created_at = ? AND (order_id < ? OR (order_id = ? AND id < ?))))"
+            params += [key, key, after[1], after[1], after[2]]
+        sql += " ORDER BY created_at DESC, order_id DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._conn().execute(sql, params).fetchall()
+        return iter([(order_id, rid, _loads(data)) for order_id, rid, data in rows])
+
+
+def create_storage(backend, sqlite_path=None, **kwargs):
+    if backend == 'firestore':
+        return FirestoreStorage(**kwargs)
+    if backend == 'memory':
+        return MemoryStorage()
+    if backend == 'sqlite':
+        return SqliteStorage(sqlite_path)
+    raise ValueError(f"Nieznany STORAGE_BACKEND: {backend}")
@@ -0,0 +1,191 @@
+# backend/tests/test_app.py - testy endpointów list zleceń app.py na backendzie pamięciowym
+# (STORAGE_BACKEND=memory, bez sieci): paginacja tokenem strony, projekcja ?fields=
+# oraz ETag/304 razem z kompresją odpowiedzi.
+#
+#   python -m pytest -q backend/tests
+import gzip
+import os
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Konfiguracja czytana przy imporcie app.py
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+os.environ.setdefault('TOKEN_REVOCATION_CHECK', '0')
+
+import app  # noqa: E402
+import metrics  # noqa: E402
+import storage  # noqa: E402
+
+T0 = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def order(minutes, trade='hydraulik', status='open', **fields):
+    data = {'title': f'Zlecenie {minutes}', 'description': 'Opis ' * 20, 'trade': trade, 'status': status,
+            'assignedTo': None, 'created_at': T0 + timedelta(minutes=minutes),
+            'updated_at': T0 + timedelta(minutes=minutes)}
+    data.update(fields)
+    return data
+
+
+@unittest.skipUnless(app.STORAGE_BACKEND == 'memory', 'wymaga STORAGE_BACKEND=memory')
+class AppTestCase(unittest.TestCase):
+    def setUp(self):
+        # Świeży magazyn na każdy test; cache odpowiedzi zależnych od danych czyszczone
+        patcher = mock.patch.object(app, 'storage',
+                                    metrics.InstrumentedStorage(storage.MemoryStorage(), app._request_stats))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app._on_orders_reset()
+        app.profile_cache.clear()
+        self.client = app.app.test_client()
+        self.as_user('w1')
+
+    def as_user(self, uid):
+        now = time.time()
+        patcher = mock.patch.object(app, '_verify_id_token',
+                                    return_value={'uid': uid, 'iat': now, 'exp': now + 3600})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.headers = {'Authorization': f'Bearer test-{uid}-{self.id()}'}
+
+    def write(self, items):
+        self.assertEqual(app.storage.write_orders(items), set())
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers={**self.headers, **headers})
+
+
+class PaginationTest(AppTestCase):
+    # Strony po limit zleceń malejąco po (created_at, id); ostatnia bez X-Next-Page-Token
+    def test_page_tokens_walk_the_list(self):
+        self.write([(f'o{i}', order(i)) for i in range(5)] + [('tie', order(2))])
+        seen = []
+        token = None
+        while True:
+            resp = self.get('/orders?limit=2' + (f'&page_token={token}' if token else ''))
+            self.assertEqual(resp.status_code, 200)
+            seen.append([o['id'] for o in resp.get_json()])
+            token = resp.headers.get('X-Next-Page-Token')
+            if not token:
+                break
+        self.assertEqual(seen, [['o4', 'o3'], ['tie', 'o2'], ['o1', 'o0']])
+
+    def test_page_token_with_filters(self):
+        self.write([('a', order(1)), ('b', order(2, trade='elektryk')), ('c', order(3)), ('d', order(4))])
+        resp = self.get('/orders?trade=hydraulik&limit=2')
+        self.assertEqual([o['id'] for o in resp.get_json()], ['d', 'c'])
+        token = resp.headers['X-Next-Page-Token']
+        resp = self.get(f'/orders?trade=hydraulik&limit=2&page_token={token}')
+        self.assertEqual([o['id'] for o in resp.get_json()], ['a'])
+        self.assertNotIn('X-Next-Page-Token', resp.headers)
+
+    def test_invalid_parameters(self):
+        for query in ('page_token=%21%21', 'limit=0', 'limit=abc'):
+            with self.subTest(query=query):
+                self.assertEqual(self.get(f'/orders?{query}').status_code, 400)
+
+
+class ProjectionTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write([('a', order(1, status='assigned', assignedTo='w1', tools=['klucz'], reportCount=2)),
+                    ('b', order(2))])
+        app.storage.set_user('w1', {'role': 'worker', 'displayName': 'Jan'})
+        app.storage.set_user('adm', {'role': 'admin'})
+
+    # Żądane pola oraz te potrzebne do kursora i ETag-a (created_at, updated_at); reszta pominięta
+    def test_list_fields(self):
+        items = self.get('/orders?fields=title').get_json()
+        self.assertEqual(items[0], {'id': 'b', 'title': 'Zlecenie 2', 'created_at': '2024-03-01T12:02:00+00:00',
+                                    'updated_at': '2024-03-01T12:02:00+00:00'})
+
+    def test_summary_preset(self):
+        for item in self.get('/orders?fields=summary').get_json():
+            self.assertNotIn('description', item)
+            self.assertLessEqual(set(item), set(app.FIELD_PRESETS['summary']) | {'id', 'updated_at'})
+        self.assertEqual(self.get('/orders?fields=summary').get_json()[1]['reportCount'], 2)
+
+    def test_single_order_fields(self):
+        self.assertEqual(self.get('/orders/a?fields=title,tools').get_json(),
+                         {'id': 'a', 'title': 'Zlecenie 1', 'tools': ['klucz']})
+        self.assertIn('description', self.get('/orders/a').get_json())
+
+    # Pola potrzebne endpointowi (join przypisanego użytkownika, hasReports) działają mimo projekcji
+    def test_admin_list_keeps_required_fields(self):
+        self.as_user('adm')
+        items = {o['id']: o for o in self.get('/admin/orders/current?fields=title').get_json()}
+        self.assertEqual(items['a']['assignedUser']['displayName'], 'Jan')
+        self.assertTrue(items['a']['hasReports'])
+        self.assertNotIn('description', items['a'])
+
+    def test_invalid_fields(self):
+        for fields in ('a-b', ','.join(f'f{i}' for i in range(app.MAX_PROJECTED_FIELDS + 1))):
+            with self.subTest(fields=fields):
+                self.assertEqual(self.get(f'/orders?fields={fields}').status_code, 400)
+        self.assertEqual(self.get('/orders/a?fields=a-b').status_code, 400)
+
+
+class ETagTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        # Dość zleceń, żeby lista przekroczyła COMPRESSION_MIN_SIZE
+        self.write([(f'o{i:02d}', order(i)) for i in range(20)])
+
+    def test_not_modified(self):
+        resp = self.get('/orders')
+        etag = resp.headers['ETag']
+        resp = self.get('/orders', **{'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.headers['ETag'], etag)
+        self.assertEqual(resp.data, b'')
+
+    # Zmiana zlecenia na stronie albo inne parametry strony dają inny ETag
+    def test_etag_follows_content(self):
+        etag = self.get('/orders').headers['ETag']
+        app.storage.update_order('o19', {'updated_at': T0 + timedelta(days=1)})
+        resp = self.get('/orders', **{'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp.headers['ETag'], etag)
+        self.assertNotEqual(self.get('/orders?fields=title').headers['ETag'], resp.headers['ETag'])
+
+    # Wariant skompresowany ma własny ETag (sufiks kodowania); If-None-Match pasuje do obu wariantów
+    def test_compressed_variant(self):
+        plain = self.get('/orders')
+        compressed = self.get('/orders', **{'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+        self.assertEqual(compressed.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+
+        for etag in (plain.headers['ETag'], compressed.headers['ETag']):
+            for accept in ('gzip', 'identity'):
+                with self.subTest(etag=etag, accept=accept):
+                    resp = self.get('/orders', **{'If-None-Match': etag, 'Accept-Encoding': accept})
+                    self.assertEqual(resp.status_code, 304)
+                    self.assertEqual(resp.headers['ETag'], etag)
+                    self.assertNotIn('Content-Encoding', resp.headers)
+
+    def test_small_responses_are_not_compressed(self):
+        resp = self.get('/orders?limit=1&fields=title', **{'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertFalse(resp.headers['ETag'].endswith('-gzip"'))
+
+    def test_reports_etag(self):
+        app.storage.set_user('adm', {'role': 'admin'})
+        self.as_user('adm')
+        app.storage.add_report('o01', {'authorUid': 'w1', 'text': 'raport', 'created_at': T0})
+        resp = self.get('/admin/orders/o01/reports')
+        self.assertEqual(len(resp.get_json()), 1)
+        etag = resp.headers['ETag']
+        self.assertEqual(self.get('/admin/orders/o01/reports', **{'If-None-Match': etag}).status_code, 304)
+        app.storage.add_report('o01', {'authorUid': 'w1', 'text': 'drugi', 'created_at': T0 + timedelta(hours=1)})
+        self.assertEqual(self.get('/admin/orders/o01/reports', **{'If-None-Match': etag}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
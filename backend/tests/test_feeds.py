@@ -0,0 +1,116 @@
+# backend/tests/test_feeds.py - testy feedów branż (feeds.py)
+#
+#   python -m pytest -q backend/tests
+import json
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from feeds import TradeFeeds  # noqa: E402
+
+
+def dumps(value):
+    return json.dumps(value, default=str).encode()
+
+
+def order(order_id, minute, trade='hydraulik', status='open', **fields):
+    data = {'id': order_id, 'title': order_id, 'trade': trade, 'status': status,
+            'created_at': datetime(2024, 1, 1, 12, minute, tzinfo=timezone.utc)}
+    data.update(fields)
+    return data
+
+
+def data(item):
+    return {k: v for k, v in item.items() if k != 'id'}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TradeFeedsTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.feeds = TradeFeeds(size=3, clock=self.clock)
+
+    def load(self, trade, orders):
+        generation = self.feeds.generation(trade)
+        return self.feeds.load(trade, orders, generation, dumps)
+
+    def ids(self, trade):
+        rendered = self.feeds.get(trade, dumps)
+        return None if rendered is None else [o['id'] for o in json.loads(rendered[0])]
+
+    def test_load_and_hit(self):
+        self.assertIsNone(self.feeds.get('hydraulik', dumps))
+        body, etag, count = self.load('hydraulik', [order('b', 2), order('a', 1)])
+        self.assertEqual(count, 2)
+        self.assertEqual(self.feeds.get('hydraulik', dumps), (body, etag, 2))
+        self.assertEqual(self.feeds.stats()['hits'], 1)
+
+    # Nowe otwarte zlecenie trafia na swoje miejsce w kolejności; ETag się zmienia
+    def test_apply_inserts_in_order(self):
+        _, etag, _ = self.load('hydraulik', [order('c', 3), order('a', 1)])
+        self.feeds.apply('b', data(order('b', 2)))
+        self.assertEqual(self.ids('hydraulik'), ['c', 'b', 'a'])
+        self.assertNotEqual(self.feeds.get('hydraulik', dumps)[1], etag)
+
+    def test_status_change_and_delete_remove_order(self):
+        self.load('hydraulik', [order('b', 2), order('a', 1)])
+        self.feeds.apply('b', data(order('b', 2, status='assigned')))
+        self.assertEqual(self.ids('hydraulik'), ['a'])
+        self.feeds.apply('a', None)
+        self.assertEqual(self.ids('hydraulik'), [])
+
+    def test_trade_change_moves_order(self):
+        self.load('hydraulik', [order('a', 1)])
+        self.load('elektryk', [order('e', 2, trade='elektryk')])
+        self.feeds.apply('a', data(order('a', 1, trade='elektryk')))
+        self.assertEqual(self.ids('hydraulik'), [])
+        self.assertEqual(self.ids('elektryk'), ['e', 'a'])
+
+    # Pełny feed obcinany do size; z obciętego feedu nie da się uzupełnić luki - jest budowany od nowa
+    def test_size_limit_and_truncated_feed(self):
+        self.load('hydraulik', [order('c', 3), order('b', 2), order('a', 1)])
+        self.feeds.apply('d', data(order('d', 4)))
+        self.assertEqual(self.ids('hydraulik'), ['d', 'c', 'b'])
+        self.feeds.apply('c', None)
+        self.assertIsNone(self.ids('hydraulik'))
+
+    # Zmiana w trakcie zapytania (load) - wynik zwracany, ale nie zapamiętywany
+    def test_change_during_load_is_not_cached(self):
+        generation = self.feeds.generation('hydraulik')
+        self.feeds.apply('b', data(order('b', 2)))
+        rendered = self.feeds.load('hydraulik', [order('a', 1)], generation, dumps)
+        self.assertEqual(rendered[2], 1)
+        self.assertIsNone(self.feeds.get('hydraulik', dumps))
+
+    def test_max_age(self):
+        feeds = TradeFeeds(size=3, max_age=10, clock=self.clock)
+        feeds.load('hydraulik', [order('a', 1)], feeds.generation('hydraulik'), dumps)
+        self.clock.now += 11
+        self.assertIsNone(feeds.get('hydraulik', dumps))
+
+    # Zlecenia z trade innym niż tekst albo created_at innym niż data nie psują feedów
+    def test_bad_orders_are_skipped(self):
+        self.load('hydraulik', [order('a', 1), order('x', 2, created_at='wczoraj')])
+        self.assertEqual(self.ids('hydraulik'), ['a'])
+        self.feeds.apply('b', data(order('b', 2, trade=['hydraulik', 'elektryk'])))
+        self.feeds.apply('c', data(order('c', 3, created_at=1700000000)))
+        naive = data(order('d', 4))
+        naive['created_at'] = datetime(2024, 1, 1, 12, 4)
+        self.feeds.apply('d', naive)
+        self.assertEqual(self.ids('hydraulik'), ['d', 'a'])
+        self.feeds.apply('d', None)
+        self.assertEqual(self.ids('hydraulik'), ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
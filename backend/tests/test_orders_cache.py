@@ -0,0 +1,112 @@
+# backend/tests/test_orders_cache.py - testy cache zleceń (orders_cache.py)
+#
+#   python -m pytest -q backend/tests
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from orders_cache import OrdersCache  # noqa: E402
+
+
+class FakeWatch:
+    def __init__(self):
+        self.is_active = True
+        self.resume_token = None
+        self.unsubscribed = False
+
+    def unsubscribe(self):
+        self.unsubscribed = True
+        self.is_active = False
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.watches = []
+        self.callback = None
+
+    def on_snapshot(self, callback):
+        self.callback = callback
+        self.watches.append(FakeWatch())
+        return self.watches[-1]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StalenessTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.collection = FakeCollection()
+        self.cache = OrdersCache(max_staleness=60, clock=self.clock)
+        # start() uruchamia wątek monitora - w teście kroki monitora wywołujemy ręcznie (_check)
+        self.cache._collection = self.collection
+        self.cache._subscribe()
+        created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.collection.callback([FakeDoc('a', {'trade': 'x', 'created_at': created})], [], None)
+
+    def test_healthy_after_snapshot(self):
+        self.assertTrue(self.cache.is_healthy())
+        self.assertEqual([o['id'] for o in self.cache.query({'trade': 'x'})], ['a'])
+
+    # Listener "aktywny", ale bez snapshotów i heartbeatów (np. w trakcie ponownego łączenia)
+    def test_silent_active_listener_becomes_unhealthy(self):
+        self.clock.now += 61
+        self.assertFalse(self.cache.is_healthy())
+        self.cache._check()
+        self.assertEqual(len(self.collection.watches), 2)
+        self.assertTrue(self.collection.watches[0].unsubscribed)
+        self.assertFalse(self.cache.is_healthy())
+
+    def test_heartbeat_keeps_cache_healthy(self):
+        watch = self.collection.watches[-1]
+        for i in range(5):
+            self.clock.now += 30
+            watch.resume_token = b'token-%d' % i
+            self.cache._check()
+        self.assertTrue(self.cache.is_healthy())
+        self.assertEqual(len(self.collection.watches), 1)
+
+    # Ten sam resume token to nie heartbeat
+    def test_repeated_resume_token_is_not_heartbeat(self):
+        watch = self.collection.watches[-1]
+        watch.resume_token = b'token'
+        self.cache._check()
+        self.clock.now += 61
+        self.cache._check()
+        self.assertEqual(len(self.collection.watches), 2)
+
+    def test_resubscribes_when_first_snapshot_never_arrives(self):
+        self.clock.now += 61
+        self.cache._check()
+        self.clock.now += 30
+        self.cache._check()
+        self.assertEqual(len(self.collection.watches), 2)
+        self.clock.now += 31
+        self.cache._check()
+        self.assertEqual(len(self.collection.watches), 3)
+
+    def test_inactive_listener_resubscribes(self):
+        self.collection.watches[-1].is_active = False
+        self.cache._check()
+        self.assertEqual(len(self.collection.watches), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# backend/tests/test_search.py - testy indeksu wyszukiwania zleceń (search.py)
+#
+#   python -m pytest -q backend/tests
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from search import OrderSearchIndex, fold, tokenize  # noqa: E402
+
+
+def order(order_id, title, minute=0, **fields):
+    data = {'id': order_id, 'title': title, 'trade': 'hydraulik', 'status': 'open',
+            'created_at': datetime(2024, 1, 1, 12, minute, tzinfo=timezone.utc)}
+    data.update(fields)
+    return data
+
+
+def ids(hits):
+    return [item['id'] for _, item in hits]
+
+
+def make_index():
+    index = OrderSearchIndex()
+    index.rebuild([
+        order('a', 'Wymiana syfonu', 1, description='Syfon cieknie pod zlewem'),
+        order('b', 'Naprawa spłuczki', 2, description='Przy okazji sprawdzić syfon'),
+        order('c', 'Wymiana rozdzielnicy', 3, description='Rozdzielnica w łazience', trade='elektryk',
+              status='assigned'),
+        order('d', 'Syfon', 4, tags=['łazienka']),
+    ])
+    return index
+
+
+class FoldingTest(unittest.TestCase):
+    def test_fold_removes_diacritics(self):
+        self.assertEqual(fold('Łazienka ŻÓŁĆ café'), 'lazienka zolc cafe')
+
+    # Odmiana i oboczności sprowadzone do jednego terminu; słowa pomijane i jednoliterowe znikają
+    def test_inflected_forms_share_a_term(self):
+        self.assertEqual(tokenize('rozdzielnica rozdzielnicy rozdzielnice'), ['rozdzielnik'] * 3)
+        self.assertEqual(tokenize('łazienka w łazience'), ['lazienk', 'lazienk'])
+        self.assertEqual(tokenize('rura i rurze'), ['rur', 'rur'])
+
+    def test_query_is_folded_like_documents(self):
+        index = make_index()
+        self.assertEqual(sorted(ids(index.search('rozdzielnice lazience')[1])), ['c'])
+        self.assertEqual(index.search('SYFONU')[0], 3)
+
+
+class RankingTest(unittest.TestCase):
+    # Dopasowanie w tytule waży więcej niż w opisie
+    def test_title_outranks_description(self):
+        self.assertEqual(ids(make_index().search('syfon')[1]), ['d', 'a', 'b'])
+
+    # Równy wynik - nowsze zlecenie wyżej
+    def test_ties_prefer_newer_orders(self):
+        index = OrderSearchIndex()
+        index.rebuild([order('old', 'Wymiana baterii', 1), order('new', 'Wymiana baterii', 2)])
+        hits = index.search('wymiana')[1]
+        self.assertEqual(hits[0][0], hits[1][0])
+        self.assertEqual(ids(hits), ['new', 'old'])
+
+    def test_every_word_must_match(self):
+        index = make_index()
+        self.assertEqual(ids(index.search('syfon łazienka')[1]), ['d'])
+        self.assertEqual(index.search('syfon kabel'), (0, []))
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(ids(make_index().search('wymiana rozdz')[1]), ['c'])
+
+    # Końcowe słowo pomijane przy indeksowaniu nie opróżnia wyników
+    def test_trailing_stopword(self):
+        index = make_index()
+        self.assertEqual(ids(index.search('syfon w')[1]), ['d', 'a', 'b'])
+        self.assertEqual(index.search('syfon na')[0], 3)
+
+    def test_filters_and_paging(self):
+        index = make_index()
+        self.assertEqual(ids(index.search('wymiana', {'trade': 'elektryk'})[1]), ['c'])
+        self.assertEqual(ids(index.search('wymiana', {'status': 'open'})[1]), ['a'])
+        total, hits = index.search('syfon', limit=1, offset=1)
+        self.assertEqual((total, ids(hits)), (3, ['a']))
+
+    # Zmiany po przebudowie od razu widoczne, także dla zapamiętanych wyników
+    def test_incremental_updates(self):
+        index = make_index()
+        self.assertEqual(index.search('syfon')[0], 3)
+        index.apply('e', {'title': 'Nowy syfon', 'trade': 'hydraulik', 'status': 'open'})
+        index.apply('d', None)
+        index.apply('a', {'title': 'Wymiana baterii', 'trade': 'hydraulik', 'status': 'open'})
+        self.assertEqual(sorted(ids(index.search('syfon')[1])), ['b', 'e'])
+        self.assertEqual(index.stats()['orders'], 4)
+
+
+class UnhashableFieldsTest(unittest.TestCase):
+    # Zlecenie z listą w polu trade/status (POST /orders sprzed walidacji) nie może zepsuć indeksu
+    def test_unhashable_filter_fields(self):
+        index = OrderSearchIndex()
+        index.rebuild([
+            order('a', 'Syfon cieknie'),
+            order('bad', 'Syfon pęknięty', trade=['x', 'y'], status={'s': 1}),
+        ])
+        self.assertEqual(sorted(ids(index.search('syfon')[1])), ['a', 'bad'])
+        self.assertEqual(ids(index.search('syfon', {'trade': 'hydraulik'})[1]), ['a'])
+
+        index.apply('bad', {'title': 'Syfon wymiana', 'trade': 'hydraulik', 'status': 'open'})
+        self.assertEqual(index.search('syfon', {'trade': 'hydraulik'})[0], 2)
+        index.apply('a', {'title': 'Syfon', 'trade': ['x'], 'status': None})
+        index.apply('a', None)
+        self.assertEqual(ids(index.search('syfon')[1]), ['bad'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+# backend/tests/test_storage.py - te same testy zachowania dla wszystkich backendów storage.py
+# (pamięć, SQLite i Firestore). Firestore testowany jest na emulatorze - bez FIRESTORE_EMULATOR_HOST
+# jego testy są pomijane.
+#
+#   python -m pytest -q backend/tests
+#   firebase emulators:exec --only firestore "python -m pytest -q backend/tests"
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from firebase_admin import firestore  # noqa: E402
+
+import storage  # noqa: E402
+from storage import StorageConflict  # noqa: E402
+
+EMULATOR_PROJECT = 'demo-storage-test'
+T0 = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+def order(minutes, trade='hydraulik', status='open', assigned_to=None, **fields):
+    data = {'title': f'Zlecenie {minutes}', 'trade': trade, 'status': status, 'assignedTo': assigned_to,
+            'created_at': at(minutes)}
+    data.update(fields)
+    return data
+
+
+def ids(orders):
+    return [o['id'] for o in orders]
+
+
+# Testy kontraktu Storage - klasa bazowa nie jest zbierana przez unittest (nie dziedziczy po TestCase)
+class StorageContract:
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+
+    def write(self, items):
+        self.assertEqual(self.storage.write_orders(items), set())
+
+    # Malejąco po (created_at, id) - przy równym created_at decyduje id
+    def test_query_order_and_cursor(self):
+        self.write([('a', order(1)), ('b', order(3)), ('c', order(2)), ('d', order(2)), ('e', order(0))])
+        all_orders = list(self.storage.query_orders({}))
+        self.assertEqual(ids(all_orders), ['b', 'd', 'c', 'a', 'e'])
+
+        pages = []
+        after = None
+        while True:
+            page = list(self.storage.query_orders({}, after=after, limit=2))
+            pages.append(ids(page))
+            if len(page) < 2:
+                break
+            after = (page[-1]['created_at'], page[-1]['id'])
+        self.assertEqual(pages, [['b', 'd'], ['c', 'a'], ['e']])
+
+    def test_query_filters(self):
+        self.write([
+            ('a', order(1)),
+            ('b', order(2, trade='elektryk')),
+            ('c', order(3, status='assigned', assigned_to='w1')),
+            ('d', order(4)),
+        ])
+        self.assertEqual(ids(self.storage.query_orders({'trade': 'hydraulik', 'status': 'open'})), ['d', 'a'])
+        self.assertEqual(ids(self.storage.query_orders({'status': 'open', 'assignedTo': None})), ['d', 'b', 'a'])
+        self.assertEqual(ids(self.storage.query_orders({'assignedTo': 'w1'})), ['c'])
+        self.assertEqual(list(self.storage.query_orders({'trade': 'murarz'})), [])
+
+    def test_projection(self):
+        self.write([('a', order(1, description='opis', price=100))])
+        [item] = self.storage.query_orders({}, fields=['title', 'created_at'])
+        self.assertEqual(item, {'id': 'a', 'title': 'Zlecenie 1', 'created_at': at(1)})
+        self.assertEqual(self.storage.get_order('a', fields=['price']), {'id': 'a', 'price': 100})
+        self.assertEqual(self.storage.get_order('a')['description'], 'opis')
+        self.assertIsNone(self.storage.get_order('missing'))
+
+    def test_get_user_and_order(self):
+        self.storage.set_user('w1', {'role': 'worker', 'trade': 'hydraulik'})
+        self.write([('a', order(1))])
+
+        profile, found, version = self.storage.get_user_and_order('w1', 'a')
+        self.assertEqual(profile, {'role': 'worker', 'trade': 'hydraulik'})
+        self.assertEqual(found['id'], 'a')
+        self.assertIsNotNone(version)
+
+        self.assertEqual(self.storage.get_user_and_order('nobody', 'a')[0], None)
+        self.assertEqual(self.storage.get_user_and_order('w1', 'missing')[1:], (None, None))
+
+    # Zapis warunkowy: wersja z odczytu przestaje obowiązywać po każdej zmianie zlecenia
+    def test_conditional_update(self):
+        self.write([('a', order(1))])
+        _, version = self.storage.get_order_for_update('a')
+        self.storage.update_order('a', {'status': 'assigned', 'assignedTo': 'w1'}, version=version)
+        with self.assertRaises(StorageConflict):
+            self.storage.update_order('a', {'assignedTo': 'w2'}, version=version)
+        found = self.storage.get_order('a')
+        self.assertEqual((found['status'], found['assignedTo']), ('assigned', 'w1'))
+        self.assertEqual(found['created_at'], at(1))
+
+    # Więcej pozycji niż jeden batch Firestore; ponowny zapis tego samego id nadpisuje zlecenie
+    def test_bulk_write(self):
+        count = storage.BATCH_SIZE + 20
+        self.write([(f'o{i:04d}', order(i)) for i in range(count)])
+        self.write([('o0000', order(0, title='Nadpisane'))])
+        found = list(self.storage.query_orders({}))
+        self.assertEqual(len(found), count)
+        self.assertEqual(found[0]['id'], f'o{count - 1:04d}')
+        self.assertEqual(self.storage.get_order('o0000')['title'], 'Nadpisane')
+
+    def test_server_timestamp(self):
+        before = datetime.now(timezone.utc) - timedelta(minutes=5)
+        order_id = self.storage.create_order({'title': 'Nowe', 'trade': 'hydraulik', 'status': 'open',
+                                              'created_at': firestore.SERVER_TIMESTAMP})
+        created = self.storage.get_order(order_id)['created_at']
+        self.assertIsInstance(created, datetime)
+        self.assertGreater(created, before)
+        self.assertEqual(ids(self.storage.query_orders({'trade': 'hydraulik'})), [order_id])
+
+    def test_reports(self):
+        self.write([('a', order(1)), ('b', order(2))])
+        for i in range(3):
+            self.storage.add_report('a', {'authorUid': 'w1', 'text': f'a{i}', 'created_at': at(10 + i)})
+        self.storage.add_report('b', {'authorUid': 'w2', 'text': 'b0', 'created_at': at(11)})
+        self.assertEqual(self.storage.get_order('a')['reportCount'], 3)
+        self.assertIsNotNone(self.storage.get_order('a')['lastReportAt'])
+
+        first = self.storage.list_reports('a', limit=2)
+        self.assertEqual([r['text'] for _, r in first], ['a2', 'a1'])
+        last_id, last = first[-1]
+        rest = self.storage.list_reports('a', after=(last['created_at'], last_id), limit=2)
+        self.assertEqual([r['text'] for _, r in rest], ['a0'])
+
+        # Równe created_at (a1, b0) - decyduje id zlecenia
+        everyone = list(self.storage.query_reports({}))
+        self.assertEqual([r['text'] for _, _, r in everyone], ['a2', 'b0', 'a1', 'a0'])
+        self.assertEqual([oid for oid, _, _ in everyone], ['a', 'b', 'a', 'a'])
+        page = list(self.storage.query_reports({}, limit=2))
+        order_id, report_id, data = page[-1]
+        rest = list(self.storage.query_reports({}, after=(data['created_at'], order_id, report_id)))
+        self.assertEqual([r['text'] for _, _, r in rest], ['a1', 'a0'])
+        self.assertEqual([r['text'] for _, _, r in self.storage.query_reports({'authorUid': 'w2'})], ['b0'])
+        self.assertEqual([r['text'] for _, _, r in self.storage.query_reports({'order_id': 'b'})], ['b0'])
+
+
+class MemoryStorageTest(StorageContract, unittest.TestCase):
+    def make_storage(self):
+        return storage.MemoryStorage()
+
+
+class SqliteStorageTest(StorageContract, unittest.TestCase):
+    def make_storage(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        return storage.SqliteStorage(os.path.join(directory, 'storage.sqlite3'))
+
+
+@unittest.skipUnless(os.environ.get('FIRESTORE_EMULATOR_HOST'), 'wymaga emulatora Firestore')
+class FirestoreStorageTest(StorageContract, unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import firebase_admin
+        from firebase_admin import credentials
+        from google.auth.credentials import AnonymousCredentials
+
+        class EmulatorCredential(credentials.Base):
+            def get_credential(self):
+                return AnonymousCredentials()
+
+        cls.app = firebase_admin.initialize_app(EmulatorCredential(), {'projectId': EMULATOR_PROJECT},
+                                                name='storage-test')
+
+    @classmethod
+    def tearDownClass(cls):
+        import firebase_admin
+        firebase_admin.delete_app(cls.app)
+
+    def make_storage(self):
+        import requests
+        # Każdy test zaczyna od pustej bazy emulatora
+        requests.delete(f"http://{os.environ['FIRESTORE_EMULATOR_HOST']}/emulator/v1/projects/"
+                        f"{EMULATOR_PROJECT}/databases/(default)/documents", timeout=10).raise_for_status()
+        return storage.FirestoreStorage(firestore.client(self.app))
+
+
+if __name__ == '__main__':
+    unittest.main()
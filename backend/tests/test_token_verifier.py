@@ -0,0 +1,257 @@
+# backend/tests/test_token_verifier.py - testy ręcznej weryfikacji tokenów Firebase (token_verifier.py)
+#
+#   python -m pytest -q backend/tests
+import base64
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import token_verifier  # noqa: E402
+from token_verifier import (  # noqa: E402
+    CertificatesUnavailableError,
+    SigningCertCache,
+    TokenTimeError,
+    TokenVerificationError,
+    TokenVerifier,
+    UnknownKeyError,
+)
+
+PROJECT = 'demo-project'
+NOW = 1_700_000_000
+
+
+def _key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                    serialization.NoEncryption())
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM,
+                                               serialization.PublicFormat.SubjectPublicKeyInfo)
+    return crypt.RSASigner.from_string(private_pem), public_pem
+
+
+SIGNER, PUBLIC_PEM = _key_pair()
+OTHER_SIGNER, _ = _key_pair()
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def make_token(signer=SIGNER, header=None, **claims):
+    head = {'alg': 'RS256', 'kid': 'k1', 'typ': 'JWT'}
+    head.update(header or {})
+    payload = {
+        'aud': PROJECT,
+        'iss': token_verifier.ID_TOKEN_ISSUER_PREFIX + PROJECT,
+        'sub': 'user-1',
+        'iat': NOW - 10,
+        'exp': NOW + 3590,
+        'auth_time': NOW - 100,
+    }
+    payload.update(claims)
+    signing_input = _b64(json.dumps(head).encode()) + b'.' + _b64(json.dumps(payload).encode())
+    return (signing_input + b'.' + _b64(signer.sign(signing_input))).decode('ascii')
+
+
+# Cache certyfikatów bez sieci; on_refresh podmienia klucze przy request_refresh
+class StubCerts:
+    def __init__(self, keys=None, on_refresh=None):
+        self.keys = dict(keys if keys is not None else {'k1': crypt.RSAVerifier.from_string(PUBLIC_PEM)})
+        self.on_refresh = on_refresh
+        self.refresh_requests = []
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+    def is_ready(self):
+        return bool(self.keys)
+
+    def request_refresh(self, wait=0):
+        self.refresh_requests.append(wait)
+        if self.on_refresh is None:
+            return False
+        self.keys.update(self.on_refresh())
+        return True
+
+
+def make_verifier(certs=None):
+    return TokenVerifier(PROJECT, certs or StubCerts(), clock=lambda: NOW)
+
+
+class TokenVerifierTest(unittest.TestCase):
+    def test_valid_token(self):
+        decoded = make_verifier().verify(make_token())
+        self.assertEqual(decoded['uid'], 'user-1')
+        self.assertEqual(decoded['aud'], PROJECT)
+
+    def test_rejects_other_algorithm(self):
+        with self.assertRaisesRegex(TokenVerificationError, 'algorytm'):
+            make_verifier().verify(make_token(header={'alg': 'HS256'}))
+        with self.assertRaisesRegex(TokenVerificationError, 'algorytm'):
+            make_verifier().verify(make_token(header={'alg': 'none'}))
+
+    def test_rejects_wrong_audience(self):
+        with self.assertRaisesRegex(TokenVerificationError, "'aud'"):
+            make_verifier().verify(make_token(aud='other-project'))
+
+    def test_rejects_wrong_issuer(self):
+        with self.assertRaisesRegex(TokenVerificationError, "'iss'"):
+            make_verifier().verify(make_token(iss='https://accounts.google.com'))
+
+    def test_rejects_bad_subject(self):
+        for sub in ('', 'x' * 129, 42, None):
+            with self.subTest(sub=sub), self.assertRaisesRegex(TokenVerificationError, "'sub'"):
+                make_verifier().verify(make_token(sub=sub))
+
+    def test_clock_skew_within_tolerance(self):
+        verifier = make_verifier()
+        # Token "z przyszłości" w granicach MAX_CLOCK_SKEW_SECONDS (dotyczy iat i auth_time)
+        self.assertEqual(verifier.verify(make_token(iat=NOW + 100, exp=NOW + 3700))['uid'], 'user-1')
+        self.assertEqual(verifier.verify(make_token(iat=NOW + 100, exp=NOW + 3700,
+                                                    auth_time=NOW + 100))['uid'], 'user-1')
+
+    def test_clock_skew_beyond_tolerance(self):
+        verifier = make_verifier()
+        with self.assertRaisesRegex(TokenTimeError, 'too early'):
+            verifier.verify(make_token(iat=NOW + 121, exp=NOW + 3721))
+        with self.assertRaisesRegex(TokenTimeError, 'auth_time'):
+            verifier.verify(make_token(auth_time=NOW + 121))
+
+    # Tolerancja nie przedłuża ważności - token wygasły choćby o sekundę jest odrzucany
+    def test_expired_without_tolerance(self):
+        verifier = make_verifier()
+        self.assertEqual(verifier.verify(make_token(iat=NOW - 3600, exp=NOW))['uid'], 'user-1')
+        with self.assertRaisesRegex(TokenTimeError, 'expired'):
+            verifier.verify(make_token(iat=NOW - 3601, exp=NOW - 1))
+        with self.assertRaisesRegex(TokenTimeError, 'expired'):
+            verifier.verify(make_token(iat=NOW - 3700, exp=NOW - 100))
+
+    def test_rejects_missing_auth_time(self):
+        for auth_time in (None, 'yesterday'):
+            with self.subTest(auth_time=auth_time), self.assertRaisesRegex(TokenVerificationError, 'auth_time'):
+                make_verifier().verify(make_token(auth_time=auth_time))
+
+    def test_rejects_missing_times(self):
+        with self.assertRaisesRegex(TokenVerificationError, 'iat/exp'):
+            make_verifier().verify(make_token(iat='soon'))
+
+    def test_rejects_bad_signature(self):
+        with self.assertRaisesRegex(TokenVerificationError, 'podpis'):
+            make_verifier().verify(make_token(signer=OTHER_SIGNER))
+
+    def test_rejects_tampered_payload(self):
+        header, _, signature = make_token().split('.')
+        forged = _b64(json.dumps({
+            'aud': PROJECT, 'iss': token_verifier.ID_TOKEN_ISSUER_PREFIX + PROJECT,
+            'sub': 'admin', 'iat': NOW - 10, 'exp': NOW + 3590, 'auth_time': NOW - 100,
+        }).encode()).decode()
+        with self.assertRaisesRegex(TokenVerificationError, 'podpis'):
+            make_verifier().verify('.'.join((header, forged, signature)))
+
+    def test_rejects_malformed_token(self):
+        for token in ('abc', 'a.b', 'a.b.c.d', '!!.??.##'):
+            with self.subTest(token=token), self.assertRaisesRegex(TokenVerificationError, 'format'):
+                make_verifier().verify(token)
+
+    def test_unknown_kid_rejected_after_refresh(self):
+        certs = StubCerts()
+        with self.assertRaises(UnknownKeyError):
+            make_verifier(certs).verify(make_token(header={'kid': 'k2'}))
+        self.assertEqual(certs.refresh_requests, [token_verifier.KID_REFRESH_WAIT_SECONDS])
+
+    def test_unknown_kid_accepted_after_key_rotation(self):
+        certs = StubCerts(on_refresh=lambda: {'k2': crypt.RSAVerifier.from_string(PUBLIC_PEM)})
+        decoded = make_verifier(certs).verify(make_token(header={'kid': 'k2'}))
+        self.assertEqual(decoded['uid'], 'user-1')
+        self.assertEqual(len(certs.refresh_requests), 1)
+
+    def test_unknown_kid_without_waiting(self):
+        certs = StubCerts()
+        with self.assertRaises(UnknownKeyError):
+            make_verifier(certs).verify(make_token(header={'kid': 'k2'}), refresh_wait=0)
+        self.assertEqual(certs.refresh_requests, [0])
+
+    def test_certificates_unavailable(self):
+        with self.assertRaises(CertificatesUnavailableError):
+            make_verifier(StubCerts(keys={})).verify(make_token())
+
+    def test_time_checked_before_certificates(self):
+        with self.assertRaises(TokenTimeError):
+            make_verifier(StubCerts(keys={})).verify(make_token(iat=NOW - 7200, exp=NOW - 3600))
+
+
+class FakeResponse:
+    headers = {'Cache-Control': 'public, max-age=3600'}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'k1': PUBLIC_PEM.decode('ascii')}
+
+
+class SigningCertCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+        def fake_get(url, timeout):
+            self.calls += 1
+            self.release.wait(5)
+            return FakeResponse()
+
+        patcher = mock.patch.object(token_verifier.requests, 'get', side_effect=fake_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.certs = SigningCertCache(min_refresh_interval=60, clock=lambda: self.now)
+
+    def test_request_refresh_loads_keys(self):
+        self.assertTrue(self.certs.request_refresh(wait=5))
+        self.assertTrue(self.certs.is_ready())
+        self.assertIsNotNone(self.certs.get('k1'))
+
+    def test_refresh_cooldown(self):
+        self.assertTrue(self.certs.request_refresh(wait=5))
+        self.now += 10
+        self.assertFalse(self.certs.request_refresh(wait=5))
+        self.assertEqual(self.calls, 1)
+        self.now += 60
+        self.assertTrue(self.certs.request_refresh(wait=5))
+        self.assertEqual(self.calls, 2)
+
+    def test_concurrent_requests_share_one_refresh(self):
+        self.release.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.certs.request_refresh(wait=5)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        self.release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [True] * 8)
+
+    def test_wait_is_bounded(self):
+        self.release.clear()
+        started = time.monotonic()
+        self.assertFalse(self.certs.request_refresh(wait=0.1))
+        self.assertLess(time.monotonic() - started, 2)
+        self.release.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
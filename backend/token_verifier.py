@@ -0,0 +1,219 @@
+# backend/token_verifier.py - jednoprzebiegowa weryfikacja Firebase ID tokenów
+# z lokalnym cache certyfikatów Google odświeżanym w tle.
+import base64
+import json
+import logging
+import math
+import re
+import threading
+import time
+
+import requests
+from google.auth import crypt
+
+logger = logging.getLogger("backend.tokens")
+
+ID_TOKEN_CERT_URI = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+# Maksymalna tolerancja rozjazdu zegarów (odpowiada najwyższej próbie ze starej pętli 0/5/30/120)
+MAX_CLOCK_SKEW_SECONDS = 120
+# Ile żądanie z nieznanym 'kid' czeka na wspólne odświeżenie certyfikatów, zanim zostanie odrzucone
+KID_REFRESH_WAIT_SECONDS = 2.0
+
+
+class TokenVerificationError(Exception):
+    pass
+
+
+# Błąd czasowy: token wygasły albo "z przyszłości" poza dopuszczalną tolerancją
+class TokenTimeError(TokenVerificationError):
+    pass
+
+
+class CertificatesUnavailableError(TokenVerificationError):
+    pass
+
+
+# 'kid' spoza znanych certyfikatów (także po odświeżeniu)
+class UnknownKeyError(TokenVerificationError):
+    pass
+
+
+def _b64decode(segment):
+    if isinstance(segment, str):
+        segment = segment.encode('ascii')
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+def _max_age(cache_control, default):
+    m = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(m.group(1)) if m else default
+
+
+# Cache certyfikatów podpisujących tokeny. Pierwsze pobranie odbywa się przy starcie,
+# kolejne w wątku w tle przed upływem max-age z nagłówka Cache-Control,
+# więc odświeżenie nigdy nie blokuje obsługi żądania.
+# Odświeżenia na żądanie (nieznany 'kid', brak certyfikatów) są wspólne dla wszystkich czekających
+# i nie częstsze niż co min_refresh_interval s - tokeny z losowym 'kid' nie wymuszą ciągłego pobierania.
+class SigningCertCache:
+    def __init__(self, url=ID_TOKEN_CERT_URI, refresh_margin=300, retry_interval=30,
+                 default_max_age=3600, timeout=10, min_refresh_interval=60, clock=time.monotonic):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.default_max_age = default_max_age
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+        self._clock = clock
+        self._verifiers = {}  # kid -> RSAVerifier (certyfikat sparsowany raz, a nie przy każdym żądaniu)
+        self._expires_at = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._last_attempt = None
+        self._refreshing = False
+        self._generation = 0  # zwiększane po każdym udanym pobraniu
+
+    def start(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Nie udało się pobrać certyfikatów przy starcie: %s", e)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='cert-refresh', daemon=True)
+                self._thread.start()
+
+    def refresh(self):
+        with self._cond:
+            self._last_attempt = self._clock()
+        resp = requests.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+        verifiers = {kid: crypt.RSAVerifier.from_string(pem) for kid, pem in resp.json().items()}
+        max_age = _max_age(resp.headers.get('Cache-Control'), self.default_max_age)
+        # Podmiana całego słownika jest atomowa - czytelnicy nie potrzebują blokady
+        self._verifiers = verifiers
+        self._expires_at = time.time() + max_age
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+        logger.info("Odświeżono certyfikaty (%d kluczy, max-age=%ss)", len(verifiers), max_age)
+
+    # Prośba o wcześniejsze odświeżenie (np. nieznany 'kid' po rotacji kluczy). Pobranie idzie w osobnym
+    # wątku, jedno naraz i nie częściej niż co min_refresh_interval. wait - ile sekund czekać na wynik.
+    # Zwraca True, jeśli w tym czasie certyfikaty zostały odświeżone.
+    def request_refresh(self, wait=0):
+        with self._cond:
+            generation = self._generation
+            if not self._refreshing:
+                now = self._clock()
+                if self._last_attempt is not None and now - self._last_attempt < self.min_refresh_interval:
+                    return False
+                self._refreshing = True
+                self._last_attempt = now
+                threading.Thread(target=self._refresh_on_demand, name='cert-refresh-now', daemon=True).start()
+            if wait > 0:
+                self._cond.wait_for(lambda: not self._refreshing, timeout=wait)
+            return self._generation != generation
+
+    def _refresh_on_demand(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Odświeżanie certyfikatów nieudane: %s", e)
+        finally:
+            with self._cond:
+                self._refreshing = False
+                self._cond.notify_all()
+
+    def get(self, kid):
+        return self._verifiers.get(kid)
+
+    def is_ready(self):
+        return bool(self._verifiers)
+
+    def _run(self):
+        while True:
+            if self._verifiers:
+                delay = max(self.retry_interval, self._expires_at - time.time() - self.refresh_margin)
+            else:
+                delay = self.retry_interval
+            time.sleep(delay)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Odświeżanie certyfikatów nieudane: %s", e)
+
+
+# Weryfikacja w jednym przebiegu: iat/exp czytane są z nieweryfikowanego payloadu,
+# na ich podstawie wyliczana jest potrzebna tolerancja i podpis sprawdzany jest tylko raz.
+class TokenVerifier:
+    def __init__(self, project_id, certs, max_clock_skew=MAX_CLOCK_SKEW_SECONDS, clock=time.time,
+                 kid_refresh_wait=KID_REFRESH_WAIT_SECONDS):
+        self.project_id = project_id
+        self.certs = certs
+        self.max_clock_skew = max_clock_skew
+        self._clock = clock
+        self.kid_refresh_wait = kid_refresh_wait
+
+    # refresh_wait - ile czekać na odświeżenie certyfikatów (None: kid_refresh_wait, 0: nie czekaj)
+    def verify(self, id_token, refresh_wait=None):
+        if refresh_wait is None:
+            refresh_wait = self.kid_refresh_wait
+        try:
+            header_b64, payload_b64, signature_b64 = id_token.encode('ascii').split(b'.')
+            header = json.loads(_b64decode(header_b64))
+            payload = json.loads(_b64decode(payload_b64))
+            signature = _b64decode(signature_b64)
+        except Exception as e:
+            raise TokenVerificationError(f"Niepoprawny format tokena: {e}")
+
+        # Najpierw tanie sprawdzenia czasu - token poza tolerancją odrzucamy bez liczenia podpisu
+        # Tolerancja rozjazdu zegarów dotyczy tylko iat/auth_time ("token used too early");
+        # wygasły token (exp) odrzucamy od razu, jak SDK przy clock_skew_seconds=0
+        iat = payload.get('iat')
+        exp = payload.get('exp')
+        if not isinstance(iat, (int, float)) or not isinstance(exp, (int, float)):
+            raise TokenVerificationError("Token nie zawiera iat/exp")
+        if self._clock() > exp:
+            raise TokenTimeError(f"Token expired (exp={exp})")
+        skew = self.required_skew(iat)
+        if skew > self.max_clock_skew:
+            raise TokenTimeError(f"Token used too early (iat={iat}, skew={skew}s)")
+        auth_time = payload.get('auth_time')
+        if not isinstance(auth_time, (int, float)):
+            raise TokenVerificationError("Token nie zawiera 'auth_time'")
+        if self.required_skew(auth_time) > self.max_clock_skew:
+            raise TokenTimeError(f"Token used too early (auth_time={auth_time})")
+
+        if header.get('alg') != 'RS256':
+            raise TokenVerificationError(f"Niepoprawny algorytm: {header.get('alg')}")
+        if payload.get('aud') != self.project_id:
+            raise TokenVerificationError(f"Niepoprawne 'aud': {payload.get('aud')}")
+        if payload.get('iss') != ID_TOKEN_ISSUER_PREFIX + str(self.project_id):
+            raise TokenVerificationError(f"Niepoprawne 'iss': {payload.get('iss')}")
+        sub = payload.get('sub')
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise TokenVerificationError("Niepoprawne 'sub'")
+
+        if not self.certs.is_ready():
+            self.certs.request_refresh(wait=refresh_wait)
+            if not self.certs.is_ready():
+                raise CertificatesUnavailableError("Brak certyfikatów Google do weryfikacji")
+        verifier = self.certs.get(header.get('kid'))
+        if verifier is None:
+            # Rotacja kluczy: krótko czekamy na wspólne odświeżenie (ograniczone czasowo), potem odrzucamy
+            self.certs.request_refresh(wait=refresh_wait)
+            verifier = self.certs.get(header.get('kid'))
+            if verifier is None:
+                raise UnknownKeyError(f"Nieznany klucz 'kid': {header.get('kid')}")
+        if not verifier.verify(header_b64 + b'.' + payload_b64, signature):
+            raise TokenVerificationError("Niepoprawny podpis tokena")
+
+        payload['uid'] = sub
+        return payload
+
+    # Ile sekund tolerancji potrzeba, żeby czas z tokena (iat, auth_time) nie był w przyszłości
+    def required_skew(self, issued):
+        return int(math.ceil(max(0, issued - self._clock())))
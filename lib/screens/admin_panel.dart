@@ -32,10 +32,16 @@ class _AdminPanelState extends State<AdminPanel> {
   String _userRole = 'worker';
   bool _creatingUser = false;
 
-  // lists
+  // lists - ładowane stronami, kolejne strony na żądanie ("Załaduj więcej")
   List<dynamic> _availableOrders = [];
   List<dynamic> _currentOrders = [];
   bool _loadingLists = false;
+  String? _availableNextPage;
+  String? _currentNextPage;
+  bool _loadingMoreAvailable = false;
+  bool _loadingMoreCurrent = false;
+  String? _availableError;
+  String? _currentError;
 
   // Filters (local)
   String _filterQuery = '';
@@ -61,6 +67,60 @@ class _AdminPanelState extends State<AdminPanel> {
     return await user.getIdToken();
   }
 
+  // Ostatnia odpowiedź dla każdej strony (ETag, treść, token kolejnej strony) - przy 304 używamy jej ponownie.
+  // Najwyżej _pageCacheSize stron; najdawniej używane są usuwane (mapa zachowuje kolejność wstawiania).
+  final Map<String, (String, String, String?)> _pageCache = {};
+
+  static const _pageSize = 50;
+  static const _pageCacheSize = 100;
+
+  // Jedna strona listy: elementy i token kolejnej strony (null - koniec listy).
+  // Błąd HTTP rzuca wyjątek, żeby wywołujący mógł zachować już załadowane strony.
+  Future<(List<dynamic>, String?)> _getPage(
+    String url,
+    String token, {
+    String? pageToken,
+    bool summary = true,
+  }) async {
+    final uri = Uri.parse(url).replace(
+      queryParameters: {
+        'limit': '$_pageSize',
+        if (summary) 'fields': 'summary',
+        if (pageToken != null) 'page_token': pageToken,
+      },
+    );
+    final cached = _pageCache.remove(uri.toString());
+    final resp = await http.get(
+      uri,
+      headers: {
+        'Authorization': 'Bearer $token',
+        if (cached != null) 'If-None-Match': cached.$1,
+      },
+    );
+    String body;
+    String? next;
+    if (resp.statusCode == 304 && cached != null) {
+      body = cached.$2;
+      next = cached.$3;
+      _pageCache[uri.toString()] = cached;
+    } else if (resp.statusCode == 200) {
+      body = resp.body;
+      next = resp.headers['x-next-page-token'];
+      final etag = resp.headers['etag'];
+      if (etag != null) _pageCache[uri.toString()] = (etag, body, next);
+    } else {
+      throw Exception('${resp.statusCode} ${resp.body}');
+    }
+    while (_pageCache.length > _pageCacheSize) {
+      _pageCache.remove(_pageCache.keys.first);
+    }
+    return (
+      jsonDecode(body) as List<dynamic>,
+      (next == null || next.isEmpty) ? null : next,
+    );
+  }
+
+  // Pierwsze strony obu list; błąd jednej listy nie blokuje drugiej
   Future<void> _loadLists() async {
     setState(() {
       _loadingLists = true;
@@ -70,25 +130,27 @@ class _AdminPanelState extends State<AdminPanel> {
       if (token == null) throw Exception('Brak tokena');
       final base = backendBase();
 
-      final respAvail = await http.get(
-        Uri.parse('$base/admin/orders/available'),
-        headers: {'Authorization': 'Bearer $token'},
-      );
-      final respCurr = await http.get(
-        Uri.parse('$base/admin/orders/current'),
-        headers: {'Authorization': 'Bearer $token'},
-      );
-
-      if (respAvail.statusCode == 200) {
-        _availableOrders = jsonDecode(respAvail.body) as List<dynamic>;
-      } else {
-        _availableOrders = [];
+      try {
+        final (items, next) = await _getPage(
+          '$base/admin/orders/available',
+          token,
+        );
+        _availableOrders = items;
+        _availableNextPage = next;
+        _availableError = null;
+      } catch (e) {
+        _availableError = '$e';
       }
-
-      if (respCurr.statusCode == 200) {
-        _currentOrders = jsonDecode(respCurr.body) as List<dynamic>;
-      } else {
-        _currentOrders = [];
+      try {
+        final (items, next) = await _getPage(
+          '$base/admin/orders/current',
+          token,
+        );
+        _currentOrders = items;
+        _currentNextPage = next;
+        _currentError = null;
+      } catch (e) {
+        _currentError = '$e';
       }
     } catch (e) {
       ScaffoldMessenger.of(
@@ -101,6 +163,93 @@ class _AdminPanelState extends State<AdminPanel> {
     }
   }
 
+  // Kolejna strona jednej z list; przy błędzie załadowane zlecenia zostają, a błąd jest pokazany pod listą
+  Future<void> _loadMore({required bool available}) async {
+    final pageToken = available ? _availableNextPage : _currentNextPage;
+    if (pageToken == null) return;
+    if (available ? _loadingMoreAvailable : _loadingMoreCurrent) return;
+    setState(() {
+      if (available) {
+        _loadingMoreAvailable = true;
+      } else {
+        _loadingMoreCurrent = true;
+      }
+    });
+    try {
+      final token = await _idToken();
+      if (token == null) throw Exception('Brak tokena');
+      final path = available
+          ? '/admin/orders/available'
+          : '/admin/orders/current';
+      final (items, next) = await _getPage(
+        '${backendBase()}$path',
+        token,
+        pageToken: pageToken,
+      );
+      setState(() {
+        if (available) {
+          _availableOrders = [..._availableOrders, ...items];
+          _availableNextPage = next;
+          _availableError = null;
+        } else {
+          _currentOrders = [..._currentOrders, ...items];
+          _currentNextPage = next;
+          _currentError = null;
+        }
+      });
+    } catch (e) {
+      setState(() {
+        if (available) {
+          _availableError = '$e';
+        } else {
+          _currentError = '$e';
+        }
+      });
+    } finally {
+      setState(() {
+        if (available) {
+          _loadingMoreAvailable = false;
+        } else {
+          _loadingMoreCurrent = false;
+        }
+      });
+    }
+  }
+
+  // Stopka listy: błąd ładowania (z ponowieniem) i przycisk kolejnej strony
+  Widget _buildListFooter({required bool available}) {
+    final error = available ? _availableError : _currentError;
+    final hasMore = (available ? _availableNextPage : _currentNextPage) != null;
+    final loading = available ? _loadingMoreAvailable : _loadingMoreCurrent;
+    return Column(
+      crossAxisAlignment: CrossAxisAlignment.start,
+      children: [
+        if (error != null)
+          Padding(
+            padding: const EdgeInsets.symmetric(vertical: 6),
+            child: Text(
+              'Błąd ładowania listy: $error',
+              style: const TextStyle(color: Colors.redAccent),
+            ),
+          ),
+        if (loading)
+          const Padding(
+            padding: EdgeInsets.all(8),
+            child: Center(child: CircularProgressIndicator()),
+          )
+        else if (hasMore)
+          Center(
+            child: TextButton(
+              onPressed: () => _loadMore(available: available),
+              child: Text(
+                error != null ? 'Spróbuj ponownie' : 'Załaduj więcej',
+              ),
+            ),
+          ),
+      ],
+    );
+  }
+
   Future<void> _createOrder() async {
     final title = _orderTitle.text.trim();
     final trade = _orderTrade.text.trim();
@@ -216,6 +365,8 @@ class _AdminPanelState extends State<AdminPanel> {
     }
   }
 
+  // Raporty zlecenia stronami (najnowsze najpierw): pierwsza strona przed otwarciem arkusza,
+  // kolejne na żądanie ("Załaduj więcej") - błąd kolejnej strony nie usuwa już załadowanych raportów
   Future<void> _showReports(String orderId, String title) async {
     final token = await _idToken();
     if (token == null) {
@@ -225,36 +376,22 @@ class _AdminPanelState extends State<AdminPanel> {
       return;
     }
 
-    final url = Uri.parse('${backendBase()}/admin/orders/$orderId/reports');
+    final url = '${backendBase()}/admin/orders/$orderId/reports';
     List<dynamic> reports = [];
+    String? nextPage;
     showDialog(
       context: context,
       barrierDismissible: false,
       builder: (_) => const Center(child: CircularProgressIndicator()),
     );
     try {
-      final resp = await http.get(
-        url,
-        headers: {'Authorization': 'Bearer $token'},
-      );
+      (reports, nextPage) = await _getPage(url, token, summary: false);
       Navigator.of(context).pop(); // close loading
-      if (resp.statusCode == 200) {
-        reports = jsonDecode(resp.body) as List<dynamic>;
-      } else {
-        ScaffoldMessenger.of(context).showSnackBar(
-          SnackBar(
-            content: Text(
-              'Błąd ładowania raportów: ${resp.statusCode} ${resp.body}',
-            ),
-          ),
-        );
-        return;
-      }
     } catch (e) {
       Navigator.of(context).pop(); // ensure loading closed
       ScaffoldMessenger.of(
         context,
-      ).showSnackBar(SnackBar(content: Text('Błąd: $e')));
+      ).showSnackBar(SnackBar(content: Text('Błąd ładowania raportów: $e')));
       return;
     }
 
@@ -269,61 +406,136 @@ class _AdminPanelState extends State<AdminPanel> {
       return;
     }
 
+    bool loadingMore = false;
+    String? error;
     showModalBottomSheet(
       context: context,
       isScrollControlled: true,
-      builder: (ctx) => DraggableScrollableSheet(
-        expand: false,
-        initialChildSize: 0.6,
-        minChildSize: 0.3,
-        maxChildSize: 0.95,
-        builder: (_, controller) => Padding(
-          padding: const EdgeInsets.all(12),
-          child: Column(
-            children: [
-              Text(
-                'Raporty — $title',
-                style: const TextStyle(fontWeight: FontWeight.bold),
-              ),
-              const SizedBox(height: 8),
-              Expanded(
-                child: ListView.builder(
-                  controller: controller,
-                  itemCount: reports.length,
-                  itemBuilder: (_, i) {
-                    final r = reports[i];
-                    final d = r['data'] as Map<String, dynamic>? ?? {};
-                    final author = d['authorName'] ?? d['authorUid'] ?? '—';
-                    final created = d['created_at'] ?? '';
-                    final text = d['text'] ?? '';
-                    return Card(
-                      margin: const EdgeInsets.symmetric(vertical: 6),
-                      child: ListTile(
-                        title: Text(author),
-                        subtitle: Column(
-                          crossAxisAlignment: CrossAxisAlignment.start,
-                          children: [
-                            if (created.toString().isNotEmpty)
-                              Text(
-                                created.toString(),
-                                style: const TextStyle(fontSize: 12),
-                              ),
-                            const SizedBox(height: 6),
-                            Text(text),
-                          ],
-                        ),
-                      ),
-                    );
-                  },
-                ),
+      builder: (ctx) => StatefulBuilder(
+        builder: (ctx, setSheetState) {
+          Future<void> loadMore() async {
+            if (nextPage == null || loadingMore) return;
+            setSheetState(() => loadingMore = true);
+            try {
+              final fresh = await _idToken();
+              if (fresh == null) throw Exception('Brak tokena');
+              final (items, next) = await _getPage(
+                url,
+                fresh,
+                pageToken: nextPage,
+                summary: false,
+              );
+              if (!ctx.mounted) return;
+              setSheetState(() {
+                reports = [...reports, ...items];
+                nextPage = next;
+                error = null;
+              });
+            } catch (e) {
+              if (ctx.mounted) setSheetState(() => error = '$e');
+            } finally {
+              if (ctx.mounted) setSheetState(() => loadingMore = false);
+            }
+          }
+
+          return DraggableScrollableSheet(
+            expand: false,
+            initialChildSize: 0.6,
+            minChildSize: 0.3,
+            maxChildSize: 0.95,
+            builder: (_, controller) => Padding(
+              padding: const EdgeInsets.all(12),
+              child: Column(
+                children: [
+                  Text(
+                    'Raporty — $title',
+                    style: const TextStyle(fontWeight: FontWeight.bold),
+                  ),
+                  const SizedBox(height: 8),
+                  Expanded(
+                    child: ListView.builder(
+                      controller: controller,
+                      itemCount: reports.length + 1,
+                      itemBuilder: (_, i) {
+                        if (i == reports.length) {
+                          return _buildReportsFooter(
+                            error: error,
+                            hasMore: nextPage != null,
+                            loading: loadingMore,
+                            onLoadMore: loadMore,
+                          );
+                        }
+                        return _buildReportCard(reports[i]);
+                      },
+                    ),
+                  ),
+                ],
               ),
-            ],
-          ),
+            ),
+          );
+        },
+      ),
+    );
+  }
+
+  Widget _buildReportCard(dynamic r) {
+    final d = r['data'] as Map<String, dynamic>? ?? {};
+    final author = d['authorName'] ?? d['authorUid'] ?? '—';
+    final created = d['created_at'] ?? '';
+    final text = d['text'] ?? '';
+    return Card(
+      margin: const EdgeInsets.symmetric(vertical: 6),
+      child: ListTile(
+        title: Text(author),
+        subtitle: Column(
+          crossAxisAlignment: CrossAxisAlignment.start,
+          children: [
+            if (created.toString().isNotEmpty)
+              Text(created.toString(), style: const TextStyle(fontSize: 12)),
+            const SizedBox(height: 6),
+            Text(text),
+          ],
         ),
       ),
     );
   }
 
+  // Stopka listy raportów: błąd kolejnej strony (z ponowieniem) i przycisk "Załaduj więcej"
+  Widget _buildReportsFooter({
+    required String? error,
+    required bool hasMore,
+    required bool loading,
+    required VoidCallback onLoadMore,
+  }) {
+    return Column(
+      crossAxisAlignment: CrossAxisAlignment.start,
+      children: [
+        if (error != null)
+          Padding(
+            padding: const EdgeInsets.symmetric(vertical: 6),
+            child: Text(
+              'Błąd ładowania raportów: $error',
+              style: const TextStyle(color: Colors.redAccent),
+            ),
+          ),
+        if (loading)
+          const Padding(
+            padding: EdgeInsets.all(8),
+            child: Center(child: CircularProgressIndicator()),
+          )
+        else if (hasMore)
+          Center(
+            child: TextButton(
+              onPressed: onLoadMore,
+              child: Text(
+                error != null ? 'Spróbuj ponownie' : 'Załaduj więcej',
+              ),
+            ),
+          ),
+      ],
+    );
+  }
+
   Widget _buildCreateOrderCard(Color panel, Color darkBox) {
     return Card(
       margin: const EdgeInsets.symmetric(vertical: 8),
@@ -590,6 +802,7 @@ class _AdminPanelState extends State<AdminPanel> {
                 ),
               ),
             ),
+        _buildListFooter(available: true),
       ],
     );
   }
@@ -612,7 +825,6 @@ class _AdminPanelState extends State<AdminPanel> {
       return matchesQuery && matchesStatus && matchesReports;
     }).toList();
 
-    if (filtered.isEmpty) return const Center(child: Text('Brak zadań'));
     return Column(
       crossAxisAlignment: CrossAxisAlignment.start,
       children: [
@@ -621,6 +833,7 @@ class _AdminPanelState extends State<AdminPanel> {
           style: TextStyle(fontWeight: FontWeight.bold),
         ),
         const SizedBox(height: 8),
+        if (filtered.isEmpty) const Center(child: Text('Brak zadań')),
         for (var o in filtered)
           Card(
             margin: const EdgeInsets.symmetric(vertical: 6),
@@ -667,6 +880,7 @@ class _AdminPanelState extends State<AdminPanel> {
               ),
             ),
           ),
+        _buildListFooter(available: false),
       ],
     );
   }